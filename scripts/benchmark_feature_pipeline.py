@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import numpy as np
+import pandas as pd
+
+from xau_system.features.indicators import add_technical_indicators
+from xau_system.features.pipeline import FeaturePipeline
+from xau_system.features.preprocessing import add_returns_and_atr, normalize_ohlc_by_atr
+
+
+def synthetic_m1(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 2000 + np.cumsum(rng.normal(0, 0.4, n))
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2015-01-01", periods=n, freq="1min", tz="UTC"),
+            "open": close + rng.normal(0, 0.1, n),
+            "high": close + rng.random(n),
+            "low": close - rng.random(n),
+            "close": close,
+            "volume": rng.integers(1, 1000, n).astype(float),
+        }
+    )
+
+
+def chain(df: pd.DataFrame) -> pd.DataFrame:
+    return normalize_ohlc_by_atr(add_returns_and_atr(add_technical_indicators(df)))
+
+
+def fused(df: pd.DataFrame) -> np.ndarray:
+    return FeaturePipeline(dtype=np.float32).compute(df).as_float32()
+
+
+def measure(fn, df: pd.DataFrame) -> tuple[float, float]:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn(df)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark: cadena de features vs pipeline fusionado")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Barras M1 sintéticas")
+    args = parser.parse_args()
+
+    df = synthetic_m1(args.rows)
+    t_chain, m_chain = measure(chain, df)
+    t_fused, m_fused = measure(fused, df)
+    print(f"[CHAIN] {t_chain:.3f}s pico={m_chain:.1f}MB")
+    print(f"[FUSED] {t_fused:.3f}s pico={m_fused:.1f}MB")
+    print(f"speedup={t_chain / t_fused:.2f}x memoria={m_fused / m_chain:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
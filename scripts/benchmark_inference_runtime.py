@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import numpy as np
+
+
+def _rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _load(path: str):
+    if path.endswith((".keras", ".h5")):
+        import tensorflow as tf
+
+        return tf.keras.models.load_model(path, compile=False)
+    from xau_system.models.runtime import load_runtime
+
+    return load_runtime(path)
+
+
+def _inputs(paths: list[str]) -> list[np.ndarray]:
+    return [np.load(p, mmap_mode="r").astype(np.float32) for p in paths]
+
+
+def run_one(model_path: str, input_paths: list[str], batch_sizes: list[int], repeats: int) -> dict:
+    """Se ejecuta en un proceso propio para que RSS e import no se mezclen entre backends."""
+    t0 = time.perf_counter()
+    model = _load(model_path)
+    load_s = time.perf_counter() - t0
+    xs = _inputs(input_paths)
+    latency = {}
+    for bs in batch_sizes:
+        batch = [x[:bs] for x in xs]
+        feed = batch if len(batch) > 1 else batch[0]
+        model.predict_on_batch(feed)  # warm-up
+        samples = []
+        for _ in range(repeats):
+            t = time.perf_counter()
+            model.predict_on_batch(feed)
+            samples.append((time.perf_counter() - t) * 1000.0)
+        latency[bs] = {"p50_ms": float(np.percentile(samples, 50)), "p95_ms": float(np.percentile(samples, 95))}
+    return {"model": model_path, "load_s": load_s, "peak_rss_mb": _rss_mb(), "latency": latency}
+
+
+def run_drift(keras_path: str, artifact: str, input_paths: list[str]) -> dict:
+    from xau_system.models.runtime import check_accuracy_drift
+
+    xs = _inputs(input_paths)
+    report = check_accuracy_drift(_load(keras_path), _load(artifact), xs if len(xs) > 1 else xs[0])
+    return {"artifact": artifact, **report.__dict__}
+
+
+def _child(args: list[str]) -> dict:
+    out = subprocess.run([sys.executable, __file__, *args], check=True, capture_output=True, text=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark: Keras vs artefactos TFLite/ONNX en CPU")
+    parser.add_argument("--keras", required=True, help="Modelo Keras de referencia (.keras)")
+    parser.add_argument("--artifact", action="append", default=[], help="Artefacto .tflite/.onnx (repetible)")
+    parser.add_argument("--inputs", nargs="+", required=True, help="Ventanas .npy, una por entrada del modelo")
+    parser.add_argument("--batch-sizes", default="1,8,32")
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--only", help=argparse.SUPPRESS)
+    parser.add_argument("--drift-of", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+
+    if args.only:
+        print(json.dumps(run_one(args.only, args.inputs, batch_sizes, args.repeats)))
+        return 0
+    if args.drift_of:
+        print(json.dumps(run_drift(args.keras, args.drift_of, args.inputs)))
+        return 0
+
+    common = ["--keras", args.keras, "--inputs", *args.inputs, "--batch-sizes", args.batch_sizes, "--repeats", str(args.repeats)]
+    for path in [args.keras, *args.artifact]:
+        res = _child([*common, "--only", path])
+        lat = " ".join(f"b{bs}={v['p50_ms']:.2f}/{v['p95_ms']:.2f}ms" for bs, v in res["latency"].items())
+        print(f"[{Path(path).name}] carga={res['load_s']:.2f}s rss={res['peak_rss_mb']:.0f}MB {lat}")
+    for path in args.artifact:
+        d = _child([*common, "--drift-of", path])
+        status = "OK" if d["passed"] else "DRIFT"
+        print(f"[{Path(path).name}] {status} max_abs={d['max_abs_error']} argmax={d['argmax_agreement']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
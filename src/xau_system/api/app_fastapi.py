@@ -1,21 +1,38 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import Literal
 from fastapi import FastAPI, HTTPException
+import numpy as np
 from pydantic import BaseModel, Field
 
 from xau_system.api.service import SignalEngine
+from xau_system.config import Settings
 from xau_system.data.live_price import BufferPriceProvider, CompositePriceProvider, FixedPriceProvider, MT5PriceProvider
 from xau_system.data.realtime import MarketBar, RealTimeBuffer
 from xau_system.ensemble.consensus import TimeframeVote
-from xau_system.features.fundamental import FundamentalSnapshot
+from xau_system.features.fundamental import FUNDAMENTAL_FIELDS, FundamentalSnapshot
 from xau_system.integrations.mt5_bridge import MT5Bridge, MT5OrderRequest
 from xau_system.integrations.tradingview_feed import TradingViewFeed, build_analysis_from_payload
+from xau_system.rl.experience_buffer import Experience, ExperienceBuffer
 from xau_system.rl.online_trainer import OnlineTrainer
+from xau_system.rl.training_worker import TrainingWorker, WorkerConfig
 from xau_system.ui.dashboard import dashboard_response
+from xau_system.utils.persistence import close_all_writers
 
-app = FastAPI(title="XAU/USD AI Signal Service", version="0.4.0")
-engine = SignalEngine()
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    yield
+    training_backend.stop()
+    # Vacía las colas de persistencia NDJSON antes de salir.
+    close_all_writers()
+
+
+app = FastAPI(title="XAU/USD AI Signal Service", version="0.4.0", lifespan=lifespan)
+settings = Settings()
+engine = SignalEngine(settings)
 realtime_buffer = RealTimeBuffer()
 mt5_bridge = MT5Bridge()
 price_provider = CompositePriceProvider(
@@ -26,7 +43,12 @@ price_provider = CompositePriceProvider(
     ]
 )
 tv_feed = TradingViewFeed()
-online_trainer = OnlineTrainer()
+online_trainer = OnlineTrainer(settings.experience_path, segmented=settings.experience_segmented)
+training_backend: OnlineTrainer | TrainingWorker = online_trainer
+experience_buffer = ExperienceBuffer(settings.experience_path, segments=settings.experience_segments())
+# Cada lote confirmado en disco despierta al backend activo (hilo o proceso) sin
+# esperar a su sondeo periódico.
+experience_buffer.subscribe(lambda n_rows: training_backend.notify(n_rows))
 
 
 class VoteInput(BaseModel):
@@ -54,6 +76,10 @@ class SignalRequest(BaseModel):
     fundamentals: FundamentalInput | None = None
 
 
+class SignalBatchRequest(BaseModel):
+    items: list[SignalRequest] = Field(min_length=1)
+
+
 class MarketBarInput(BaseModel):
     timestamp: str
     open: float
@@ -74,6 +100,21 @@ class MT5OrderInput(BaseModel):
     comment: str = "xau_system"
 
 
+class TrainingStartInput(BaseModel):
+    mode: Literal["thread", "process"] = "thread"
+    cpu_affinity: list[int] | None = Field(default=None, description="CPUs del proceso de entrenamiento")
+    niceness: int = Field(default=10, ge=0, le=19)
+
+
+class ExperienceInput(BaseModel):
+    state_id: str
+    signal: str = Field(pattern="^(BUY|SELL|NEUTRAL)$")
+    confidence: float = Field(ge=0.0, le=1.0)
+    reward: float
+    pnl: float
+    regime: str = "range"
+
+
 class TradingViewPayload(BaseModel):
     timestamp: str | None = None
     symbol: str = "XAUUSD"
@@ -174,25 +215,52 @@ def mt5_order(payload: MT5OrderInput) -> dict:
 
 
 @app.post("/training/start")
-def training_start() -> dict:
-    started = online_trainer.start()
-    return {"started": started, "running": online_trainer.status().running}
+def training_start(payload: TrainingStartInput | None = None) -> dict:
+    global training_backend
+    payload = payload or TrainingStartInput()
+    if training_backend.status().running:
+        return {"started": False, "running": True}
+    if payload.mode == "process":
+        cpus = tuple(payload.cpu_affinity) if payload.cpu_affinity else None
+        training_backend = TrainingWorker(
+            WorkerConfig(
+                experience_path=settings.experience_path,
+                segmented=settings.experience_segmented,
+                cpu_affinity=cpus,
+                niceness=payload.niceness,
+            )
+        )
+    else:
+        training_backend = online_trainer
+    started = training_backend.start()
+    return {"started": started, "running": training_backend.status().running, "mode": payload.mode}
 
 
 @app.post("/training/stop")
 def training_stop() -> dict:
-    stopped = online_trainer.stop()
-    return {"stopped": stopped, "running": online_trainer.status().running}
+    stopped = training_backend.stop()
+    return {"stopped": stopped, "running": training_backend.status().running}
+
+
+@app.post("/training/experience")
+def training_experience(payload: ExperienceInput) -> dict[str, int]:
+    experience_buffer.append(Experience(**payload.model_dump()))
+    return {"replay_size": len(experience_buffer)}
 
 
 @app.get("/training/status")
 def training_status() -> dict:
-    st = online_trainer.status()
+    st = training_backend.status()
     return {
+        "mode": "process" if isinstance(training_backend, TrainingWorker) else "thread",
         "running": st.running,
         "steps": st.steps,
         "last_loss": st.last_loss,
         "last_update_ts": st.last_update_ts,
+        "experiences": st.experiences,
+        "queue_depth": st.queue_depth,
+        "experiences_per_s": st.experiences_per_s,
+        "steps_per_s": st.steps_per_s,
     }
 
 
@@ -235,3 +303,54 @@ def get_signal(payload: SignalRequest) -> dict:
     result = out.__dict__
     result["price_source"] = live_tick.source if payload.price is None and live_tick else "manual"
     return result
+
+
+@app.post("/signal/xauusd/batch")
+def get_signal_batch(payload: SignalBatchRequest) -> dict:
+    items = payload.items
+    n = len(items)
+    n_votes = max(len(it.votes) for it in items)
+    # Filas con menos votos se rellenan con peso 0 (no alteran el voto ponderado).
+    vote_probs = np.zeros((n, n_votes, 3))
+    vote_conf = np.zeros((n, n_votes))
+    vote_weight = np.zeros((n, n_votes))
+    timeframes = np.full((n, n_votes), "", dtype=object)
+    for i, it in enumerate(items):
+        for j, v in enumerate(it.votes):
+            vote_probs[i, j] = v.probs
+            vote_conf[i, j] = v.confidence
+            vote_weight[i, j] = v.weight
+            timeframes[i, j] = v.timeframe
+
+    fundamentals = {
+        f: np.array(
+            [getattr(it.fundamentals, f) if it.fundamentals is not None else None for it in items],
+            dtype=np.float64,
+        )
+        for f in FUNDAMENTAL_FIELDS
+    }
+
+    live_tick = price_provider.get_tick("XAUUSD") if any(it.price is None for it in items) else None
+    if any(it.price is None for it in items) and live_tick is None:
+        raise HTTPException(status_code=503, detail="No se pudo determinar precio automático de XAUUSD")
+    prices = np.array([it.price if it.price is not None else live_tick.last for it in items])
+
+    batch = engine.infer_batch(
+        price=prices,
+        atr=np.array([it.atr for it in items]),
+        vote_probs=vote_probs,
+        vote_confidence=vote_conf,
+        vote_weight=vote_weight,
+        timeframes=timeframes,
+        d1_probs=np.array([it.d1_probs for it in items], dtype=np.float64),
+        pattern_quality=np.array([it.pattern_quality for it in items]),
+        regime=np.array([it.regime for it in items], dtype=object),
+        fundamentals=fundamentals,
+        chaikin_ok=np.array([it.chaikin_ok for it in items]),
+    )
+    return {
+        "instrument": batch.instrument,
+        "n": n,
+        **batch.to_columns(),
+        "price_source": ["manual" if it.price is not None else live_tick.source for it in items],
+    }
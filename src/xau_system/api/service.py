@@ -1,10 +1,32 @@
 from __future__ import annotations
 
+from typing import Mapping, Sequence
+
+import numpy as np
+
 from xau_system.config import Settings
-from xau_system.ensemble.consensus import TimeframeVote, apply_multitimeframe_gate, weighted_vote
-from xau_system.features.fundamental import FundamentalSnapshot, compute_fundamental_bias
-from xau_system.risk.position_sizing import compute_sl_tp, profit_target_pct, risk_fraction
-from xau_system.utils.types import SignalOutput
+from xau_system.ensemble.consensus import (
+    TimeframeVote,
+    apply_multitimeframe_gate,
+    apply_multitimeframe_gate_vectorized,
+    weighted_vote,
+    weighted_vote_vectorized,
+)
+from xau_system.features.fundamental import (
+    FUNDAMENTAL_FIELDS,
+    FundamentalSnapshot,
+    compute_fundamental_bias,
+    compute_fundamental_bias_vectorized,
+)
+from xau_system.risk.position_sizing import (
+    compute_sl_tp,
+    compute_sl_tp_vectorized,
+    profit_target_pct,
+    profit_target_pct_vectorized,
+    risk_fraction,
+    risk_fraction_vectorized,
+)
+from xau_system.utils.types import SignalBatch, SignalOutput
 
 
 class SignalEngine:
@@ -42,6 +64,28 @@ class SignalEngine:
 
         return SignalEngine._normalize(adj)
 
+    @staticmethod
+    def _apply_bias_and_volume_confirmation_vectorized(
+        probs: np.ndarray,
+        signal: np.ndarray,
+        fundamental_bias: np.ndarray,
+        chaikin_ok: np.ndarray,
+    ) -> np.ndarray:
+        b0, b1, b2 = probs[:, 0], probs[:, 1], probs[:, 2]
+        f = fundamental_bias
+        fa = np.abs(f)
+        a0 = np.where(f > 0, b0 + 0.08 * f, np.where(f < 0, b0 - 0.05 * fa, b0))
+        a1 = np.where(f > 0, b1 - 0.05 * f, np.where(f < 0, b1 + 0.08 * fa, b1))
+
+        weak = (signal != 2) & ~chaikin_ok
+        a2 = np.where(weak, b2 + 0.12, b2)
+        a0 = np.where(weak & (signal == 0), a0 - 0.08, a0)
+        a1 = np.where(weak & (signal == 1), a1 - 0.08, a1)
+
+        a0, a1, a2 = (np.maximum(1e-6, a) for a in (a0, a1, a2))
+        s = a0 + a1 + a2
+        return np.stack([a0 / s, a1 / s, a2 / s], axis=1)
+
     def infer_from_probabilities(
         self,
         price: float,
@@ -62,13 +106,15 @@ class SignalEngine:
             probs_d1=d1_probs,
             buy_th=self.settings.buy_threshold,
             sell_th=self.settings.sell_threshold,
+            confirm_th=self.settings.confirm_threshold,
+            d1_veto_th=self.settings.d1_veto_threshold,
         )
 
         f_bias = compute_fundamental_bias(fundamentals or FundamentalSnapshot())
         agg = self._apply_bias_and_volume_confirmation(agg, signal, f_bias, chaikin_ok)
 
         confidence = max(agg)
-        risk = risk_fraction(confidence, regime, pattern_quality)
+        risk = risk_fraction(confidence, regime, pattern_quality, self.settings.risk_base, self.settings.risk_max)
         tp_pct = profit_target_pct(confidence)
         sl, tp = compute_sl_tp(price, atr, signal, tp_pct=tp_pct)
 
@@ -82,3 +128,85 @@ class SignalEngine:
             targets=(tp, tp),
             risk_fraction=risk,
         )
+
+    def infer_batch(
+        self,
+        price: np.ndarray,
+        atr: np.ndarray,
+        vote_probs: np.ndarray,
+        vote_confidence: np.ndarray,
+        vote_weight: np.ndarray,
+        timeframes: Sequence[str] | np.ndarray,
+        d1_probs: np.ndarray,
+        pattern_quality: np.ndarray | float = 0.5,
+        regime: np.ndarray | str = "range",
+        fundamentals: Mapping[str, np.ndarray] | None = None,
+        fundamental_bias: np.ndarray | None = None,
+        chaikin_ok: np.ndarray | bool = True,
+    ) -> SignalBatch:
+        """
+        ``infer_from_probabilities`` para N señales con arrays: ``vote_probs`` (N, V, 3),
+        confianza/peso (N, V) o (V,), ``timeframes`` (V,) o (N, V) y ``d1_probs`` (N, 3).
+        Los fundamentales llegan como columnas (NaN = ausente) o como ``fundamental_bias``
+        ya calculado. Filas con menos votos se rellenan con peso 0. Mismo resultado que
+        la ruta escalar, fila a fila.
+        """
+        vote_probs = np.asarray(vote_probs, dtype=np.float64)
+        n, n_votes = vote_probs.shape[:2]
+        price = np.broadcast_to(np.asarray(price, dtype=np.float64), (n,))
+        atr = np.broadcast_to(np.asarray(atr, dtype=np.float64), (n,))
+        d1_probs = np.asarray(d1_probs, dtype=np.float64)
+        chaikin_ok = np.broadcast_to(np.asarray(chaikin_ok, dtype=bool), (n,))
+
+        agg = weighted_vote_vectorized(vote_probs, vote_confidence, vote_weight)
+        tfs = np.asarray(timeframes, dtype=object)
+        rows = np.arange(n)
+
+        def _first(tf: str) -> np.ndarray:
+            # Primer voto de ese timeframe (como ``next(...)`` escalar) o el agregado.
+            if n_votes == 0:
+                return agg
+            if tfs.ndim == 1:
+                hits = np.flatnonzero(tfs == tf)
+                return vote_probs[:, hits[0]] if len(hits) else agg
+            mask = tfs == tf
+            has = mask.any(axis=1)
+            return np.where(has[:, None], vote_probs[rows, mask.argmax(axis=1)], agg)
+
+        signal = apply_multitimeframe_gate_vectorized(
+            probs_1h=_first("1H"),
+            probs_4h=_first("4H"),
+            probs_d1=d1_probs,
+            buy_th=self.settings.buy_threshold,
+            sell_th=self.settings.sell_threshold,
+            confirm_th=self.settings.confirm_threshold,
+            d1_veto_th=self.settings.d1_veto_threshold,
+        )
+
+        if fundamental_bias is None:
+            cols = fundamentals or {}
+            fundamental_bias = compute_fundamental_bias_vectorized(*(cols.get(k) for k in FUNDAMENTAL_FIELDS))
+            if len(fundamental_bias) == 0:
+                fundamental_bias = np.zeros(n)
+        f_bias = np.broadcast_to(np.asarray(fundamental_bias, dtype=np.float64), (n,))
+        agg = self._apply_bias_and_volume_confirmation_vectorized(agg, signal, f_bias, chaikin_ok)
+
+        confidence = agg.max(axis=1)
+        risk = risk_fraction_vectorized(
+            confidence, regime, pattern_quality, self.settings.risk_base, self.settings.risk_max
+        )
+        tp_pct = profit_target_pct_vectorized(confidence)
+        sl, tp = compute_sl_tp_vectorized(price, atr, signal, tp_pct)
+
+        pad = 0.15 * np.maximum(atr, 1e-6)
+        return SignalBatch(
+            instrument=self.settings.instrument,
+            signal=signal,
+            confidence=confidence,
+            entry_low=price - pad,
+            entry_high=price + pad,
+            stop_low=sl - pad,
+            stop_high=sl + pad,
+            target=tp,
+            risk_fraction=risk,
+        )
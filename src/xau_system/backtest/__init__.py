@@ -0,0 +1 @@
+"""Backtesting y evaluación sobre datos históricos."""
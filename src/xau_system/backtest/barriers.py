@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from typing import Callable
+
+import numpy as np
+
+HIT_NONE, HIT_UPPER, HIT_LOWER, HIT_BOTH = 0, 1, 2, 3
+
+
+def first_true(
+    start: np.ndarray,
+    horizon: int | np.ndarray,
+    n_bars: int,
+    predicate: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    first_block: int = 16,
+    max_block: int = 1024,
+) -> np.ndarray:
+    """
+    Para cada fila, primer desplazamiento ``k`` en ``[0, horizon)`` con
+    ``predicate(start + k)`` cierto, o -1. Se evalúa por bloques de desplazamientos
+    crecientes sólo sobre las filas aún sin resolver, así el coste es proporcional al
+    tiempo real hasta el evento y no al horizonte completo.
+
+    ``predicate(idx, rows)`` recibe índices de barra (m, b) y las filas activas (m,).
+    """
+    start = np.asarray(start, dtype=np.int64)
+    horizon = np.broadcast_to(np.asarray(horizon, dtype=np.int64), start.shape)
+    out = np.full(len(start), -1, dtype=np.int64)
+    active = np.flatnonzero(horizon > 0)
+    k0, block = 0, first_block
+    max_h = int(horizon.max()) if len(horizon) else 0
+    while len(active) and k0 < max_h:
+        offs = np.arange(k0, min(k0 + block, max_h), dtype=np.int64)
+        idx = start[active, None] + offs[None, :]
+        valid = (idx < n_bars) & (offs[None, :] < horizon[active, None])
+        hit = predicate(np.minimum(idx, n_bars - 1), active) & valid
+        found = hit.any(axis=1)
+        out[active[found]] = k0 + hit[found].argmax(axis=1)
+        # Filas sin evento que ya agotaron horizonte o datos.
+        exhausted = (start[active] + offs[-1] >= n_bars - 1) | (offs[-1] >= horizon[active] - 1)
+        active = active[~found & ~exhausted]
+        k0 += len(offs)
+        block = min(block * 2, max_block)
+    return out
+
+
+def first_barrier_hit(
+    high: np.ndarray,
+    low: np.ndarray,
+    start: np.ndarray,
+    upper: np.ndarray,
+    lower: np.ndarray,
+    horizon: int | np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Primera barra desde ``start`` cuyo máximo toca ``upper`` o cuyo mínimo toca
+    ``lower``. Devuelve (desplazamiento o -1, tipo ``HIT_*``); si ambas barreras se
+    tocan en la misma barra el orden intrabar es desconocido y se marca ``HIT_BOTH``.
+    """
+    upper = np.asarray(upper, dtype=np.float64)
+    lower = np.asarray(lower, dtype=np.float64)
+
+    def touched(idx: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        return (high[idx] >= upper[rows, None]) | (low[idx] <= lower[rows, None])
+
+    off = first_true(start, horizon, len(high), touched)
+    kind = np.full(len(off), HIT_NONE, dtype=np.int8)
+    hit = off >= 0
+    bar = np.asarray(start, dtype=np.int64)[hit] + off[hit]
+    up = high[bar] >= upper[hit]
+    dn = low[bar] <= lower[hit]
+    kind[hit] = np.where(up & dn, HIT_BOTH, np.where(up, HIT_UPPER, HIT_LOWER))
+    return off, kind
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from xau_system.backtest.barriers import HIT_BOTH, HIT_LOWER, HIT_UPPER, first_barrier_hit, first_true
+from xau_system.backtest.metrics import TradingMetrics, drawdown_curve, trading_metrics
+from xau_system.data.loader import MarketFrame
+from xau_system.utils.types import SignalBatch
+
+BUY, SELL, NEUTRAL = 0, 1, 2
+EXIT_REASONS = ("target", "stop", "timeout")
+
+
+@dataclass
+class BacktestConfig:
+    initial_equity: float = 10_000.0
+    entry_window: int = 5  # barras que vive la orden límite en entry_zone
+    max_holding: int = 1440  # barras máximas en posición (incluida la de entrada)
+    spread: float = 0.0  # en precio; una columna "spread" del frame tiene prioridad
+    slippage: float = 0.0  # en la entrada
+    stop_slippage: float = 0.0  # adicional en salidas por stop (orden a mercado)
+    periods_per_year: int = 252
+
+
+@dataclass
+class TradeSignals:
+    """Señales alineadas con las barras: la de la fila ``i`` se emite al cierre de ``i``."""
+
+    side: np.ndarray  # int8: 0 BUY, 1 SELL, 2 NEUTRAL
+    entry_low: np.ndarray
+    entry_high: np.ndarray
+    stop: np.ndarray
+    target: np.ndarray
+    risk_fraction: np.ndarray
+
+    @classmethod
+    def from_batch(cls, batch: SignalBatch) -> "TradeSignals":
+        return cls(
+            side=batch.signal,
+            entry_low=batch.entry_low,
+            entry_high=batch.entry_high,
+            stop=(batch.stop_low + batch.stop_high) / 2.0,
+            target=batch.target,
+            risk_fraction=batch.risk_fraction,
+        )
+
+
+@dataclass
+class BacktestResult:
+    trades: pd.DataFrame
+    equity: np.ndarray
+    drawdown: np.ndarray
+    timestamp: np.ndarray  # int64 ns UTC
+    metrics: TradingMetrics
+
+
+def _bars(frame: MarketFrame) -> tuple[np.ndarray, ...]:
+    df = frame.data
+    ts = pd.DatetimeIndex(pd.to_datetime(df["timestamp"], utc=True)).as_unit("ns").asi8
+    cols = [df[c].to_numpy(dtype=np.float64) for c in ("open", "high", "low", "close")]
+    return (ts, *cols)
+
+
+def _candidates(sig: TradeSignals) -> np.ndarray:
+    side = np.asarray(sig.side)
+    ok = (side != NEUTRAL) & np.isfinite(sig.entry_low) & np.isfinite(sig.entry_high)
+    return np.flatnonzero(ok & np.isfinite(sig.stop) & np.isfinite(sig.target))
+
+
+def _vectorized_trades(o, h, l, c, half, sig: TradeSignals, cfg: BacktestConfig) -> dict[str, np.ndarray]:
+    n = len(c)
+    cand = _candidates(sig)
+    el, eh = np.asarray(sig.entry_low, dtype=np.float64), np.asarray(sig.entry_high, dtype=np.float64)
+
+    # 1) Entrada: primera barra (tras la señal) cuyo rango toca entry_zone.
+    def in_zone(idx: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        r = cand[rows]
+        return (l[idx] <= eh[r, None]) & (h[idx] >= el[r, None])
+
+    eoff = first_true(cand + 1, cfg.entry_window, n, in_zone)
+    fill_bar = cand + 1 + eoff
+    # Una señal nueva sustituye a la orden pendiente: vale si se llena antes.
+    next_cand = np.r_[cand[1:], np.iinfo(np.int64).max]
+    ok = (eoff >= 0) & (fill_bar <= next_cand)
+    cand, fill_bar = cand[ok], fill_bar[ok]
+
+    side = np.asarray(sig.side)[cand]
+    stop, target = np.asarray(sig.stop, dtype=np.float64)[cand], np.asarray(sig.target, dtype=np.float64)[cand]
+    fill = np.clip(o[fill_bar], el[cand], eh[cand])
+    buy = side == BUY
+
+    # 2) Salida: stop/target intrabar desde la barra de entrada (ambos en la misma barra -> stop).
+    upper = np.where(buy, target, stop)
+    lower = np.where(buy, stop, target)
+    off, kind = first_barrier_hit(h, l, fill_bar, upper, lower, cfg.max_holding)
+    hit = off >= 0
+    exit_bar = np.where(hit, fill_bar + off, np.minimum(fill_bar + cfg.max_holding - 1, n - 1))
+    stop_hit = hit & ((kind == HIT_BOTH) | np.where(buy, kind == HIT_LOWER, kind == HIT_UPPER))
+    reason = np.where(stop_hit, 1, np.where(hit, 0, 2)).astype(np.int8)
+    gap_open = o[exit_bar]
+    stop_px = np.where(exit_bar > fill_bar, np.where(buy, np.minimum(stop, gap_open), np.maximum(stop, gap_open)), stop)
+    raw_exit = np.where(reason == 1, stop_px, np.where(reason == 0, target, c[exit_bar]))
+
+    return _costs_and_select(cand, side, fill_bar, fill, exit_bar, raw_exit, reason, stop, half, sig, cfg)
+
+
+def _costs_and_select(cand, side, fill_bar, fill, exit_bar, raw_exit, reason, stop, half, sig, cfg) -> dict[str, np.ndarray]:
+    buy = side == BUY
+    stop_slip = np.where(reason == 1, cfg.stop_slippage, 0.0)
+    entry_px = np.where(buy, fill + half[fill_bar] + cfg.slippage, fill - half[fill_bar] - cfg.slippage)
+    exit_px = np.where(buy, raw_exit - half[exit_bar] - stop_slip, raw_exit + half[exit_bar] + stop_slip)
+    pnl = np.where(buy, exit_px - entry_px, entry_px - exit_px)
+    risk = np.asarray(sig.risk_fraction, dtype=np.float64)[cand]
+    ret = risk * pnl / np.maximum(np.abs(fill - stop), 1e-9)
+
+    # 3) Una posición a la vez: salto a la primera señal emitida en o tras la salida.
+    taken = []
+    k, nxt = 0, 0
+    while True:
+        k = int(np.searchsorted(cand, nxt, side="left"))
+        if k >= len(cand):
+            break
+        taken.append(k)
+        nxt = int(exit_bar[k])
+    t = np.asarray(taken, dtype=np.int64)
+    return {
+        "signal_row": cand[t],
+        "side": side[t],
+        "entry_row": fill_bar[t],
+        "entry_price": entry_px[t],
+        "exit_row": exit_bar[t],
+        "exit_price": exit_px[t],
+        "reason": reason[t],
+        "return": ret[t],
+    }
+
+
+def _reference_trades(o, h, l, c, half, sig: TradeSignals, cfg: BacktestConfig) -> dict[str, np.ndarray]:
+    """Bucle barra a barra en Python puro con las mismas reglas; sirve de verificación."""
+    o, h, l, c, half = (a.tolist() for a in (o, h, l, c, half))
+    n = len(c)
+    side_arr = np.asarray(sig.side).tolist()
+    el, eh = np.asarray(sig.entry_low, dtype=np.float64).tolist(), np.asarray(sig.entry_high, dtype=np.float64).tolist()
+    stops, targets = np.asarray(sig.stop, dtype=np.float64).tolist(), np.asarray(sig.target, dtype=np.float64).tolist()
+    risks = np.asarray(sig.risk_fraction, dtype=np.float64).tolist()
+    valid = set(_candidates(sig).tolist())
+    trades: dict[str, list] = {k: [] for k in ("signal_row", "side", "entry_row", "entry_price", "exit_row", "exit_price", "reason", "return")}
+
+    pending = None
+    pos = None
+    for j in range(n):
+        if pending is not None and pos is None:
+            i = pending
+            if j > i + cfg.entry_window:
+                pending = None
+            elif l[j] <= eh[i] and h[j] >= el[i]:
+                fill = min(max(o[j], el[i]), eh[i])
+                pos = (i, j, fill)
+                pending = None
+
+        if pos is not None:
+            i, f, fill = pos
+            is_buy = side_arr[i] == BUY
+            stop, target = stops[i], targets[i]
+            up = h[j] >= (target if is_buy else stop)
+            dn = l[j] <= (stop if is_buy else target)
+            reason = None
+            if up or dn:
+                stop_hit = (up and dn) or (dn if is_buy else up)
+                if stop_hit:
+                    reason, raw = 1, stop
+                    if j > f:
+                        raw = min(stop, o[j]) if is_buy else max(stop, o[j])
+                else:
+                    reason, raw = 0, target
+            elif j == f + cfg.max_holding - 1 or j == n - 1:
+                reason, raw = 2, c[j]
+
+            if reason is not None:
+                slip = cfg.stop_slippage if reason == 1 else 0.0
+                if is_buy:
+                    entry_px = fill + half[f] + cfg.slippage
+                    exit_px = raw - half[j] - slip
+                    pnl = exit_px - entry_px
+                else:
+                    entry_px = fill - half[f] - cfg.slippage
+                    exit_px = raw + half[j] + slip
+                    pnl = entry_px - exit_px
+                for key, val in (
+                    ("signal_row", i),
+                    ("side", side_arr[i]),
+                    ("entry_row", f),
+                    ("entry_price", entry_px),
+                    ("exit_row", j),
+                    ("exit_price", exit_px),
+                    ("reason", reason),
+                    ("return", risks[i] * pnl / max(abs(fill - stop), 1e-9)),
+                ):
+                    trades[key].append(val)
+                pos = None
+
+        if pos is None and j in valid:
+            pending = j
+
+    dtypes = {"signal_row": np.int64, "side": np.int8, "entry_row": np.int64, "exit_row": np.int64, "reason": np.int8}
+    return {k: np.asarray(v, dtype=dtypes.get(k, np.float64)) for k, v in trades.items()}
+
+
+def run_backtest_arrays(
+    timestamp: np.ndarray,
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    signals: TradeSignals | SignalBatch,
+    config: BacktestConfig | None = None,
+    spread: np.ndarray | None = None,
+    mode: str = "vectorized",
+) -> BacktestResult:
+    """Como ``run_backtest`` sobre arrays (p.ej. vistas en memoria compartida)."""
+    cfg = config or BacktestConfig()
+    sig = TradeSignals.from_batch(signals) if isinstance(signals, SignalBatch) else signals
+    o, h, l, c = (np.asarray(a, dtype=np.float64) for a in (open_, high, low, close))
+    if len(sig.side) != len(c):
+        raise ValueError("Las señales deben estar alineadas con las barras")
+    half = np.full(len(c), cfg.spread / 2.0) if spread is None else np.asarray(spread, dtype=np.float64) / 2.0
+
+    if mode == "vectorized":
+        tr = _vectorized_trades(o, h, l, c, half, sig, cfg)
+    elif mode == "reference":
+        tr = _reference_trades(o, h, l, c, half, sig, cfg)
+    else:
+        raise ValueError("mode debe ser 'vectorized' o 'reference'")
+
+    # Equity realizada al cierre de cada operación (producto secuencial, igual en ambos modos).
+    after = np.multiply.accumulate(np.r_[cfg.initial_equity, 1.0 + tr["return"]])
+    k = np.searchsorted(tr["exit_row"], np.arange(len(c)), side="right")
+    equity = after[k]
+
+    trades = pd.DataFrame(tr)
+    trades["side"] = np.asarray(["BUY", "SELL", "NEUTRAL"])[trades["side"].to_numpy(dtype=np.int64)]
+    trades["reason"] = np.asarray(EXIT_REASONS)[trades["reason"].to_numpy(dtype=np.int64)]
+    metrics = trading_metrics(tr["return"], equity, timestamp, cfg.periods_per_year)
+    return BacktestResult(trades=trades, equity=equity, drawdown=drawdown_curve(equity), timestamp=timestamp, metrics=metrics)
+
+
+def run_backtest(
+    frame: MarketFrame,
+    signals: TradeSignals | SignalBatch,
+    config: BacktestConfig | None = None,
+    mode: str = "vectorized",
+) -> BacktestResult:
+    """
+    Simula entradas límite en ``entry_zone`` y salidas por stop/target con máximo y
+    mínimo intrabar, spread y slippage; una posición a la vez con riesgo
+    ``risk_fraction`` del equity hasta el stop. ``mode="reference"`` ejecuta el bucle
+    en Python puro con las mismas reglas y debe dar exactamente las mismas operaciones.
+    """
+    ts, o, h, l, c = _bars(frame)
+    spread = frame.data["spread"].to_numpy(dtype=np.float64) if "spread" in frame.data else None
+    return run_backtest_arrays(ts, o, h, l, c, signals, config, spread=spread, mode=mode)
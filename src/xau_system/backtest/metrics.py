@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+_DAY_NS = 86_400 * 1_000_000_000
+
+
+@dataclass
+class TradingMetrics:
+    """Métricas de trading de la sección 12.2 de la arquitectura."""
+
+    net_return: float
+    sharpe: float
+    sortino: float
+    max_drawdown: float
+    win_rate: float
+    payoff_ratio: float
+    expectancy: float
+    profit_factor: float
+    n_trades: int
+
+    def to_dict(self) -> dict[str, float]:
+        return asdict(self)
+
+
+def drawdown_curve(equity: np.ndarray) -> np.ndarray:
+    """Drawdown (<= 0) respecto del máximo previo de la curva de equity."""
+    peak = np.maximum.accumulate(equity)
+    return equity / peak - 1.0
+
+
+def daily_returns(equity: np.ndarray, timestamps_ns: np.ndarray) -> np.ndarray:
+    """Rendimientos del equity al cierre de cada día UTC con barras."""
+    day = np.asarray(timestamps_ns, dtype=np.int64) // _DAY_NS
+    last = np.flatnonzero(np.r_[day[1:] != day[:-1], True])
+    closes = equity[last]
+    return np.diff(closes) / closes[:-1]
+
+
+def _ratio(num: float, den: float) -> float:
+    if den == 0:
+        return float("inf") if num > 0 else 0.0
+    return num / den
+
+
+def trading_metrics(
+    trade_returns: np.ndarray,
+    equity: np.ndarray,
+    timestamps_ns: np.ndarray,
+    periods_per_year: int = 252,
+) -> TradingMetrics:
+    """
+    ``trade_returns``: rendimiento de cada operación sobre el equity; ``equity``: curva
+    por barra. Sharpe/Sortino se anualizan sobre rendimientos diarios del equity.
+    """
+    r = np.asarray(trade_returns, dtype=np.float64)
+    equity = np.asarray(equity, dtype=np.float64)
+    daily = daily_returns(equity, timestamps_ns) if len(equity) else np.empty(0)
+
+    sharpe = sortino = 0.0
+    if len(daily) > 1 and daily.std(ddof=1) > 0:
+        sharpe = float(daily.mean() / daily.std(ddof=1) * np.sqrt(periods_per_year))
+    downside = np.minimum(daily, 0.0)
+    if len(daily) > 1 and np.any(downside < 0):
+        sortino = float(daily.mean() / np.sqrt(np.mean(downside**2)) * np.sqrt(periods_per_year))
+
+    wins, losses = r[r > 0], r[r < 0]
+    avg_win = float(wins.mean()) if len(wins) else 0.0
+    avg_loss = float(-losses.mean()) if len(losses) else 0.0
+    return TradingMetrics(
+        net_return=float(equity[-1] / equity[0] - 1.0) if len(equity) else 0.0,
+        sharpe=sharpe,
+        sortino=sortino,
+        max_drawdown=float(-drawdown_curve(equity).min()) if len(equity) else 0.0,
+        win_rate=float(len(wins) / len(r)) if len(r) else 0.0,
+        payoff_ratio=_ratio(avg_win, avg_loss),
+        expectancy=float(r.mean()) if len(r) else 0.0,
+        profit_factor=_ratio(float(wins.sum()), float(-losses.sum())),
+        n_trades=int(len(r)),
+    )
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, fields
+import hashlib
+from itertools import product
+import json
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+from xau_system.api.service import SignalEngine
+from xau_system.backtest.engine import BacktestConfig, TradeSignals, run_backtest_arrays
+from xau_system.config import Settings
+from xau_system.utils.persistence import open_ndjson_writer
+
+# Campos de ``Settings`` que cambian el resultado del barrido: umbrales y gates de
+# ``infer_batch`` y el riesgo por operación de ``risk_fraction*`` (el mismo que usa
+# la API). El resto (``risk_high``, ``neutral_threshold``, ``lookback_bars``, ...) no
+# interviene.
+SWEEPABLE_PARAMS = frozenset(
+    {"buy_threshold", "sell_threshold", "confirm_threshold", "d1_veto_threshold", "risk_base", "risk_max"}
+)
+
+
+@dataclass
+class SweepData:
+    """Barras y probabilidades precalculadas, alineadas fila a fila."""
+
+    timestamp: np.ndarray  # int64 ns
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    atr: np.ndarray
+    vote_probs: np.ndarray  # (n, V, 3)
+    vote_confidence: np.ndarray  # (n, V)
+    vote_weight: np.ndarray  # (V,) o (n, V)
+    d1_probs: np.ndarray  # (n, 3)
+    fundamental_bias: np.ndarray
+    chaikin_ok: np.ndarray
+    timeframes: tuple[str, ...] = ("1H", "4H", "D1")
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name != "timeframes"}
+
+    def fingerprint(self) -> str:
+        """Hash del contenido (forma, dtype y bytes de cada array, y timeframes)."""
+        h = hashlib.sha1(json.dumps(list(self.timeframes)).encode("utf-8"))
+        for name, arr in self.arrays().items():
+            arr = np.ascontiguousarray(arr)
+            h.update(f"{name}:{arr.dtype.str}:{arr.shape}".encode("utf-8"))
+            h.update(arr.data)
+        return h.hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+
+@dataclass(frozen=True)
+class Fold:
+    fold: int
+    train: tuple[int, int]  # [inicio, fin) en filas
+    test: tuple[int, int]
+
+
+def walk_forward_folds(n: int, n_folds: int = 5, expanding: bool = True) -> list[Fold]:
+    """
+    Divide ``n`` filas en ``n_folds + 1`` bloques: el fold ``k`` prueba en el bloque
+    ``k + 1`` y entrena en el bloque ``k`` (o en ``0..k`` si ``expanding``).
+    """
+    edges = np.linspace(0, n, n_folds + 2).astype(int)
+    return [
+        Fold(k, (int(edges[0] if expanding else edges[k]), int(edges[k + 1])), (int(edges[k + 1]), int(edges[k + 2])))
+        for k in range(n_folds)
+    ]
+
+
+def param_grid(**values: Iterable[Any]) -> list[dict[str, Any]]:
+    """
+    Producto cartesiano: ``param_grid(buy_threshold=[0.6, 0.65], confirm_threshold=[0.55, 0.6])``.
+    Sólo admite ``SWEEPABLE_PARAMS``: barrer un campo sin efecto daría filas idénticas.
+    """
+    keys = sorted(values)
+    unknown = set(keys) - SWEEPABLE_PARAMS
+    if unknown:
+        raise ValueError(f"Parámetros sin efecto en el barrido: {sorted(unknown)}; admitidos: {sorted(SWEEPABLE_PARAMS)}")
+    return [dict(zip(keys, combo)) for combo in product(*(list(values[k]) for k in keys))]
+
+
+class SharedArrays:
+    """Bloques de ``multiprocessing.shared_memory`` con los arrays de ``SweepData``."""
+
+    def __init__(self, arrays: dict[str, np.ndarray]):
+        self._blocks: list[shared_memory.SharedMemory] = []
+        self.specs: dict[str, tuple[str, tuple[int, ...], str]] = {}
+        for name, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+            shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+            self._blocks.append(shm)
+            self.specs[name] = (shm.name, arr.shape, arr.dtype.str)
+
+    def close(self) -> None:
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks.clear()
+
+
+def attach_shared(specs: dict[str, tuple[str, tuple[int, ...], str]]) -> tuple[dict[str, np.ndarray], list]:
+    """Vistas sin copia sobre los bloques creados por ``SharedArrays`` en otro proceso."""
+    views, handles = {}, []
+    for name, (shm_name, shape, dtype) in specs.items():
+        # Los workers comparten el resource tracker del padre, que es quien hace unlink.
+        shm = shared_memory.SharedMemory(name=shm_name)
+        handles.append(shm)
+        views[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    return views, handles
+
+
+_WORKER: dict[str, Any] = {}
+
+
+def _init_worker(specs, timeframes, bt_config) -> None:
+    views, handles = attach_shared(specs)
+    _WORKER.update(arrays=views, handles=handles, timeframes=timeframes, bt_config=bt_config)
+
+
+def _init_local(data: SweepData, bt_config: BacktestConfig) -> None:
+    _WORKER.update(arrays=data.arrays(), handles=[], timeframes=data.timeframes, bt_config=bt_config)
+
+
+def evaluate_params(
+    arrays: dict[str, np.ndarray],
+    timeframes: tuple[str, ...],
+    params: dict[str, Any],
+    start: int,
+    end: int,
+    bt_config: BacktestConfig,
+) -> dict[str, float]:
+    """
+    Señales con ``Settings(**params)`` sobre las filas ``[start, end)`` y backtest,
+    con la misma ruta que la API (incluido el riesgo por operación).
+    """
+    sl = slice(start, end)
+    settings = Settings(**params)
+    weight = arrays["vote_weight"]
+    batch = SignalEngine(settings).infer_batch(
+        price=arrays["close"][sl],
+        atr=arrays["atr"][sl],
+        vote_probs=arrays["vote_probs"][sl],
+        vote_confidence=arrays["vote_confidence"][sl],
+        vote_weight=weight if weight.ndim == 1 else weight[sl],
+        timeframes=list(timeframes),
+        d1_probs=arrays["d1_probs"][sl],
+        fundamental_bias=arrays["fundamental_bias"][sl],
+        chaikin_ok=arrays["chaikin_ok"][sl],
+    )
+    sig = TradeSignals.from_batch(batch)
+    res = run_backtest_arrays(
+        arrays["timestamp"][sl], arrays["open"][sl], arrays["high"][sl], arrays["low"][sl], arrays["close"][sl], sig, bt_config
+    )
+    return res.metrics.to_dict()
+
+
+def _task_id(params: dict[str, Any], fold: int, segment: str, start: int, end: int, context: dict[str, Any]) -> str:
+    """``context`` (huella de los datos y ``BacktestConfig``) evita reutilizar checkpoints de otro barrido."""
+    payload = json.dumps(
+        {"params": params, "fold": fold, "segment": segment, "range": [start, end], "context": context}, sort_keys=True
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _run_task(task: dict[str, Any]) -> dict[str, Any]:
+    metrics = evaluate_params(
+        _WORKER["arrays"], _WORKER["timeframes"], task["params"], task["start"], task["end"], _WORKER["bt_config"]
+    )
+    return {**task, **metrics}
+
+
+class SweepRunner:
+    """
+    Barrido de parámetros de ``Settings`` (umbrales, gates 4H/D1, riesgo) sobre folds
+    walk-forward. Los arrays se publican una vez en memoria compartida y cada worker
+    crea vistas sin copiar; cada resultado se añade al checkpoint NDJSON en cuanto
+    termina, y al relanzar se omiten las tareas ya presentes.
+    """
+
+    def __init__(
+        self,
+        data: SweepData,
+        backtest_config: BacktestConfig | None = None,
+        n_workers: int = 0,
+        checkpoint_path: str | Path | None = None,
+    ):
+        self.data = data
+        self.backtest_config = backtest_config or BacktestConfig()
+        self.n_workers = n_workers
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self._context = {"data": data.fingerprint(), "backtest": asdict(self.backtest_config)}
+
+    def _load_checkpoint(self) -> dict[str, dict[str, Any]]:
+        if self.checkpoint_path is None or not self.checkpoint_path.exists():
+            return {}
+        done = {}
+        with self.checkpoint_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # línea truncada por una interrupción
+                done[row["task_id"]] = row
+        return done
+
+    def tasks(self, grid: list[dict[str, Any]], folds: list[Fold] | None = None) -> list[dict[str, Any]]:
+        segments = [(-1, "full", 0, len(self.data))]
+        if folds:
+            segments = [(f.fold, seg, *rng) for f in folds for seg, rng in (("train", f.train), ("test", f.test))]
+        out = []
+        for params in grid:
+            for fold, segment, start, end in segments:
+                tid = _task_id(params, fold, segment, start, end, self._context)
+                out.append({"task_id": tid, "params": params, "fold": fold, "segment": segment, "start": start, "end": end})
+        return out
+
+    def run(self, grid: list[dict[str, Any]], folds: list[Fold] | None = None) -> pd.DataFrame:
+        done = self._load_checkpoint()
+        pending = [t for t in self.tasks(grid, folds) if t["task_id"] not in done]
+        writer = open_ndjson_writer(self.checkpoint_path, background=False) if self.checkpoint_path else None
+        rows = list(done.values())
+        try:
+            for row in self._execute(pending):
+                rows.append(row)
+                if writer is not None:
+                    writer.write(row)
+        finally:
+            if writer is not None:
+                writer.close()
+        wanted = {t["task_id"] for t in self.tasks(grid, folds)}
+        return pd.DataFrame([r for r in rows if r["task_id"] in wanted])
+
+    def _execute(self, tasks: list[dict[str, Any]]):
+        if not tasks:
+            return
+        if self.n_workers <= 1:
+            _init_local(self.data, self.backtest_config)
+            for task in tasks:
+                yield _run_task(task)
+            return
+
+        shared = SharedArrays(self.data.arrays())
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                initializer=_init_worker,
+                initargs=(shared.specs, self.data.timeframes, self.backtest_config),
+            ) as pool:
+                futures = [pool.submit(_run_task, t) for t in tasks]
+                for fut in as_completed(futures):
+                    yield fut.result()
+        finally:
+            shared.close()
+
+
+def walk_forward_summary(results: pd.DataFrame, objective: str = "sharpe") -> pd.DataFrame:
+    """Por fold: parámetros con mejor ``objective`` en train y sus métricas fuera de muestra."""
+    res = results.assign(params_key=results["params"].map(lambda p: json.dumps(p, sort_keys=True)))
+    train = res[res["segment"] == "train"]
+    test = res[res["segment"] == "test"].set_index(["fold", "params_key"])
+    rows = []
+    for fold, grp in train.groupby("fold"):
+        best = grp.sort_values(objective, ascending=False, kind="stable").iloc[0]
+        oos = test.loc[(fold, best["params_key"])]
+        rows.append(
+            {
+                "fold": int(fold),
+                "params": best["params"],
+                f"train_{objective}": float(best[objective]),
+                **{f"test_{k}": oos[k] for k in ("net_return", "sharpe", "sortino", "max_drawdown", "profit_factor", "n_trades")},
+            }
+        )
+    return pd.DataFrame(rows)
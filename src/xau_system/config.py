@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 
+from xau_system.utils.segmented_log import SegmentConfig
+
 
 @dataclass
 class Settings:
@@ -11,3 +13,21 @@ class Settings:
     buy_threshold: float = 0.62
     sell_threshold: float = 0.62
     neutral_threshold: float = 0.50
+    confirm_threshold: float = 0.60  # probabilidad mínima en 4H para confirmar
+    d1_veto_threshold: float = 0.50  # probabilidad contraria en D1 que veta la señal
+    # Log de experiencias para el entrenamiento online. Con ``experience_segmented``
+    # ``experience_path`` es el directorio de un log segmentado (``utils.segmented_log``).
+    experience_path: str = "data/experiences.ndjson"
+    experience_segmented: bool = False
+    experience_segment_max_bytes: int = 64 * 1024 * 1024
+    experience_segment_max_age_s: float | None = 86_400.0
+    experience_retain_segments: int | None = None
+
+    def experience_segments(self) -> SegmentConfig | None:
+        if not self.experience_segmented:
+            return None
+        return SegmentConfig(
+            max_segment_bytes=self.experience_segment_max_bytes,
+            max_segment_age_s=self.experience_segment_max_age_s,
+            retain_segments=self.experience_retain_segments,
+        )
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable
+
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+from xau_system.data.loader import MarketFrame
+from xau_system.data.realtime import MarketBar, RealTimeBuffer, RealTimeCollector, datetime_to_ns, ns_to_datetime
+
+# Etiquetas usadas en el sistema -> alias de pandas.
+TIMEFRAME_ALIASES = {
+    "M1": "1min",
+    "M5": "5min",
+    "M15": "15min",
+    "M30": "30min",
+    "1H": "1h",
+    "H1": "1h",
+    "4H": "4h",
+    "H4": "4h",
+    "D1": "1D",
+}
+
+_NS_PER_DAY = 86_400_000_000_000
+
+
+def timeframe_to_ns(timeframe: str) -> int:
+    return int(to_offset(TIMEFRAME_ALIASES.get(timeframe, timeframe)).nanos)
+
+
+@dataclass
+class _OpenBar:
+    bucket: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    compensation: float = 0.0
+
+    def add_volume(self, v: float) -> None:
+        # Suma compensada (Kahan) igual que el groupby-sum de pandas.
+        y = v - self.compensation
+        t = self.volume + y
+        self.compensation = t - self.volume - y
+        if self.compensation != self.compensation:
+            self.compensation = 0.0
+        self.volume = t
+
+
+class _TimeframeState:
+    def __init__(self, timeframe: str, history: int):
+        self.timeframe = timeframe
+        self.freq_ns = timeframe_to_ns(timeframe)
+        self.origin_ns: int | None = None
+        self.current: _OpenBar | None = None
+        self.closed = RealTimeBuffer(maxlen=history, persist_path=None)
+
+    def label(self, bucket: int) -> int:
+        return self.origin_ns + bucket * self.freq_ns
+
+
+class MultiTimeframeAggregator:
+    """
+    Agregador incremental OHLCV para varios timeframes, O(1) por barra entrante.
+
+    Replica ``resample_frame`` (bins cerrados/etiquetados a la izquierda, origen a
+    medianoche UTC del primer bar, sin buckets vacíos) siempre que las barras lleguen
+    ordenadas; las barras atrasadas se descartan y se cuentan en ``late_bars``.
+    Al abrir un bucket nuevo emite el anterior como "bar closed".
+    """
+
+    def __init__(self, timeframes: list[str] | tuple[str, ...] = ("1H", "4H", "D1"), history: int = 5000):
+        self._states = {tf: _TimeframeState(tf, history) for tf in timeframes}
+        self._callbacks: list[Callable[[str, MarketBar], None]] = []
+        self.late_bars = 0
+
+    @property
+    def timeframes(self) -> list[str]:
+        return list(self._states)
+
+    def attach(self, collector: RealTimeCollector) -> None:
+        collector.register_callback(self.on_bar)
+
+    def register_close_callback(self, fn: Callable[[str, MarketBar], None]) -> None:
+        self._callbacks.append(fn)
+
+    def on_bar(self, bar: MarketBar) -> None:
+        ts = datetime_to_ns(bar.timestamp)
+        for st in self._states.values():
+            if st.origin_ns is None:
+                st.origin_ns = ts - ts % _NS_PER_DAY
+            bucket = (ts - st.origin_ns) // st.freq_ns
+            cur = st.current
+            if cur is not None and bucket < cur.bucket:
+                self.late_bars += 1
+                continue
+            if cur is None or bucket != cur.bucket:
+                if cur is not None:
+                    self._close(st)
+                st.current = _OpenBar(bucket, bar.open, bar.high, bar.low, bar.close, 0.0)
+                st.current.add_volume(bar.volume)
+                continue
+            cur.high = max(cur.high, bar.high)
+            cur.low = min(cur.low, bar.low)
+            cur.close = bar.close
+            cur.add_volume(bar.volume)
+
+    def _to_bar(self, st: _TimeframeState, ob: _OpenBar) -> MarketBar:
+        return MarketBar(
+            timestamp=ns_to_datetime(st.label(ob.bucket)),
+            open=ob.open,
+            high=ob.high,
+            low=ob.low,
+            close=ob.close,
+            volume=ob.volume,
+            source=f"agg:{st.timeframe}",
+        )
+
+    def _close(self, st: _TimeframeState) -> None:
+        bar = self._to_bar(st, st.current)
+        st.closed.append(bar)
+        st.current = None
+        for cb in self._callbacks:
+            cb(st.timeframe, bar)
+
+    def current(self, timeframe: str) -> MarketBar | None:
+        st = self._states[timeframe]
+        return self._to_bar(st, st.current) if st.current is not None else None
+
+    def closed(self, timeframe: str) -> RealTimeBuffer:
+        """Barras cerradas del timeframe (buffer columnar, ``window(n)`` sin copia)."""
+        return self._states[timeframe].closed
+
+    def to_frame(self, timeframe: str, include_open: bool = True) -> MarketFrame:
+        """Mismo formato que ``resample_frame``: cerradas (+ la abierta si ``include_open``)."""
+        st = self._states[timeframe]
+        df = st.closed.window(copy=True).to_frame()
+        cur = self.current(timeframe) if include_open else None
+        if cur is not None:
+            row = pd.DataFrame(
+                {
+                    "timestamp": [pd.Timestamp(cur.timestamp)],
+                    "open": [cur.open],
+                    "high": [cur.high],
+                    "low": [cur.low],
+                    "close": [cur.close],
+                    "volume": [cur.volume],
+                }
+            )
+            df = pd.concat([df, row], ignore_index=True) if len(df) else row
+        return MarketFrame(timeframe=timeframe, data=df)
+
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+from datetime import datetime
+import json
+from pathlib import Path
+
+import numpy as np
+
+from xau_system.data.realtime import BarWindow, MarketBar, datetime_to_ns
+
+BAR_DTYPE = np.dtype(
+    [
+        ("timestamp", "<i8"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+        ("volume", "<f8"),
+    ]
+)
+_MAGIC = b"XAUBARS1"
+_HEADER_SIZE = 64
+_IDX_DTYPE = np.dtype([("timestamp", "<i8"), ("row", "<i8")])
+
+
+def _to_ns(ts: datetime | int | np.integer) -> int:
+    return datetime_to_ns(ts) if isinstance(ts, datetime) else int(ts)
+
+
+def records_to_window(records: np.ndarray) -> BarWindow:
+    """Vista columnar (sin copia, con stride) sobre registros ``BAR_DTYPE``."""
+    return BarWindow(*(records[f] for f in BAR_DTYPE.names))
+
+
+class _Segment:
+    def __init__(self, path: Path):
+        self.path = path
+        self.idx_path = path.with_suffix(".idx")
+        self._mm: np.memmap | None = None
+        self._mm_rows = -1
+        self._idx: np.ndarray | None = None
+        self._idx_rows = -1
+
+    @property
+    def rows(self) -> int:
+        return max(0, (self.path.stat().st_size - _HEADER_SIZE) // BAR_DTYPE.itemsize)
+
+    def records(self) -> np.ndarray:
+        rows = self.rows
+        if rows != self._mm_rows:
+            self._mm = (
+                np.memmap(self.path, dtype=BAR_DTYPE, mode="r", offset=_HEADER_SIZE, shape=(rows,))
+                if rows
+                else np.empty(0, dtype=BAR_DTYPE)
+            )
+            self._mm_rows = rows
+        return self._mm
+
+    def index(self) -> np.ndarray:
+        size = self.idx_path.stat().st_size // _IDX_DTYPE.itemsize if self.idx_path.exists() else 0
+        if size != self._idx_rows:
+            self._idx = np.fromfile(self.idx_path, dtype=_IDX_DTYPE, count=size) if size else np.empty(0, _IDX_DTYPE)
+            self._idx_rows = size
+        return self._idx
+
+    def bounds(self, start_ns: int, end_ns: int) -> tuple[int, int]:
+        """Filas [lo, hi) con start <= ts < end, acotando primero con el índice disperso."""
+        recs = self.records()
+        idx = self.index()
+        n = len(recs)
+        # Bloques candidatos desde el índice disperso; luego búsqueda binaria dentro del bloque.
+        i0 = int(np.searchsorted(idx["timestamp"], start_ns, side="right")) - 1
+        j0 = int(np.searchsorted(idx["timestamp"], end_ns, side="left"))
+        lo_base = int(idx["row"][i0]) if i0 >= 0 else 0
+        hi_base = int(idx["row"][j0]) if j0 < len(idx) else n
+        ts = recs["timestamp"]
+        lo = lo_base + int(np.searchsorted(ts[lo_base:hi_base], start_ns, side="left"))
+        hi = lo_base + int(np.searchsorted(ts[lo_base:hi_base], end_ns, side="left"))
+        return lo, hi
+
+
+class BinaryBarStore:
+    """
+    Almacén append-only de barras en segmentos binarios de ancho fijo (48 bytes/barra),
+    leído vía ``mmap``. Cada segmento tiene un índice disperso (timestamp, fila) cada
+    ``index_every`` registros. ``range`` y ``tail`` devuelven arrays estructurados
+    ``BAR_DTYPE`` sin parseo (vistas si caen en un solo segmento).
+    """
+
+    def __init__(self, root: str | Path, segment_rows: int = 1_000_000, index_every: int = 1024):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.segment_rows = segment_rows
+        self.index_every = index_every
+        self._segments = [_Segment(p) for p in sorted(self.root.glob("seg_*.bars"))]
+        self._last_ts: int | None = None
+        for seg in reversed(self._segments):
+            recs = seg.records()
+            if len(recs):
+                self._last_ts = int(recs["timestamp"][-1])
+                break
+
+    def __len__(self) -> int:
+        return sum(seg.rows for seg in self._segments)
+
+    @property
+    def last_timestamp(self) -> int | None:
+        return self._last_ts
+
+    def _new_segment(self) -> _Segment:
+        path = self.root / f"seg_{len(self._segments):06d}.bars"
+        header = _MAGIC + np.array([BAR_DTYPE.itemsize], dtype="<i8").tobytes()
+        path.write_bytes(header.ljust(_HEADER_SIZE, b"\0"))
+        seg = _Segment(path)
+        self._segments.append(seg)
+        return seg
+
+    def append(self, bar: MarketBar) -> None:
+        rec = np.array(
+            [(datetime_to_ns(bar.timestamp), bar.open, bar.high, bar.low, bar.close, bar.volume)],
+            dtype=BAR_DTYPE,
+        )
+        self.append_records(rec)
+
+    def append_records(self, records: np.ndarray) -> int:
+        """Añade registros ordenados; timestamps deben ser estrictamente crecientes."""
+        records = np.asarray(records, dtype=BAR_DTYPE)
+        if not len(records):
+            return 0
+        ts = records["timestamp"]
+        if np.any(np.diff(ts) <= 0) or (self._last_ts is not None and ts[0] <= self._last_ts):
+            raise ValueError("Timestamps no estrictamente crecientes en BinaryBarStore")
+
+        pos = 0
+        while pos < len(records):
+            seg = self._segments[-1] if self._segments else None
+            if seg is None or seg.rows >= self.segment_rows:
+                seg = self._new_segment()
+            start_row = seg.rows
+            chunk = records[pos : pos + (self.segment_rows - start_row)]
+            rows = start_row + np.arange(len(chunk))
+            marks = rows % self.index_every == 0
+            with seg.path.open("ab") as f:
+                f.write(chunk.tobytes())
+            if marks.any():
+                idx = np.empty(int(marks.sum()), dtype=_IDX_DTYPE)
+                idx["timestamp"] = chunk["timestamp"][marks]
+                idx["row"] = rows[marks]
+                with seg.idx_path.open("ab") as f:
+                    f.write(idx.tobytes())
+            pos += len(chunk)
+
+        self._last_ts = int(ts[-1])
+        return len(records)
+
+    def range(self, start: datetime | int, end: datetime | int) -> np.ndarray:
+        """Barras con ``start <= timestamp < end`` (ns UTC o datetime)."""
+        start_ns, end_ns = _to_ns(start), _to_ns(end)
+        parts = []
+        for seg in self._segments:
+            recs = seg.records()
+            if not len(recs) or recs["timestamp"][-1] < start_ns or recs["timestamp"][0] >= end_ns:
+                continue
+            lo, hi = seg.bounds(start_ns, end_ns)
+            if hi > lo:
+                parts.append(recs[lo:hi])
+        if not parts:
+            return np.empty(0, dtype=BAR_DTYPE)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def tail(self, n: int) -> np.ndarray:
+        parts = []
+        remaining = n
+        for seg in reversed(self._segments):
+            if remaining <= 0:
+                break
+            recs = seg.records()
+            take = recs[max(0, len(recs) - remaining) :]
+            parts.append(take)
+            remaining -= len(take)
+        if not parts:
+            return np.empty(0, dtype=BAR_DTYPE)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts[::-1])
+
+
+def convert_ndjson_to_store(ndjson_path: str | Path, store: BinaryBarStore, batch_rows: int = 100_000) -> int:
+    """
+    Conversión one-shot de un NDJSON de ``RealTimeBuffer`` al almacén binario.
+    Descarta líneas corruptas y barras no posteriores a la última ya almacenada.
+    """
+    written = 0
+    last = store.last_timestamp
+    batch: list[tuple] = []
+
+    def _flush() -> int:
+        if not batch:
+            return 0
+        n = store.append_records(np.array(batch, dtype=BAR_DTYPE))
+        batch.clear()
+        return n
+
+    with Path(ndjson_path).open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+                ts = datetime_to_ns(datetime.fromisoformat(str(row["timestamp"]).replace("Z", "+00:00")))
+                rec = (ts, row["open"], row["high"], row["low"], row["close"], row["volume"])
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                continue
+            if last is not None and ts <= last:
+                continue
+            batch.append(rec)
+            last = ts
+            if len(batch) >= batch_rows:
+                written += _flush()
+    return written + _flush()
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+import os
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+
+from xau_system.data.loader import MarketFrame
+
+_REQUIRED = ["timestamp", "open", "high", "low", "close", "volume"]
+
+
+def _as_utc(ts: datetime | str | pd.Timestamp | None) -> pd.Timestamp | None:
+    if ts is None:
+        return None
+    out = pd.Timestamp(ts)
+    return out.tz_localize("UTC") if out.tzinfo is None else out.tz_convert("UTC")
+
+
+class ParquetHistoricalStore:
+    """
+    Histórico OHLCV particionado por timeframe y fecha:
+    ``root/timeframe=<tf>/date=YYYY-MM-DD/part.parquet``.
+
+    La lectura poda particiones por fecha y aplica el filtro temporal y la proyección
+    de columnas en pyarrow; la ingesta sólo reescribe los días que recibe.
+    Requiere el extra opcional ``parquet`` (pyarrow).
+    """
+
+    def __init__(self, root: str | Path = "data/history"):
+        self.root = Path(root)
+
+    def _tf_dir(self, timeframe: str) -> Path:
+        return self.root / f"timeframe={timeframe}"
+
+    def _part_path(self, timeframe: str, day: date) -> Path:
+        return self._tf_dir(timeframe) / f"date={day.isoformat()}" / "part.parquet"
+
+    def partitions(self, timeframe: str) -> list[date]:
+        base = self._tf_dir(timeframe)
+        if not base.exists():
+            return []
+        days = [date.fromisoformat(p.name.split("=", 1)[1]) for p in base.glob("date=*") if (p / "part.parquet").exists()]
+        return sorted(days)
+
+    def ingest_frame(self, df: pd.DataFrame, timeframe: str) -> int:
+        """Fusiona ``df`` con las particiones de los días que toca; devuelve filas recibidas."""
+        missing = set(_REQUIRED) - set(df.columns)
+        if missing:
+            raise ValueError(f"Faltan columnas requeridas: {missing}")
+        if df.empty:
+            return 0
+        df = df[_REQUIRED].copy()
+        df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+        for c in _REQUIRED[1:]:
+            df[c] = df[c].astype("float64")
+
+        for day, part in df.groupby(df["timestamp"].dt.date, sort=True):
+            path = self._part_path(timeframe, day)
+            if path.exists():
+                part = pd.concat([pd.read_parquet(path), part], ignore_index=True)
+            # Orden estable sobre [existente, nuevo]: ante una barra repetida gana la ingesta más reciente.
+            part = part.sort_values("timestamp", kind="stable").drop_duplicates("timestamp", keep="last")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            part.reset_index(drop=True).to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+        return len(df)
+
+    def ingest_csv(self, path: str | Path, timeframe: str, chunksize: int = 1_000_000) -> int:
+        """Ingesta incremental por chunks: memoria acotada, sin reescribir días no tocados."""
+        total = 0
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            total += self.ingest_frame(chunk, timeframe)
+        return total
+
+    def _files(self, timeframe: str, start: pd.Timestamp | None, end: pd.Timestamp | None) -> list[Path]:
+        days = self.partitions(timeframe)
+        if start is not None:
+            days = [d for d in days if d >= start.date()]
+        if end is not None:
+            days = [d for d in days if d <= end.date()]
+        return [self._part_path(timeframe, d) for d in days]
+
+    @staticmethod
+    def _filters(start: pd.Timestamp | None, end: pd.Timestamp | None) -> list[tuple] | None:
+        filters = []
+        if start is not None:
+            filters.append(("timestamp", ">=", start.to_pydatetime()))
+        if end is not None:
+            filters.append(("timestamp", "<", end.to_pydatetime()))
+        return filters or None
+
+    @staticmethod
+    def _columns(columns: list[str] | None) -> list[str]:
+        if columns is None:
+            return list(_REQUIRED)
+        return ["timestamp"] + [c for c in columns if c != "timestamp"]
+
+    def read(
+        self,
+        timeframe: str,
+        start: datetime | str | None = None,
+        end: datetime | str | None = None,
+        columns: list[str] | None = None,
+    ) -> MarketFrame:
+        """Barras con ``start <= timestamp < end``; ``columns`` proyecta (timestamp siempre incluido)."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        start_ts, end_ts = _as_utc(start), _as_utc(end)
+        cols = self._columns(columns)
+        tables = [
+            pq.read_table(f, columns=cols, filters=self._filters(start_ts, end_ts))
+            for f in self._files(timeframe, start_ts, end_ts)
+        ]
+        if not tables:
+            return MarketFrame(timeframe=timeframe, data=pd.DataFrame({c: [] for c in cols}))
+        df = pa.concat_tables(tables).to_pandas()
+        return MarketFrame(timeframe=timeframe, data=df.reset_index(drop=True))
+
+    def iter_chunks(
+        self,
+        timeframe: str,
+        start: datetime | str | None = None,
+        end: datetime | str | None = None,
+        columns: list[str] | None = None,
+        batch_rows: int = 500_000,
+    ) -> Iterator[MarketFrame]:
+        """Itera el rango en lotes de hasta ``batch_rows`` filas (datos mayores que la RAM)."""
+        import pyarrow.parquet as pq
+
+        start_ts, end_ts = _as_utc(start), _as_utc(end)
+        cols = self._columns(columns)
+        for f in self._files(timeframe, start_ts, end_ts):
+            for batch in pq.ParquetFile(f).iter_batches(batch_size=batch_rows, columns=cols):
+                df = batch.to_pandas()
+                if start_ts is not None:
+                    df = df[df["timestamp"] >= start_ts]
+                if end_ts is not None:
+                    df = df[df["timestamp"] < end_ts]
+                if len(df):
+                    yield MarketFrame(timeframe=timeframe, data=df.reset_index(drop=True))
@@ -29,10 +29,9 @@ class BufferPriceProvider:
         self.buffer = buffer
 
     def get_tick(self, symbol: str = "XAUUSD") -> PriceTick | None:
-        latest = self.buffer.latest(1)
-        if not latest:
+        bar = self.buffer.last()
+        if bar is None:
             return None
-        bar = latest[-1]
         return PriceTick(
             symbol=symbol,
             bid=bar.close,
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 import asyncio
-from collections import deque
 from dataclasses import dataclass, asdict
-from datetime import datetime, timezone
-import json
+from datetime import datetime, timedelta, timezone
+import logging
 from pathlib import Path
+import threading
 from typing import AsyncIterator, Callable
 
+import numpy as np
+import pandas as pd
+
+from xau_system.utils.persistence import RowWriter, open_ndjson_writer
+
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class MarketBar:
@@ -20,30 +27,177 @@ class MarketBar:
     source: str = "realtime"
 
 
-class RealTimeBuffer:
-    """Buffer circular para barras en vivo y escritura NDJSON para entrenamiento."""
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_US = timedelta(microseconds=1)
+_FIELDS = ("open", "high", "low", "close", "volume")
+OVERFLOW_SOURCE = "other"  # etiqueta en memoria de las fuentes que no caben en la tabla
+_MAX_SOURCE_CODES = int(np.iinfo(np.int16).max) + 1
+
+
+def datetime_to_ns(ts: datetime) -> int:
+    """Convierte un datetime (naive = hora local, como astimezone) a int64 ns UTC."""
+    return ((ts.astimezone(timezone.utc) - _EPOCH) // _US) * 1000
+
+
+def ns_to_datetime(ns: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=int(ns) // 1000)
+
 
-    def __init__(self, maxlen: int = 5000, persist_path: str | None = "data/realtime_xauusd.ndjson"):
-        self._buf: deque[MarketBar] = deque(maxlen=maxlen)
+@dataclass
+class BarWindow:
+    """Ventana columnar de barras: arrays contiguos, de solo lectura si son vistas."""
+
+    timestamp: np.ndarray  # int64, ns UTC
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def to_frame(self) -> pd.DataFrame:
+        data = {"timestamp": pd.to_datetime(self.timestamp, unit="ns", utc=True)}
+        for f in _FIELDS:
+            data[f] = getattr(self, f)
+        return pd.DataFrame(data)
+
+
+class RealTimeBuffer:
+    """
+    Buffer circular columnar (un array NumPy por campo) para barras en vivo
+    y escritura NDJSON para entrenamiento.
+
+    Cada valor se escribe dos veces (posición ``i`` y ``i + maxlen``), de modo que
+    las últimas ``n`` barras siempre forman un slice contiguo: ``window(n)`` es
+    O(1) y sin copia, ``latest(n)`` es O(n). La persistencia se delega a un
+    ``RowWriter`` (por defecto group-commit en segundo plano).
+
+    La fuente se guarda como código ``int16`` en una tabla de como mucho
+    ``max_sources`` entradas; a partir de ahí las fuentes nuevas se leen como
+    ``OVERFLOW_SOURCE`` (el NDJSON conserva siempre la fuente original).
+    """
+
+    def __init__(
+        self,
+        maxlen: int = 5000,
+        persist_path: str | None = "data/realtime_xauusd.ndjson",
+        writer: RowWriter | None = None,
+        max_sources: int = 256,
+    ):
+        if maxlen <= 0:
+            raise ValueError("maxlen debe ser > 0")
+        if not 2 <= max_sources <= _MAX_SOURCE_CODES:
+            raise ValueError(f"max_sources debe estar en [2, {_MAX_SOURCE_CODES}]")
+        self.maxlen = maxlen
+        self.max_sources = max_sources
+        self._ts = np.zeros(2 * maxlen, dtype=np.int64)
+        self._cols = {f: np.zeros(2 * maxlen, dtype=np.float64) for f in _FIELDS}
+        self._src = np.zeros(2 * maxlen, dtype=np.int16)
+        self._sources: list[str] = []
+        self._source_codes: dict[str, int] = {}
+        self._head = 0  # próxima posición de escritura en [0, maxlen)
+        self._size = 0
+        self._lock = threading.Lock()
+        self._listeners: list[Callable[[MarketBar], None]] = []
         self.persist_path = Path(persist_path) if persist_path else None
-        if self.persist_path:
-            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        self.writer = writer
+        if self.writer is None and self.persist_path:
+            self.writer = open_ndjson_writer(self.persist_path)
+
+    def _source_code(self, source: str) -> int:
+        code = self._source_codes.get(source)
+        if code is None:
+            if len(self._sources) >= self.max_sources - 1:
+                # Se reserva la última entrada para la fuente de desbordamiento.
+                source = OVERFLOW_SOURCE
+                code = self._source_codes.get(source)
+                if code is not None:
+                    return code
+            code = len(self._sources)
+            self._sources.append(source)
+            self._source_codes[source] = code
+        return code
 
     def append(self, bar: MarketBar) -> None:
-        self._buf.append(bar)
-        if self.persist_path:
+        ts = datetime_to_ns(bar.timestamp)
+        with self._lock:
+            i, j = self._head, self._head + self.maxlen
+            self._ts[i] = self._ts[j] = ts
+            for f, col in self._cols.items():
+                col[i] = col[j] = getattr(bar, f)
+            self._src[i] = self._src[j] = self._source_code(bar.source)
+            self._head = (self._head + 1) % self.maxlen
+            self._size = min(self._size + 1, self.maxlen)
+        if self.writer is not None:
             row = asdict(bar)
             row["timestamp"] = bar.timestamp.astimezone(timezone.utc).isoformat()
-            with self.persist_path.open("a", encoding="utf-8") as f:
-                f.write(json.dumps(row) + "\n")
+            self.writer.write(row)
+        # La barra ya está guardada: un oyente que falla no debe convertir la ingesta en
+        # error ni impedir que el resto reciba el evento.
+        for fn in self._listeners:
+            try:
+                fn(bar)
+            except Exception:
+                logger.exception("Oyente de barras %r falló", fn)
+
+    def add_listener(self, fn: Callable[[MarketBar], None]) -> None:
+        """Suscribe ``fn`` a cada barra nueva (evento new-bar)."""
+        self._listeners.append(fn)
+
+    def _slice(self, n: int) -> slice:
+        n = min(n, self._size)
+        end = self._head + self.maxlen
+        return slice(end - n, end)
+
+    def window(self, n: int | None = None, copy: bool = False) -> BarWindow:
+        """
+        Últimas ``n`` barras (todas si ``n`` es None) como arrays columnares.
+        Sin ``copy`` son vistas de solo lectura, válidas hasta el siguiente ``append``.
+        """
+        n = self._size if n is None else max(0, n)
+        with self._lock:
+            sl = self._slice(n)
+            arrays = [self._ts[sl]] + [self._cols[f][sl] for f in _FIELDS]
+            if copy:
+                arrays = [a.copy() for a in arrays]
+        if not copy:
+            for a in arrays:
+                a.flags.writeable = False
+        return BarWindow(*arrays)
 
     def latest(self, n: int = 1) -> list[MarketBar]:
         if n <= 0:
             return []
-        return list(self._buf)[-n:]
+        with self._lock:
+            sl = self._slice(n)
+            ts = self._ts[sl].tolist()
+            cols = [self._cols[f][sl].tolist() for f in _FIELDS]
+            src = self._src[sl].tolist()
+        return [
+            MarketBar(ns_to_datetime(t), o, h, lo, c, v, self._sources[s])
+            for t, o, h, lo, c, v, s in zip(ts, *cols, src)
+        ]
+
+    def last(self) -> MarketBar | None:
+        bars = self.latest(1)
+        return bars[-1] if bars else None
+
+    def flush(self) -> None:
+        if self.writer is not None:
+            self.writer.flush()
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+    @property
+    def nbytes(self) -> int:
+        return self._ts.nbytes + self._src.nbytes + sum(c.nbytes for c in self._cols.values())
 
     def __len__(self) -> int:
-        return len(self._buf)
+        return self._size
 
 
 class RealTimeCollector:
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
+import numpy as np
+
 
 @dataclass
 class TimeframeVote:
@@ -40,13 +42,66 @@ def apply_multitimeframe_gate(
     probs_d1: list[float],
     buy_th: float = 0.62,
     sell_th: float = 0.62,
+    confirm_th: float = 0.60,
+    d1_veto_th: float = 0.50,
 ) -> str:
     p_buy_1h, p_sell_1h, _ = probs_1h
     p_buy_4h, p_sell_4h, _ = probs_4h
     p_buy_d1, p_sell_d1, _ = probs_d1
 
-    if p_buy_1h > buy_th and p_buy_4h > 0.60 and p_sell_d1 < 0.50:
+    if p_buy_1h > buy_th and p_buy_4h > confirm_th and p_sell_d1 < d1_veto_th:
         return "BUY"
-    if p_sell_1h > sell_th and p_sell_4h > 0.60 and p_buy_d1 < 0.50:
+    if p_sell_1h > sell_th and p_sell_4h > confirm_th and p_buy_d1 < d1_veto_th:
         return "SELL"
     return "NEUTRAL"
+
+
+def _normalize_vectorized(p: np.ndarray) -> np.ndarray:
+    pos = np.maximum(p, 0.0)
+    s = pos[..., 0] + pos[..., 1] + pos[..., 2]
+    ok = s > 0
+    out = pos / np.where(ok, s, 1.0)[..., None]
+    if not ok.all():
+        out[~ok] = (0.0, 0.0, 1.0)
+    return out
+
+
+def weighted_vote_vectorized(probs: np.ndarray, confidence: np.ndarray, weight: np.ndarray) -> np.ndarray:
+    """
+    ``weighted_vote`` sobre N señales a la vez: ``probs`` (N, V, 3), ``confidence`` y
+    ``weight`` (N, V) o (V,). Acumula voto a voto en el mismo orden que la versión
+    escalar, así que el resultado es idéntico; los votos con peso 0 no cuentan.
+    """
+    probs = np.asarray(probs, dtype=np.float64)
+    n, n_votes = probs.shape[:2]
+    if n_votes == 0:
+        return np.tile([0.0, 0.0, 1.0], (n, 1))
+    weight = np.broadcast_to(np.asarray(weight, dtype=np.float64), (n, n_votes))
+    confidence = np.broadcast_to(np.asarray(confidence, dtype=np.float64), (n, n_votes))
+    w = np.maximum(0.0, weight * confidence)
+    p = _normalize_vectorized(probs)
+    num = np.zeros((n, 3))
+    den = np.zeros(n)
+    for j in range(n_votes):
+        num = num + w[:, j, None] * p[:, j]
+        den = den + w[:, j]
+    ok = den > 0
+    out = _normalize_vectorized(num / np.where(ok, den, 1.0)[:, None])
+    if not ok.all():
+        out[~ok] = (0.0, 0.0, 1.0)
+    return out
+
+
+def apply_multitimeframe_gate_vectorized(
+    probs_1h: np.ndarray,
+    probs_4h: np.ndarray,
+    probs_d1: np.ndarray,
+    buy_th: float = 0.62,
+    sell_th: float = 0.62,
+    confirm_th: float = 0.60,
+    d1_veto_th: float = 0.50,
+) -> np.ndarray:
+    """Códigos de señal (índices de ``SIGNAL_LABELS``: 0 BUY, 1 SELL, 2 NEUTRAL) por fila."""
+    buy = (probs_1h[:, 0] > buy_th) & (probs_4h[:, 0] > confirm_th) & (probs_d1[:, 1] < d1_veto_th)
+    sell = (probs_1h[:, 1] > sell_th) & (probs_4h[:, 1] > confirm_th) & (probs_d1[:, 0] < d1_veto_th)
+    return np.where(buy, 0, np.where(sell, 1, 2)).astype(np.int8)
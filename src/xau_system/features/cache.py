@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+import hashlib
+from pathlib import Path
+import pickle
+import sys
+import threading
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from xau_system.data.realtime import MarketBar, RealTimeBuffer, datetime_to_ns
+from xau_system.features.pipeline import FeatureConfig, FeatureMatrix
+
+
+@dataclass(frozen=True)
+class FeatureKey:
+    instrument: str
+    timeframe: str
+    last_bar_ts: int  # ns UTC de la última barra cerrada
+    config_hash: str
+
+
+def make_feature_key(
+    instrument: str,
+    timeframe: str,
+    last_bar_ts: datetime | int,
+    config: FeatureConfig | str,
+) -> FeatureKey:
+    ts = datetime_to_ns(last_bar_ts) if isinstance(last_bar_ts, datetime) else int(last_bar_ts)
+    cfg_hash = config if isinstance(config, str) else config.config_hash()
+    return FeatureKey(instrument, timeframe, ts, cfg_hash)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    disk_hits: int = 0
+    evictions: int = 0
+    spills: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+
+def estimate_nbytes(value: Any) -> int:
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, FeatureMatrix):
+        return int(value.values.nbytes + value.timestamp.nbytes + sum(a.nbytes for a in value.ohlcv.values()))
+    return sys.getsizeof(value)
+
+
+class FeatureCache:
+    """
+    Caché LRU de features por (instrumento, timeframe, última barra, hash de config),
+    acotada por número de entradas y bytes. Con ``spill_dir`` las entradas expulsadas
+    se guardan en disco y se recuperan en un miss. Las barras nuevas de un
+    ``RealTimeBuffer`` adjunto invalidan las entradas anteriores de ese timeframe.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 256 * 1024 * 1024, spill_dir: str | Path | None = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        if self.spill_dir:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self._data: OrderedDict[FeatureKey, tuple[Any, int]] = OrderedDict()
+        self._spilled: dict[FeatureKey, Path] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: FeatureKey) -> bool:
+        return key in self._data or key in self._spilled
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            self._stats.entries = len(self._data)
+            self._stats.bytes = self._bytes
+            return CacheStats(**vars(self._stats))
+
+    def _spill_path(self, key: FeatureKey) -> Path:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return self.spill_dir / f"{digest}.pkl"
+
+    def _evict_locked(self) -> None:
+        while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+            key, (value, size) = self._data.popitem(last=False)
+            self._bytes -= size
+            self._stats.evictions += 1
+            if self.spill_dir is not None:
+                path = self._spill_path(key)
+                with path.open("wb") as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                self._spilled[key] = path
+                self._stats.spills += 1
+
+    def put(self, key: FeatureKey, value: Any) -> None:
+        size = estimate_nbytes(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (value, size)
+            self._bytes += size
+            self._evict_locked()
+
+    def get(self, key: FeatureKey) -> Any | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                self._data.move_to_end(key)
+                self._stats.hits += 1
+                return item[0]
+            path = self._spilled.pop(key, None)
+            if path is None:
+                self._stats.misses += 1
+                return None
+        with path.open("rb") as f:
+            value = pickle.load(f)
+        path.unlink(missing_ok=True)
+        with self._lock:
+            self._stats.hits += 1
+            self._stats.disk_hits += 1
+        self.put(key, value)
+        return value
+
+    def get_or_compute(self, key: FeatureKey, compute: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, instrument: str, timeframe: str, before_ts: int | None = None) -> int:
+        """Elimina entradas (memoria y disco) del timeframe con última barra < ``before_ts``."""
+        def stale(k: FeatureKey) -> bool:
+            return (
+                k.instrument == instrument
+                and k.timeframe == timeframe
+                and (before_ts is None or k.last_bar_ts < before_ts)
+            )
+
+        with self._lock:
+            removed = 0
+            for key in [k for k in self._data if stale(k)]:
+                self._bytes -= self._data.pop(key)[1]
+                removed += 1
+            for key in [k for k in self._spilled if stale(k)]:
+                self._spilled.pop(key).unlink(missing_ok=True)
+                removed += 1
+            self._stats.invalidations += removed
+            return removed
+
+    def attach(self, buffer: RealTimeBuffer, instrument: str = "XAUUSD", timeframe: str = "M1") -> None:
+        """Cada barra nueva del buffer invalida las features calculadas sobre barras previas."""
+        def _on_bar(bar: MarketBar) -> None:
+            self.invalidate(instrument, timeframe, before_ts=datetime_to_ns(bar.timestamp))
+
+        buffer.add_listener(_on_bar)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            for path in self._spilled.values():
+                path.unlink(missing_ok=True)
+            self._spilled.clear()
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+@dataclass(frozen=True)
+class CandleImageConfig:
+    """Geometría y colores de las imágenes de velas (sección 3.4)."""
+
+    height: int = 224
+    width: int = 224
+    volume_fraction: float = 0.2
+    body_fraction: float = 0.7
+    background: tuple[int, int, int] = (0, 0, 0)
+    up_color: tuple[int, int, int] = (38, 166, 154)
+    down_color: tuple[int, int, int] = (239, 83, 80)
+    wick_color: tuple[int, int, int] = (160, 160, 160)
+    volume_color: tuple[int, int, int] = (90, 90, 140)
+    overlay_colors: tuple[tuple[int, int, int], ...] = ((255, 215, 0), (0, 191, 255), (255, 0, 255))
+
+    def config_hash(self) -> str:
+        payload = json.dumps(asdict(self), sort_keys=True)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+_BACKGROUND, _WICK, _UP, _DOWN, _VOLUME, _OVERLAY = 0, 1, 2, 3, 4, 5
+
+
+def _palette(cfg: CandleImageConfig) -> np.ndarray:
+    """LUT etiqueta -> color como elementos de 3 bytes (un solo gather para RGB)."""
+    colors = [cfg.background, cfg.wick_color, cfg.up_color, cfg.down_color, cfg.volume_color, *cfg.overlay_colors]
+    return np.ascontiguousarray(np.asarray(colors, dtype=np.uint8)).view("V3").ravel()
+
+
+def _rows(values: np.ndarray, lo: np.ndarray, hi: np.ndarray, height: int) -> np.ndarray:
+    """Precio -> fila de píxel (0 arriba), escala min-max por imagen."""
+    span = np.where(hi > lo, hi - lo, 1.0)
+    y = np.rint((hi - values) / span * (height - 1))
+    return np.clip(y, 0, height - 1).astype(np.int32)
+
+
+def _render_block(
+    o: np.ndarray,
+    h: np.ndarray,
+    lo: np.ndarray,
+    c: np.ndarray,
+    volume: np.ndarray | None,
+    overlays: list[np.ndarray],
+    cfg: CandleImageConfig,
+) -> np.ndarray:
+    B, T = c.shape
+    H, W = cfg.height, cfg.width
+
+    vol_h = int(round(H * cfg.volume_fraction)) if volume is not None else 0
+    price_h = H - vol_h
+
+    pmin = lo.min(axis=1, keepdims=True)
+    pmax = h.max(axis=1, keepdims=True)
+    for ov in overlays:
+        # fmin/fmax ignoran NaN: un overlay sin datos (p.ej. EMA en calentamiento) no
+        # debe anular la escala de precios de su ventana.
+        pmin = np.fmin(pmin, np.fmin.reduce(ov, axis=1, keepdims=True))
+        pmax = np.fmax(pmax, np.fmax.reduce(ov, axis=1, keepdims=True))
+
+    y_high = _rows(h, pmin, pmax, price_h)[:, None, :]  # (B, 1, T)
+    y_low = _rows(lo, pmin, pmax, price_h)[:, None, :]
+    y_open = _rows(o, pmin, pmax, price_h)
+    y_close = _rows(c, pmin, pmax, price_h)
+    y_top = np.minimum(y_open, y_close)[:, None, :]
+    y_bot = np.maximum(y_open, y_close)[:, None, :]
+    body_label = np.where(c >= o, _UP, _DOWN).astype(np.uint8)[:, None, :]
+
+    # Etiquetas por columna de vela: [cuerpos (T) | mechas (T) | hueco (1)].
+    labels = np.zeros((B, H, 2 * T + 1), dtype=np.uint8)
+    r = np.arange(price_h, dtype=np.int32)[None, :, None]
+    body = (r >= y_top) & (r <= y_bot)
+    wick = (r >= y_high) & (r <= y_low)
+    body_cols = labels[:, :price_h, :T]
+    wick_cols = labels[:, :price_h, T : 2 * T]
+    np.copyto(body_cols, body_label, where=body)
+    wick_cols[wick] = _WICK
+    np.copyto(wick_cols, body_label, where=body)
+
+    if vol_h:
+        vmax = volume.max(axis=1, keepdims=True)
+        bar_h = np.rint(volume / np.where(vmax > 0, vmax, 1.0) * vol_h).astype(np.int32)
+        rv = np.arange(vol_h, dtype=np.int32)[None, :, None]
+        vmask = rv >= (vol_h - bar_h)[:, None, :]
+        labels[:, price_h:, :T][vmask] = _VOLUME
+        labels[:, price_h:, T : 2 * T][vmask] = _VOLUME
+
+    # Columna de píxel -> columna de etiqueta (cuerpo, mecha central o hueco).
+    pos = (np.arange(W) + 0.5) * T / W
+    col_candle = np.minimum(pos.astype(np.int64), T - 1)
+    is_body = np.abs(pos - col_candle - 0.5) <= cfg.body_fraction / 2.0
+    col_index = np.where(is_body, col_candle, 2 * T)
+    centers = np.minimum(((np.arange(T) + 0.5) * W / T).astype(np.int64), W - 1)
+    col_index[centers] = T + np.arange(T)
+    pixels = np.take(labels, col_index, axis=2)
+
+    bidx = np.broadcast_to(np.arange(B)[:, None], (B, W))
+    xidx = np.broadcast_to(np.arange(W)[None, :], (B, W))
+    for k, ov in enumerate(overlays[: len(cfg.overlay_colors)]):
+        ok = np.isfinite(ov)[:, col_candle]
+        y = _rows(np.nan_to_num(ov, nan=0.0), pmin, pmax, price_h)[:, col_candle]
+        pixels[bidx[ok], y[ok], xidx[ok]] = _OVERLAY + k
+
+    return np.take(_palette(cfg), pixels).view(np.uint8).reshape(B, H, W, 3)
+
+
+def render_candles(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray | None = None,
+    overlays: list[np.ndarray] | None = None,
+    config: CandleImageConfig | None = None,
+    block_size: int = 32,
+) -> np.ndarray:
+    """
+    Rasteriza un batch de ventanas OHLC (B, T) a imágenes uint8 (B, H, W, 3) sólo con
+    operaciones vectorizadas de NumPy: cuerpos, mechas, volumen opcional en la franja
+    inferior y ``overlays`` (p.ej. EMAs, shape (B, T)) como líneas de un píxel.
+
+    Se dibuja a resolución de vela (una columna "cuerpo" y una "mecha" por vela), se
+    expande a W columnas con un gather y se colorea con una LUT de 3 bytes. El batch
+    se procesa en bloques de ``block_size`` para que los intermedios quepan en caché.
+    """
+    cfg = config or CandleImageConfig()
+    o, h, lo, c = (np.atleast_2d(np.asarray(a, dtype=np.float64)) for a in (open_, high, low, close))
+    v = None if volume is None else np.atleast_2d(np.asarray(volume, dtype=np.float64))
+    ovs = [np.atleast_2d(np.asarray(x, dtype=np.float64)) for x in (overlays or [])]
+    B = c.shape[0]
+    if B <= block_size:
+        return _render_block(o, h, lo, c, v, ovs, cfg)
+
+    out = np.empty((B, cfg.height, cfg.width, 3), dtype=np.uint8)
+    for s in range(0, B, block_size):
+        sl = slice(s, s + block_size)
+        out[sl] = _render_block(o[sl], h[sl], lo[sl], c[sl], None if v is None else v[sl], [x[sl] for x in ovs], cfg)
+    return out
+
+
+def _render_chunk(args: tuple) -> np.ndarray:
+    return render_candles(*args)
+
+
+class CandleRasterizer:
+    """
+    Rasterizador batch con modo multiproceso (``n_workers > 1``) y caché en disco
+    por (timeframe, timestamp de cierre de la ventana, hash de configuración).
+    """
+
+    def __init__(
+        self,
+        config: CandleImageConfig | None = None,
+        n_workers: int = 0,
+        chunk_size: int = 256,
+        cache_dir: str | Path | None = None,
+    ):
+        self.config = config or CandleImageConfig()
+        self.n_workers = n_workers
+        self.chunk_size = chunk_size
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._pool: ProcessPoolExecutor | None = None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def render(self, open_, high, low, close, volume=None, overlays=None) -> np.ndarray:
+        B = np.atleast_2d(close).shape[0]
+        if self.n_workers <= 1 or B <= self.chunk_size:
+            return render_candles(open_, high, low, close, volume, overlays, self.config)
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.n_workers)
+        jobs = []
+        for s in range(0, B, self.chunk_size):
+            sl = slice(s, s + self.chunk_size)
+            jobs.append(
+                (
+                    open_[sl],
+                    high[sl],
+                    low[sl],
+                    close[sl],
+                    None if volume is None else volume[sl],
+                    None if overlays is None else [ov[sl] for ov in overlays],
+                    self.config,
+                )
+            )
+        return np.concatenate(list(self._pool.map(_render_chunk, jobs)))
+
+    def render_windows(
+        self,
+        ohlcv: dict[str, np.ndarray],
+        end_rows: np.ndarray,
+        window: int = 64,
+        overlays: list[np.ndarray] | None = None,
+    ) -> np.ndarray:
+        """Imágenes de las ventanas que terminan en ``end_rows`` sobre series 1D completas."""
+        starts = np.asarray(end_rows, dtype=np.int64) - window + 1
+        if (starts < 0).any():
+            raise ValueError("Ventana fuera de rango: end_rows < window - 1")
+
+        def gather(x):
+            return sliding_window_view(np.asarray(x), window)[starts]
+
+        vol = gather(ohlcv["volume"]) if "volume" in ohlcv else None
+        ovs = [gather(x) for x in overlays] if overlays else None
+        return self.render(gather(ohlcv["open"]), gather(ohlcv["high"]), gather(ohlcv["low"]), gather(ohlcv["close"]), vol, ovs)
+
+    def _cache_path(self, timeframe: str, end_ts: int, window: int, tag: str) -> Path:
+        return self.cache_dir / f"{timeframe}_{int(end_ts)}_w{int(window)}_{self.config.config_hash()}{tag}.npy"
+
+    def render_cached(
+        self,
+        timeframe: str,
+        end_timestamps: np.ndarray,
+        ohlcv: dict[str, np.ndarray],
+        end_rows: np.ndarray,
+        window: int = 64,
+        overlays: list[np.ndarray] | None = None,
+        tag: str = "",
+    ) -> np.ndarray:
+        """
+        Como ``render_windows`` pero reutiliza imágenes ya generadas en ``cache_dir``.
+        ``tag`` debe distinguir conjuntos de overlays distintos.
+        """
+        if self.cache_dir is None:
+            return self.render_windows(ohlcv, end_rows, window, overlays)
+        end_rows = np.asarray(end_rows, dtype=np.int64)
+        paths = [self._cache_path(timeframe, ts, window, tag) for ts in end_timestamps]
+        out = np.empty((len(paths), self.config.height, self.config.width, 3), dtype=np.uint8)
+        missing = []
+        for i, p in enumerate(paths):
+            if p.exists():
+                out[i] = np.load(p)
+            else:
+                missing.append(i)
+        if missing:
+            fresh = self.render_windows(ohlcv, end_rows[missing], window, overlays)
+            for i, img in zip(missing, fresh):
+                out[i] = img
+                np.save(paths[i], img)
+        return out
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
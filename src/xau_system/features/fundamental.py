@@ -2,6 +2,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
+import numpy as np
+import pandas as pd
+
 
 @dataclass
 class FundamentalSnapshot:
@@ -41,3 +44,72 @@ def compute_fundamental_bias(s: FundamentalSnapshot) -> float:
 
     norm = score / weight
     return max(-1.0, min(1.0, norm))
+
+
+FUNDAMENTAL_FIELDS = ("usd_index", "real_yield_10y", "fed_rate", "risk_aversion_score")
+
+
+def compute_fundamental_bias_vectorized(
+    usd_index: np.ndarray | None = None,
+    real_yield_10y: np.ndarray | None = None,
+    fed_rate: np.ndarray | None = None,
+    risk_aversion_score: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Versión vectorizada de ``compute_fundamental_bias``: NaN (o None) equivale a campo
+    ausente y se repondera igual que en la versión escalar, con resultado idéntico.
+    """
+    arrays = [usd_index, real_yield_10y, fed_rate, risk_aversion_score]
+    n = max((np.size(a) for a in arrays if a is not None), default=0)
+    cols = [np.full(n, np.nan) if a is None else np.broadcast_to(np.asarray(a, dtype=np.float64), (n,)) for a in arrays]
+    usd, ry, fed, risk = cols
+
+    # Mismo orden de operaciones que la versión escalar; sumar 0.0 no altera el valor.
+    terms = [
+        (usd, -0.35 * ((usd - 100.0) / 10.0), 0.35),
+        (ry, -0.35 * (ry / 2.0), 0.35),
+        (fed, -0.15 * (fed / 5.0), 0.15),
+        (risk, 0.15 * risk, 0.15),
+    ]
+    score = np.zeros(n)
+    weight = np.zeros(n)
+    for x, term, w in terms:
+        present = ~np.isnan(x)
+        score = score + np.where(present, term, 0.0)
+        weight = weight + np.where(present, w, 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        norm = np.where(weight == 0, 0.0, score / np.where(weight == 0, 1.0, weight))
+    return np.clip(norm, -1.0, 1.0)
+
+
+def asof_join_fundamentals(bar_timestamps: np.ndarray | pd.Series, releases: pd.DataFrame) -> pd.DataFrame:
+    """
+    As-of (backward) join: para cada barra, el último valor publicado de cada campo con
+    ``timestamp <= barra``. ``releases`` tiene ``timestamp`` y cualquier subconjunto de
+    ``FUNDAMENTAL_FIELDS`` (NaN = no publicado en esa fila). O((n + m) log m).
+    """
+    bars = pd.to_datetime(pd.Series(bar_timestamps), utc=True)
+    bar_ns = pd.DatetimeIndex(bars).as_unit("ns").asi8
+    rel_ts = pd.DatetimeIndex(pd.to_datetime(releases["timestamp"], utc=True)).as_unit("ns").asi8
+
+    out = {"timestamp": bars.to_numpy()}
+    for field in FUNDAMENTAL_FIELDS:
+        col = np.full(len(bar_ns), np.nan)
+        if field in releases:
+            vals = releases[field].to_numpy(dtype=np.float64)
+            ok = ~np.isnan(vals)
+            ts, vals = rel_ts[ok], vals[ok]
+            order = np.argsort(ts, kind="stable")
+            ts, vals = ts[order], vals[order]
+            pos = np.searchsorted(ts, bar_ns, side="right") - 1
+            has = pos >= 0
+            col[has] = vals[pos[has]]
+        out[field] = col
+    return pd.DataFrame(out)
+
+
+def fundamental_bias_for_bars(bar_timestamps: np.ndarray | pd.Series, releases: pd.DataFrame) -> np.ndarray:
+    """Sesgo fundamental por barra a partir de publicaciones irregulares."""
+    aligned = asof_join_fundamentals(bar_timestamps, releases)
+    return compute_fundamental_bias_vectorized(*(aligned[f].to_numpy() for f in FUNDAMENTAL_FIELDS))
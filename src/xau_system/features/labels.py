@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+
+import numpy as np
+import pandas as pd
+
+from xau_system.data.loader import MarketFrame
+from xau_system.features.pipeline import _rolling_mean
+from xau_system.risk.position_sizing import compute_sl_tp_vectorized, profit_target_pct_vectorized
+
+OUTCOME_STOP, OUTCOME_TIMEOUT, OUTCOME_TARGET = -1, 0, 1
+
+
+@dataclass
+class BarrierLabels:
+    """
+    Etiquetas triple barrera por barra (entrada al cierre). ``label`` usa los índices
+    de ``SIGNAL_LABELS`` (0 BUY, 1 SELL, 2 NEUTRAL); ``valid`` es falso en el warm-up
+    del ATR y cuando no queda horizonte completo.
+    """
+
+    label: np.ndarray
+    long_outcome: np.ndarray
+    long_bars: np.ndarray
+    long_return: np.ndarray
+    short_outcome: np.ndarray
+    short_bars: np.ndarray
+    short_return: np.ndarray
+    tp_pct: np.ndarray
+    valid: np.ndarray
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({f.name: getattr(self, f.name) for f in fields(self)})
+
+
+def true_range_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+    """ATR como media simple del true range (igual que ``add_returns_and_atr``)."""
+    pc = np.empty_like(close)
+    pc[0] = np.nan
+    pc[1:] = close[:-1]
+    tr = np.fmax(np.fmax(np.abs(high - low), np.abs(high - pc)), np.abs(low - pc))
+    return _rolling_mean(tr, window)
+
+
+def first_touch(
+    high: np.ndarray,
+    low: np.ndarray,
+    levels: list[tuple[np.ndarray, np.ndarray]],
+    horizon: int,
+    chunk_rows: int = 1 << 16,
+) -> list[np.ndarray]:
+    """
+    Para cada fila ``i`` y cada par (``upper``, ``lower``) de ``levels``, número de
+    barras desde ``i + 1`` hasta la primera con ``high >= upper`` o ``low <= lower``
+    dentro de ``horizon`` (-1 si no hay). Por bloques de filas se construyen tablas de
+    máximos/mínimos en ventanas de 2^j barras y se avanza por saltos binarios, así el
+    coste es O(n log horizon) aunque el tiempo hasta la barrera tenga cola larga.
+    """
+    n = len(high)
+    out = [np.full(n, -1, dtype=np.int64) for _ in levels]
+    n_levels = max(1, int(horizon)).bit_length()
+    for a in range(0, n - 1, chunk_rows):
+        b = min(a + chunk_rows, n - 1)  # la última barra no tiene futuro
+        seg = slice(a + 1, min(b + horizon, n))
+        mx, mn = [high[seg]], [low[seg]]
+        # Un bloque corto (serie corta o cola del último bloque) no llena las tablas
+        # grandes; esos saltos tampoco caben en su ``limit``.
+        seg_levels = min(n_levels, len(mx[0]).bit_length())
+        for j in range(1, seg_levels):
+            half = 1 << (j - 1)
+            mx.append(np.maximum(mx[-1][:-half], mx[-1][half:]))
+            mn.append(np.minimum(mn[-1][:-half], mn[-1][half:]))
+        p = np.arange(b - a)
+        limit = np.minimum(horizon, n - 1 - np.arange(a, b))
+        for res, (upper, lower) in zip(out, levels):
+            up, lo = upper[a:b], lower[a:b]
+            pos = np.zeros(b - a, dtype=np.int64)
+            for j in range(seg_levels - 1, -1, -1):
+                step = 1 << j
+                ok = pos + step <= limit
+                idx = np.where(ok, p + pos, 0)
+                ok &= (mx[j][idx] < up) & (mn[j][idx] > lo)
+                pos += np.where(ok, step, 0)
+            hit = (pos < limit) & np.isfinite(up) & np.isfinite(lo)
+            res[a:b] = np.where(hit, pos, -1)
+    return out
+
+
+def _side(high, low, close, sl, tp, off, tp_pct, is_long: bool, horizon: int):
+    n = len(close)
+    rows = np.arange(n, dtype=np.int64)
+    hit = off >= 0
+    bar = np.minimum(rows + 1 + np.maximum(off, 0), n - 1)
+    stop_hit = low[bar] <= sl if is_long else high[bar] >= sl
+    # Si stop y objetivo se tocan en la misma barra se asume el stop, como en el backtester.
+    outcome = np.where(~hit, OUTCOME_TIMEOUT, np.where(stop_hit, OUTCOME_STOP, OUTCOME_TARGET)).astype(np.int8)
+    bars = np.where(hit, off + 1, np.minimum(horizon, n - 1 - rows))
+    exit_close = close[rows + bars]
+    move = (exit_close - close) / close if is_long else (close - exit_close) / close
+    stop_ret = (sl - close) / close if is_long else (close - sl) / close
+    ret = np.where(outcome == OUTCOME_TARGET, tp_pct, np.where(outcome == OUTCOME_STOP, stop_ret, move))
+    return outcome, bars, ret
+
+
+def triple_barrier_labels(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    atr: np.ndarray,
+    horizon: int = 240,
+    confidence: np.ndarray | None = None,
+) -> BarrierLabels:
+    """
+    Para cada barra simula un largo y un corto con las reglas de ejecución: stop a
+    1.2 ATR (``compute_sl_tp``) y objetivo ``profit_target_pct`` (2%, 3% si
+    ``confidence >= 0.80``). Devuelve qué barrera toca primero cada lado dentro de
+    ``horizon`` barras, en cuántas barras y el rendimiento realizado. BUY/SELL si el
+    objetivo de ese lado llega antes que el del otro; si no, NEUTRAL.
+    """
+    high, low, close, atr = (np.asarray(a, dtype=np.float64) for a in (high, low, close, atr))
+    conf = np.zeros(len(close)) if confidence is None else np.asarray(confidence, dtype=np.float64)
+    tp_pct = profit_target_pct_vectorized(conf)
+
+    n = len(close)
+    long_sl, long_tp = compute_sl_tp_vectorized(close, atr, np.zeros(n, dtype=np.int8), tp_pct)
+    short_sl, short_tp = compute_sl_tp_vectorized(close, atr, np.ones(n, dtype=np.int8), tp_pct)
+    long_off, short_off = first_touch(high, low, [(long_tp, long_sl), (short_sl, short_tp)], horizon)
+    lo, lb, lr = _side(high, low, close, long_sl, long_tp, long_off, tp_pct, True, horizon)
+    so, sb, sr = _side(high, low, close, short_sl, short_tp, short_off, tp_pct, False, horizon)
+    long_first = (lo == OUTCOME_TARGET) & ((so != OUTCOME_TARGET) | (lb < sb))
+    short_first = (so == OUTCOME_TARGET) & ((lo != OUTCOME_TARGET) | (sb < lb))
+    label = np.where(long_first, 0, np.where(short_first, 1, 2)).astype(np.int8)
+    valid = np.isfinite(atr) & (np.arange(n) + horizon < n)
+    return BarrierLabels(label, lo, lb, lr, so, sb, sr, tp_pct, valid)
+
+
+def label_frame(
+    frame: MarketFrame,
+    horizon: int = 240,
+    atr_window: int = 14,
+    confidence: np.ndarray | None = None,
+) -> pd.DataFrame:
+    df = frame.data
+    h, l, c = (df[k].to_numpy(dtype=np.float64) for k in ("high", "low", "close"))
+    labels = triple_barrier_labels(h, l, c, true_range_atr(h, l, c, atr_window), horizon, confidence)
+    out = labels.to_frame()
+    out.insert(0, "timestamp", df["timestamp"].to_numpy())
+    return out
+
+
+def label_timeframes(
+    frames: dict[str, MarketFrame],
+    horizons: dict[str, int] | int = 240,
+    atr_window: int = 14,
+) -> dict[str, pd.DataFrame]:
+    """Etiquetas por timeframe (p.ej. 1H/4H/D1 de ``resample_frame``), horizonte en barras de cada uno."""
+    return {
+        tf: label_frame(frame, horizons if isinstance(horizons, int) else horizons[tf], atr_window)
+        for tf, frame in frames.items()
+    }
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+ALL_FEATURES = (
+    "rsi",
+    "macd",
+    "macd_signal",
+    "macd_hist",
+    "chaikin_ad",
+    "log_return",
+    "atr",
+    "close_z",
+    "volume_rel",
+    "open_norm",
+    "high_norm",
+    "low_norm",
+    "close_norm",
+)
+
+
+@dataclass(frozen=True)
+class FeatureConfig:
+    """Configuración declarativa de columnas y parámetros del pipeline de features."""
+
+    features: tuple[str, ...] = ALL_FEATURES
+    rsi_period: int = 14
+    macd_fast: int = 12
+    macd_slow: int = 26
+    macd_signal: int = 9
+    atr_window: int = 14
+    z_window: int = 100
+    volume_window: int = 30
+
+    def __post_init__(self):
+        unknown = set(self.features) - set(ALL_FEATURES)
+        if unknown:
+            raise ValueError(f"Features desconocidas: {sorted(unknown)}")
+
+    def config_hash(self) -> str:
+        payload = json.dumps(asdict(self), sort_keys=True)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class FeatureMatrix:
+    """Resultado del pipeline: bloque (n, k) ya recortado del warm-up."""
+
+    columns: tuple[str, ...]
+    values: np.ndarray
+    timestamp: np.ndarray  # int64, ns UTC
+    ohlcv: dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def as_float32(self) -> np.ndarray:
+        return np.ascontiguousarray(self.values, dtype=np.float32)
+
+    def to_frame(self, include_ohlcv: bool = True) -> pd.DataFrame:
+        data: dict[str, object] = {"timestamp": pd.to_datetime(self.timestamp, unit="ns", utc=True)}
+        if include_ohlcv:
+            data.update(self.ohlcv)
+        for j, c in enumerate(self.columns):
+            data[c] = self.values[:, j]
+        return pd.DataFrame(data)
+
+
+def _rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    return pd.Series(x, copy=False).rolling(window).mean().to_numpy()
+
+
+def _ewm(x: np.ndarray, span: int) -> np.ndarray:
+    return pd.Series(x, copy=False).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+class FeaturePipeline:
+    """
+    Pipeline fusionado: calcula todas las columnas configuradas en un único bloque
+    NumPy preasignado y recorta el warm-up una sola vez, sin las copias de
+    ``add_technical_indicators`` -> ``add_returns_and_atr`` -> ``normalize_ohlc_by_atr``.
+    Los valores coinciden con cada función batch aplicada sobre el histórico completo.
+    """
+
+    def __init__(self, config: FeatureConfig | None = None, dtype: np.dtype | type = np.float64):
+        self.config = config or FeatureConfig()
+        # float32 reduce a la mitad el bloque y evita la copia final para el modelo.
+        self.dtype = np.dtype(dtype)
+
+    def _kernels(self, o, h, lo, c, v) -> dict[str, Callable[[], np.ndarray]]:
+        cfg = self.config
+        eps = 1e-8
+        cache: dict[str, np.ndarray] = {}
+
+        def prev_close():
+            if "prev_close" not in cache:
+                pc = np.empty_like(c)
+                pc[0] = np.nan
+                pc[1:] = c[:-1]
+                cache["prev_close"] = pc
+            return cache["prev_close"]
+
+        def macd_parts():
+            if "macd" not in cache:
+                line = _ewm(c, cfg.macd_fast) - _ewm(c, cfg.macd_slow)
+                sig = _ewm(line, cfg.macd_signal)
+                cache["macd"], cache["macd_signal"], cache["macd_hist"] = line, sig, line - sig
+            return cache
+
+        def rsi():
+            delta = c - prev_close()
+            up, down = np.where(delta > 0, delta, 0.0), np.where(delta < 0, -delta, 0.0)
+            up[0] = down[0] = np.nan  # como diff(): la primera barra no tiene delta
+            gain = _rolling_mean(up, cfg.rsi_period)
+            loss = _rolling_mean(down, cfg.rsi_period)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rs = gain / np.where(loss == 0, np.nan, loss)
+            return 100 - (100 / (1 + rs))
+
+        def chaikin():
+            hl = h - lo
+            with np.errstate(divide="ignore", invalid="ignore"):
+                mfm = np.where(hl != 0, ((c - lo) - (h - c)) / np.where(hl != 0, hl, 1.0), 0.0)
+            return np.cumsum(mfm * v)
+
+        def atr():
+            if "atr" not in cache:
+                pc = prev_close()
+                tr = np.fmax(np.fmax(np.abs(h - lo), np.abs(h - pc)), np.abs(lo - pc))
+                cache["atr"] = _rolling_mean(tr, cfg.atr_window)
+            return cache["atr"]
+
+        def close_z():
+            s = pd.Series(c, copy=False).rolling(cfg.z_window)
+            mean, std = s.mean().to_numpy(), s.std().to_numpy()
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return (c - mean) / np.where(std == 0, np.nan, std)
+
+        def volume_rel():
+            med = pd.Series(v, copy=False).rolling(cfg.volume_window).median().to_numpy()
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return v / np.where(med == 0, np.nan, med)
+
+        def log_return():
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.log(c / prev_close())
+
+        def norm(x):
+            return lambda: (x - prev_close()) / (atr() + eps)
+
+        return {
+            "rsi": rsi,
+            "macd": lambda: macd_parts()["macd"],
+            "macd_signal": lambda: macd_parts()["macd_signal"],
+            "macd_hist": lambda: macd_parts()["macd_hist"],
+            "chaikin_ad": chaikin,
+            "log_return": log_return,
+            "atr": atr,
+            "close_z": close_z,
+            "volume_rel": volume_rel,
+            "open_norm": norm(o),
+            "high_norm": norm(h),
+            "low_norm": norm(lo),
+            "close_norm": norm(c),
+        }
+
+    def compute(self, df: pd.DataFrame) -> FeatureMatrix:
+        n = len(df)
+        cols = self.config.features
+        # Vistas sobre las columnas del frame (sin copia si ya son float64).
+        ohlcv = {name: df[name].to_numpy(dtype=np.float64) for name in ("open", "high", "low", "close", "volume")}
+
+        block = np.empty((n, len(cols)), dtype=self.dtype)
+        kernels = self._kernels(*ohlcv.values())
+        for j, name in enumerate(cols):
+            block[:, j] = kernels[name]()
+        del kernels
+
+        valid = np.isfinite(block).all(axis=1)
+        ts = pd.DatetimeIndex(pd.to_datetime(df["timestamp"], utc=True)).as_unit("ns").asi8
+        first = int(np.argmax(valid)) if valid.any() else n
+        if valid[first:].all():
+            sel: slice | np.ndarray = slice(first, n)
+        else:
+            sel = valid
+        return FeatureMatrix(
+            columns=tuple(cols),
+            values=block[sel],
+            timestamp=ts[sel],
+            ohlcv={k: a[sel] for k, a in ohlcv.items()},
+        )
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self.compute(df).to_frame()
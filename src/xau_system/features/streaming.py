@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections import deque
+import math
+from typing import Any
+
+NAN = float("nan")
+
+
+class RollingMean:
+    """Media móvil O(1) (suma corrida); NaN hasta tener ``window`` valores."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self._values: deque[float] = deque()
+        self._sum = 0.0
+
+    def update(self, x: float) -> float:
+        self._values.append(x)
+        self._sum += x
+        if len(self._values) > self.window:
+            self._sum -= self._values.popleft()
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self._sum / self.window if len(self._values) == self.window else NAN
+
+    def state(self) -> dict[str, Any]:
+        return {"window": self.window, "values": list(self._values)}
+
+    def load_state(self, state: dict[str, Any]) -> None:
+        self.window = state["window"]
+        self._values = deque(state["values"])
+        # Se recalcula la suma para no arrastrar error acumulado.
+        self._sum = math.fsum(self._values)
+
+
+class RollingMeanStd:
+    """Media y desviación típica (ddof=1) móviles con Welford add/remove, O(1)."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self._values: deque[float] = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, x: float) -> tuple[float, float]:
+        self._values.append(x)
+        n = len(self._values)
+        d = x - self._mean
+        self._mean += d / n
+        self._m2 += d * (x - self._mean)
+        if n > self.window:
+            y = self._values.popleft()
+            n -= 1
+            d = y - self._mean
+            self._mean -= d / n
+            self._m2 -= d * (y - self._mean)
+        return self.value
+
+    @property
+    def value(self) -> tuple[float, float]:
+        n = len(self._values)
+        if n < self.window or n < 2:
+            return NAN, NAN
+        return self._mean, math.sqrt(max(self._m2, 0.0) / (n - 1))
+
+    def state(self) -> dict[str, Any]:
+        return {"window": self.window, "values": list(self._values)}
+
+    def load_state(self, state: dict[str, Any]) -> None:
+        self.window = state["window"]
+        self._values = deque()
+        self._mean = self._m2 = 0.0
+        for x in state["values"]:
+            self.update(x)
+
+
+class RollingMedian:
+    """Mediana móvil con lista ordenada: búsqueda O(log n) por barra (ventanas pequeñas)."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self._values: deque[float] = deque()
+        self._sorted: list[float] = []
+
+    def update(self, x: float) -> float:
+        self._values.append(x)
+        insort(self._sorted, x)
+        if len(self._values) > self.window:
+            y = self._values.popleft()
+            del self._sorted[bisect_left(self._sorted, y)]
+        return self.value
+
+    @property
+    def value(self) -> float:
+        n = len(self._sorted)
+        if n < self.window:
+            return NAN
+        mid = n // 2
+        return self._sorted[mid] if n % 2 else (self._sorted[mid - 1] + self._sorted[mid]) / 2.0
+
+    def state(self) -> dict[str, Any]:
+        return {"window": self.window, "values": list(self._values)}
+
+    def load_state(self, state: dict[str, Any]) -> None:
+        self.window = state["window"]
+        self._values = deque(state["values"])
+        self._sorted = sorted(self._values)
+
+
+class EMA:
+    """EMA recursiva equivalente a ``ewm(span, adjust=False)``."""
+
+    def __init__(self, span: int):
+        self.span = span
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        self.value = x if math.isnan(self.value) else (1.0 - self.alpha) * self.value + self.alpha * x
+        return self.value
+
+    def state(self) -> dict[str, Any]:
+        return {"span": self.span, "value": self.value}
+
+    def load_state(self, state: dict[str, Any]) -> None:
+        self.__init__(state["span"])
+        self.value = state["value"]
+
+
+class StreamingRSI:
+    """RSI con medias simples de ganancias/pérdidas, como ``indicators.rsi``."""
+
+    def __init__(self, period: int = 14):
+        self.gain = RollingMean(period)
+        self.loss = RollingMean(period)
+        self.prev_close = NAN
+        self.value = NAN
+
+    def update(self, close: float) -> float:
+        if not math.isnan(self.prev_close):
+            delta = close - self.prev_close
+            g = self.gain.update(max(delta, 0.0))
+            lo = self.loss.update(max(-delta, 0.0))
+            self.value = NAN if (math.isnan(g) or lo == 0 or math.isnan(lo)) else 100.0 - 100.0 / (1.0 + g / lo)
+        self.prev_close = close
+        return self.value
+
+    def state(self) -> dict[str, Any]:
+        return {"gain": self.gain.state(), "loss": self.loss.state(), "prev_close": self.prev_close, "value": self.value}
+
+    def load_state(self, state: dict[str, Any]) -> None:
+        self.gain.load_state(state["gain"])
+        self.loss.load_state(state["loss"])
+        self.prev_close = state["prev_close"]
+        self.value = state["value"]
+
+
+class StreamingMACD:
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+
+    def update(self, close: float) -> tuple[float, float, float]:
+        line = self.fast.update(close) - self.slow.update(close)
+        sig = self.signal.update(line)
+        return line, sig, line - sig
+
+    def state(self) -> dict[str, Any]:
+        return {"fast": self.fast.state(), "slow": self.slow.state(), "signal": self.signal.state()}
+
+    def load_state(self, state: dict[str, Any]) -> None:
+        for k in ("fast", "slow", "signal"):
+            getattr(self, k).load_state(state[k])
+
+
+class StreamingChaikinAD:
+    def __init__(self):
+        self.value = 0.0
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        hl = high - low
+        mfm = ((close - low) - (high - close)) / hl if hl != 0 else 0.0
+        self.value += mfm * volume
+        return self.value
+
+    def state(self) -> dict[str, Any]:
+        return {"value": self.value}
+
+    def load_state(self, state: dict[str, Any]) -> None:
+        self.value = state["value"]
+
+
+class StreamingATR:
+    """ATR como media simple del true range (la primera barra usa high-low)."""
+
+    def __init__(self, window: int = 14):
+        self.tr = RollingMean(window)
+        self.prev_close = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        tr = abs(high - low)
+        if not math.isnan(self.prev_close):
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        return self.tr.update(tr)
+
+    def state(self) -> dict[str, Any]:
+        return {"tr": self.tr.state(), "prev_close": self.prev_close}
+
+    def load_state(self, state: dict[str, Any]) -> None:
+        self.tr.load_state(state["tr"])
+        self.prev_close = state["prev_close"]
+
+
+class StreamingFeatureEngine:
+    """
+    Contrapartida incremental de ``add_technical_indicators`` + ``add_returns_and_atr``:
+    O(1) por barra (O(log n) para la mediana de volumen). ``update`` devuelve las mismas
+    columnas que el cálculo batch (NaN durante el warm-up).
+    """
+
+    COLUMNS = (
+        "rsi",
+        "macd",
+        "macd_signal",
+        "macd_hist",
+        "chaikin_ad",
+        "log_return",
+        "atr",
+        "close_z",
+        "volume_rel",
+    )
+
+    def __init__(self, atr_window: int = 14, z_window: int = 100, volume_window: int = 30):
+        self.rsi = StreamingRSI()
+        self.macd = StreamingMACD()
+        self.chaikin = StreamingChaikinAD()
+        self.atr = StreamingATR(atr_window)
+        self.close_stats = RollingMeanStd(z_window)
+        self.volume_median = RollingMedian(volume_window)
+        self.prev_close = NAN
+        self.bars = 0
+
+    def update(self, high: float, low: float, close: float, volume: float) -> dict[str, float]:
+        line, sig, hist = self.macd.update(close)
+        mean, std = self.close_stats.update(close)
+        med = self.volume_median.update(volume)
+        out = {
+            "rsi": self.rsi.update(close),
+            "macd": line,
+            "macd_signal": sig,
+            "macd_hist": hist,
+            "chaikin_ad": self.chaikin.update(high, low, close, volume),
+            "log_return": math.log(close / self.prev_close) if not math.isnan(self.prev_close) else NAN,
+            "atr": self.atr.update(high, low, close),
+            "close_z": (close - mean) / std if std and not math.isnan(std) else NAN,
+            "volume_rel": volume / med if med and not math.isnan(med) else NAN,
+        }
+        self.prev_close = close
+        self.bars += 1
+        return out
+
+    def update_bar(self, bar) -> dict[str, float]:
+        return self.update(bar.high, bar.low, bar.close, bar.volume)
+
+    def state_dict(self) -> dict[str, Any]:
+        return {
+            "rsi": self.rsi.state(),
+            "macd": self.macd.state(),
+            "chaikin": self.chaikin.state(),
+            "atr": self.atr.state(),
+            "close_stats": self.close_stats.state(),
+            "volume_median": self.volume_median.state(),
+            "prev_close": self.prev_close,
+            "bars": self.bars,
+        }
+
+    def load_state_dict(self, state: dict[str, Any]) -> None:
+        for k in ("rsi", "macd", "chaikin", "atr", "close_stats", "volume_median"):
+            getattr(self, k).load_state(state[k])
+        self.prev_close = state["prev_close"]
+        self.bars = state["bars"]
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from pathlib import Path
+import queue
+import threading
+from typing import Iterator
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from xau_system.features.pipeline import FeatureMatrix
+
+
+def save_feature_matrix(path: str | Path, values: np.ndarray) -> Path:
+    """Guarda la matriz (n, F) como ``.npy`` para abrirla luego con ``mmap_mode``."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(path, np.ascontiguousarray(values))
+    return path
+
+
+class SlidingWindowDataset:
+    """
+    Ventanas deslizantes (seq_len, F) como vistas con stride sobre una única matriz
+    de features: no se materializa ninguna copia hasta pedir un batch.
+
+    La ventana ``i`` cubre las filas ``[i, i + seq_len)`` y su target es el de la
+    última fila. ``indices`` restringe el dataset (splits) sin copiar la matriz.
+    """
+
+    def __init__(
+        self,
+        features: np.ndarray,
+        seq_len: int = 128,
+        targets: np.ndarray | None = None,
+        stride: int = 1,
+        indices: np.ndarray | None = None,
+    ):
+        if features.ndim != 2:
+            raise ValueError("features debe ser una matriz (n, F)")
+        if len(features) < seq_len:
+            raise ValueError("Historial más corto que seq_len")
+        if targets is not None and len(targets) != len(features):
+            raise ValueError("targets debe tener una fila por barra")
+        self.features = features
+        self.seq_len = seq_len
+        self.targets = targets
+        # (n - L + 1, F, L) -> (n - L + 1, L, F), ambas vistas.
+        self._windows = sliding_window_view(features, seq_len, axis=0).transpose(0, 2, 1)
+        if indices is None:
+            indices = np.arange(0, len(self._windows), stride, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+
+    @classmethod
+    def from_feature_matrix(cls, fm: FeatureMatrix, seq_len: int = 128, targets: np.ndarray | None = None, **kw):
+        return cls(fm.values, seq_len=seq_len, targets=targets, **kw)
+
+    @classmethod
+    def from_memmap(cls, path: str | Path, seq_len: int = 128, targets: np.ndarray | None = None, **kw):
+        """Abre una matriz guardada con ``save_feature_matrix`` sin cargarla en RAM."""
+        return cls(np.load(path, mmap_mode="r"), seq_len=seq_len, targets=targets, **kw)
+
+    @property
+    def n_features(self) -> int:
+        return self.features.shape[1]
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        return self._windows[self.indices[i]]
+
+    def end_rows(self, positions: np.ndarray | None = None) -> np.ndarray:
+        idx = self.indices if positions is None else self.indices[positions]
+        return idx + self.seq_len - 1
+
+    def batch(self, positions: np.ndarray) -> tuple[np.ndarray, np.ndarray | None]:
+        """Gather de un batch (B, L, F): la única copia, proporcional a B."""
+        positions = np.asarray(positions, dtype=np.int64)
+        x = self._windows[self.indices[positions]]
+        y = self.targets[self.end_rows(positions)] if self.targets is not None else None
+        return x, y
+
+    def sample(self, batch_size: int, rng: np.random.Generator | None = None) -> tuple[np.ndarray, np.ndarray | None]:
+        rng = rng or np.random.default_rng()
+        return self.batch(rng.integers(0, len(self), size=batch_size))
+
+    def _subset(self, indices: np.ndarray) -> "SlidingWindowDataset":
+        return SlidingWindowDataset(self.features, self.seq_len, self.targets, indices=indices)
+
+    def time_split(self, valid_fraction: float = 0.2, gap: int | None = None) -> tuple["SlidingWindowDataset", "SlidingWindowDataset"]:
+        """
+        Split temporal (sin barajar). ``gap`` ventanas se purgan entre train y
+        validación; por defecto ``seq_len - 1`` para que no compartan filas.
+        """
+        gap = self.seq_len - 1 if gap is None else gap
+        n_valid = int(round(len(self) * valid_fraction))
+        cut = len(self) - n_valid
+        train = self.indices[: max(0, cut - gap)]
+        valid = self.indices[cut:]
+        return self._subset(train), self._subset(valid)
+
+    def _batch_positions(self, batch_size: int, shuffle: bool, seed: int | None, drop_last: bool) -> list[np.ndarray]:
+        order = np.arange(len(self))
+        if shuffle:
+            np.random.default_rng(seed).shuffle(order)
+        stop = len(order) - (len(order) % batch_size if drop_last else 0)
+        return [order[i : i + batch_size] for i in range(0, stop, batch_size)]
+
+    def iter_batches(
+        self,
+        batch_size: int = 256,
+        shuffle: bool = True,
+        seed: int | None = None,
+        prefetch: int = 2,
+        drop_last: bool = False,
+    ) -> Iterator[tuple[np.ndarray, np.ndarray | None]]:
+        """Generador de batches; con ``prefetch > 0`` el gather se hace en un hilo aparte."""
+        plan = self._batch_positions(batch_size, shuffle, seed, drop_last)
+        if prefetch <= 0:
+            for pos in plan:
+                yield self.batch(pos)
+            return
+
+        q: queue.Queue = queue.Queue(maxsize=prefetch)
+        stop = threading.Event()
+        done = object()
+
+        failed: list[BaseException] = []
+
+        def _producer() -> None:
+            try:
+                for pos in plan:
+                    if stop.is_set():
+                        return
+                    q.put(self.batch(pos))
+            except BaseException as e:  # se relanza en el consumidor
+                failed.append(e)
+            q.put(done)
+
+        t = threading.Thread(target=_producer, daemon=True)
+        t.start()
+        try:
+            while (item := q.get()) is not done:
+                yield item
+            if failed:
+                raise failed[0]
+        finally:
+            stop.set()
+            # Libera al productor si quedó bloqueado en put().
+            while t.is_alive():
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    t.join(timeout=0.01)
+
+    def to_tf_dataset(self, batch_size: int = 256, shuffle: bool = True, seed: int | None = None, prefetch: int = 2):
+        import tensorflow as tf
+
+        x_spec = tf.TensorSpec(shape=(None, self.seq_len, self.n_features), dtype=tf.as_dtype(self.features.dtype))
+        signature = x_spec
+        if self.targets is not None:
+            y_shape = (None,) + tuple(self.targets.shape[1:])
+            signature = (x_spec, tf.TensorSpec(shape=y_shape, dtype=tf.as_dtype(self.targets.dtype)))
+
+        def _gen():
+            for x, y in self.iter_batches(batch_size, shuffle, seed, prefetch=0):
+                yield x if y is None else (x, y)
+
+        return tf.data.Dataset.from_generator(_gen, output_signature=signature).prefetch(prefetch)
@@ -5,6 +5,9 @@ from datetime import datetime, timezone
 import json
 from pathlib import Path
 
+from xau_system.utils.persistence import RowWriter, open_ndjson_writer
+from xau_system.utils.segmented_log import SegmentedLogReader
+
 
 @dataclass
 class TradingViewAnalysis:
@@ -24,15 +27,23 @@ class TradingViewAnalysis:
 class TradingViewFeed:
     """Persistencia local de análisis enviados por alertas/webhooks de TradingView."""
 
-    def __init__(self, path: str = "data/tradingview_analysis.ndjson"):
+    def __init__(self, path: str = "data/tradingview_analysis.ndjson", writer: RowWriter | None = None):
         self.path = Path(path)
-        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.writer = writer or open_ndjson_writer(self.path)
 
     def append(self, analysis: TradingViewAnalysis) -> None:
-        with self.path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(asdict(analysis)) + "\n")
+        self.writer.write(asdict(analysis))
+
+    def flush(self) -> None:
+        self.writer.flush()
+
+    def close(self) -> None:
+        self.writer.close()
 
     def latest(self, n: int = 20) -> list[dict]:
+        self.writer.flush()
+        if self.path.is_dir():
+            return SegmentedLogReader(self.path).tail(n)
         if not self.path.exists():
             return []
         with self.path.open("r", encoding="utf-8") as f:
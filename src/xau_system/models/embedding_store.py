@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+import re
+import threading
+from typing import Callable
+
+import numpy as np
+
+from xau_system.data.realtime import datetime_to_ns
+
+
+@dataclass
+class EmbeddingStats:
+    hits: int = 0
+    misses: int = 0
+    disk_hits: int = 0
+    evictions: int = 0
+    computed: int = 0
+    entries: int = 0
+    disk_entries: int = 0
+
+
+def _ts(value: datetime | int) -> int:
+    return datetime_to_ns(value) if isinstance(value, datetime) else int(value)
+
+
+class _MmapEmbeddings:
+    """
+    Embeddings persistidos de un (timeframe, versión): ``.emb`` con filas float32 de
+    ancho fijo y ``.ts`` con el timestamp de cada fila, ambos leídos con ``np.memmap``.
+    Sólo se añade al final. No hay índice en memoria por fila: si los timestamps
+    llegan en orden creciente (lo normal) se busca con ``searchsorted`` sobre el
+    propio ``.ts``; si no, se mantiene una permutación ordenada (8 bytes por fila).
+    """
+
+    def __init__(self, base: Path, dim: int):
+        self.dim = dim
+        self.emb_path = base.with_suffix(".emb")
+        self.ts_path = base.with_suffix(".ts")
+        row_bytes = dim * 4
+        n_ts = self.ts_path.stat().st_size // 8 if self.ts_path.exists() else 0
+        n_emb = self.emb_path.stat().st_size // row_bytes if self.emb_path.exists() else 0
+        n = min(n_ts, n_emb)
+        # Tras una caída a mitad de escritura se descartan filas incompletas.
+        if self.ts_path.exists() and self.ts_path.stat().st_size != n * 8:
+            with self.ts_path.open("r+b") as f:
+                f.truncate(n * 8)
+        if self.emb_path.exists() and self.emb_path.stat().st_size != n * row_bytes:
+            with self.emb_path.open("r+b") as f:
+                f.truncate(n * row_bytes)
+        self._n = n
+        self._map: np.memmap | None = None
+        self._ts_map: np.ndarray = np.empty(0, np.int64)
+        self._order: np.ndarray | None = None  # None = .ts ya ordenado
+        self._sorted_ts: np.ndarray | None = None
+        self._reload_ts()
+        if n > 1 and not (np.diff(self._ts_map) > 0).all():
+            self._sort()
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _reload_ts(self) -> None:
+        if self._n:
+            self._ts_map = np.memmap(self.ts_path, dtype=np.int64, mode="r", shape=(self._n,))
+        else:
+            self._ts_map = np.empty(0, np.int64)
+
+    def _sort(self) -> None:
+        self._order = np.argsort(self._ts_map, kind="stable")
+        self._sorted_ts = np.asarray(self._ts_map[self._order])
+
+    def rows(self, ts: np.ndarray) -> np.ndarray:
+        """Fila de cada timestamp, o -1 si no está."""
+        ts = np.asarray(ts, dtype=np.int64)
+        if self._n == 0:
+            return np.full(len(ts), -1, dtype=np.int64)
+        keys = self._ts_map if self._order is None else self._sorted_ts
+        pos = np.minimum(np.searchsorted(keys, ts), self._n - 1)
+        found = keys[pos] == ts
+        rows = pos if self._order is None else self._order[pos]
+        return np.where(found, rows, -1)
+
+    def get(self, ts: int) -> np.ndarray | None:
+        row = int(self.rows(np.array([ts]))[0])
+        if row < 0:
+            return None
+        if self._map is None or len(self._map) <= row:
+            self._map = np.memmap(self.emb_path, dtype=np.float32, mode="r", shape=(self._n, self.dim))
+        return np.array(self._map[row])
+
+    def append(self, ts: np.ndarray, emb: np.ndarray) -> None:
+        """
+        ``ts`` sin duplicados. Los ya persistidos se sobrescriben en su fila (ancho
+        fijo), así disco y memoria devuelven siempre el último embedding guardado.
+        """
+        ts = np.asarray(ts, dtype=np.int64)
+        rows = self.rows(ts)
+        stored = np.flatnonzero(rows >= 0)
+        if len(stored):
+            row_bytes = self.dim * 4
+            with self.emb_path.open("r+b") as f:
+                for i in stored:
+                    f.seek(int(rows[i]) * row_bytes)
+                    f.write(np.ascontiguousarray(emb[i], dtype=np.float32).tobytes())
+            self._map = None
+        fresh = np.flatnonzero(rows < 0)
+        if not len(fresh):
+            return
+        new_ts = ts[fresh]
+        with self.emb_path.open("ab") as f:
+            f.write(np.ascontiguousarray(emb[fresh], dtype=np.float32).tobytes())
+        with self.ts_path.open("ab") as f:
+            f.write(new_ts.tobytes())
+        last = int(self._ts_map[-1]) if self._n else None
+        self._n += len(fresh)
+        self._reload_ts()
+        still_sorted = (
+            self._order is None
+            and (last is None or new_ts[0] > last)
+            and (np.diff(new_ts) > 0).all()
+        )
+        if not still_sorted:
+            self._sort()
+
+
+class EmbeddingStore:
+    """
+    Embeddings visuales de la CNN por (timeframe, timestamp de cierre de la ventana,
+    versión del modelo CNN). La memoria es una matriz preasignada de ``max_entries``
+    filas con desalojo LRU; con ``root`` cada embedding se persiste además en
+    ficheros mapeados en memoria y sobrevive a reinicios, reentrenos y backtests.
+    """
+
+    def __init__(self, dim: int = 256, max_entries: int = 50_000, root: str | Path | None = None):
+        if max_entries < 1:
+            raise ValueError("max_entries debe ser >= 1")
+        self.dim = dim
+        self.max_entries = max_entries
+        self.root = Path(root) if root else None
+        if self.root:
+            self.root.mkdir(parents=True, exist_ok=True)
+        self._values = np.zeros((max_entries, dim), dtype=np.float32)
+        self._slots: OrderedDict[tuple[str, str, int], int] = OrderedDict()
+        self._free = list(range(max_entries - 1, -1, -1))
+        self._disk: dict[tuple[str, str], _MmapEmbeddings] = {}
+        self._lock = threading.Lock()
+        self._stats = EmbeddingStats()
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._values.nbytes)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def stats(self) -> EmbeddingStats:
+        with self._lock:
+            self._stats.entries = len(self._slots)
+            self._stats.disk_entries = sum(len(d) for d in self._disk.values())
+            return EmbeddingStats(**vars(self._stats))
+
+    def _segment(self, timeframe: str, model_version: str) -> _MmapEmbeddings | None:
+        if self.root is None:
+            return None
+        seg = self._disk.get((timeframe, model_version))
+        if seg is None:
+            safe = re.sub(r"[^A-Za-z0-9._-]", "_", model_version)
+            folder = self.root / timeframe
+            folder.mkdir(parents=True, exist_ok=True)
+            seg = _MmapEmbeddings(folder / safe, self.dim)
+            self._disk[(timeframe, model_version)] = seg
+        return seg
+
+    def _put_memory_locked(self, key: tuple[str, str, int], emb: np.ndarray) -> None:
+        slot = self._slots.get(key)
+        if slot is None:
+            if not self._free:
+                _, slot = self._slots.popitem(last=False)
+                self._stats.evictions += 1
+            else:
+                slot = self._free.pop()
+        self._slots[key] = slot
+        self._slots.move_to_end(key)
+        self._values[slot] = emb
+
+    def put_many(self, timeframe: str, end_timestamps, model_version: str, embeddings: np.ndarray) -> None:
+        ts = np.asarray([_ts(t) for t in end_timestamps], dtype=np.int64)
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(ts), self.dim)
+        if len(np.unique(ts)) != len(ts):
+            # Timestamps repetidos en el mismo lote: gana el último, como en memoria.
+            _, first_rev = np.unique(ts[::-1], return_index=True)
+            keep = np.sort(len(ts) - 1 - first_rev)
+            ts, embeddings = ts[keep], embeddings[keep]
+        with self._lock:
+            for t, e in zip(ts, embeddings):
+                self._put_memory_locked((timeframe, model_version, int(t)), e)
+            seg = self._segment(timeframe, model_version)
+            if seg is not None:
+                seg.append(ts, embeddings)
+
+    def put(self, timeframe: str, end_ts: datetime | int, model_version: str, embedding: np.ndarray) -> None:
+        self.put_many(timeframe, [end_ts], model_version, np.asarray(embedding)[None, :])
+
+    def get_many(self, timeframe: str, end_timestamps, model_version: str) -> tuple[np.ndarray, np.ndarray]:
+        """Devuelve (embeddings (n, dim), máscara de faltantes); las filas faltantes quedan a 0."""
+        ts = [_ts(t) for t in end_timestamps]
+        out = np.zeros((len(ts), self.dim), dtype=np.float32)
+        missing = np.zeros(len(ts), dtype=bool)
+        with self._lock:
+            seg = self._segment(timeframe, model_version)
+            for i, t in enumerate(ts):
+                key = (timeframe, model_version, t)
+                slot = self._slots.get(key)
+                if slot is not None:
+                    self._slots.move_to_end(key)
+                    out[i] = self._values[slot]
+                    self._stats.hits += 1
+                    continue
+                emb = seg.get(t) if seg is not None else None
+                if emb is None:
+                    missing[i] = True
+                    self._stats.misses += 1
+                    continue
+                out[i] = emb
+                self._put_memory_locked(key, emb)
+                self._stats.hits += 1
+                self._stats.disk_hits += 1
+        return out, missing
+
+    def get(self, timeframe: str, end_ts: datetime | int, model_version: str) -> np.ndarray | None:
+        out, missing = self.get_many(timeframe, [end_ts], model_version)
+        return None if missing[0] else out[0]
+
+    def get_or_compute(
+        self,
+        timeframe: str,
+        end_timestamps,
+        model_version: str,
+        compute: Callable[[np.ndarray], np.ndarray],
+    ) -> np.ndarray:
+        """``compute(posiciones)`` sólo recibe las ventanas sin embedding y devuelve (k, dim)."""
+        out, missing = self.get_many(timeframe, end_timestamps, model_version)
+        if missing.any():
+            idx = np.flatnonzero(missing)
+            fresh = np.asarray(compute(idx), dtype=np.float32).reshape(len(idx), self.dim)
+            out[idx] = fresh
+            self.put_many(timeframe, [end_timestamps[i] for i in idx], model_version, fresh)
+            with self._lock:
+                self._stats.computed += len(idx)
+        return out
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._slots.clear()
+            self._free = list(range(self.max_entries - 1, -1, -1))
+
+
+def cnn_embedding_fn(cnn_model, batch_size: int = 64) -> Callable[[np.ndarray], np.ndarray]:
+    """Imágenes (B, H, W, 3) -> salida ``embedding`` de ``build_cnn`` (última salida)."""
+
+    def _embed(images: np.ndarray) -> np.ndarray:
+        parts = []
+        for s in range(0, len(images), batch_size):
+            outs = cnn_model.predict_on_batch(images[s : s + batch_size])
+            parts.append(np.asarray(outs[-1] if isinstance(outs, (list, tuple)) else outs))
+        return np.concatenate(parts) if parts else np.empty((0, 0), dtype=np.float32)
+
+    return _embed
+
+
+def embed_windows(
+    store: EmbeddingStore,
+    rasterizer,
+    embed_fn: Callable[[np.ndarray], np.ndarray],
+    timeframe: str,
+    model_version: str,
+    ohlcv: dict[str, np.ndarray],
+    end_rows: np.ndarray,
+    end_timestamps: np.ndarray,
+    window: int = 64,
+) -> np.ndarray:
+    """
+    Embeddings de las ventanas que terminan en ``end_rows``: sólo se rasterizan y
+    pasan por la CNN las que no estén en ``store``.
+    """
+    end_rows = np.asarray(end_rows, dtype=np.int64)
+
+    def _compute(idx: np.ndarray) -> np.ndarray:
+        return embed_fn(rasterizer.render_windows(ohlcv, end_rows[idx], window))
+
+    return store.get_or_compute(timeframe, list(end_timestamps), model_version, _compute)
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+from xau_system.models.runtime import ExportMetadata, Inputs, input_list, resolve_output_names
+
+QUANTIZATION_MODES = ("none", "float16", "dynamic", "int8")
+
+
+def calibration_windows(inputs: Inputs, input_names: list[str], n: int = 256) -> list[np.ndarray]:
+    """
+    Últimas ``n`` ventanas (las más recientes) de cada entrada, en el orden de
+    ``input_names`` (el de ``model.inputs``) aunque ``inputs`` sea un dict en otro orden.
+    """
+    return [np.asarray(x[-n:], dtype=np.float32) for x in input_list(inputs, input_names)]
+
+
+def _representative(calib: list[np.ndarray]) -> Iterator[list[np.ndarray]]:
+    for i in range(len(calib[0])):
+        yield [x[i : i + 1] for x in calib]
+
+
+def _names(model) -> tuple[list[str], list[str]]:
+    # Keras 3 ya no expone ``input_names``: se toma el nombre de cada ``Input``.
+    inputs = getattr(model, "input_names", None) or [t.name.split(":")[0] for t in model.inputs]
+    return list(inputs), list(model.output_names)
+
+
+def export_tflite(
+    model,
+    path: str | Path,
+    quantization: str = "none",
+    calibration: Inputs | None = None,
+    n_calibration: int = 256,
+    int8_io: bool = False,
+    model_version: str = "",
+) -> Path:
+    """
+    Convierte un modelo Keras a ``.tflite`` (+ sidecar ``.json``).
+
+    ``dynamic`` cuantiza pesos a int8; ``int8`` cuantiza también activaciones con
+    ``calibration`` (ventanas recientes); ``int8_io`` hace int8 también la E/S.
+    Sólo se usan ops builtin para que el artefacto corra con ``tflite-runtime``.
+    """
+    import tensorflow as tf
+
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"quantization debe ser uno de {QUANTIZATION_MODES}")
+    if quantization == "int8" and calibration is None:
+        raise ValueError("int8 requiere ventanas de calibración")
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS]
+    if quantization != "none":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == "int8":
+        calib = calibration_windows(calibration, _names(model)[0], n_calibration)
+        converter.representative_dataset = lambda: _representative(calib)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        if int8_io:
+            converter.inference_input_type = tf.int8
+            converter.inference_output_type = tf.int8
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    flatbuffer = converter.convert()
+    path.write_bytes(flatbuffer)
+    inputs, outputs = _names(model)
+    runner = tf.lite.Interpreter(model_content=flatbuffer).get_signature_runner()
+    ExportMetadata(
+        format="tflite",
+        quantization=quantization,
+        input_names=inputs,
+        output_names=outputs,
+        model_name=model.name,
+        model_version=model_version,
+        created_at=datetime.now(timezone.utc).isoformat(),
+        artifact_output_names=resolve_output_names(outputs, list(runner.get_output_details())),
+    ).save(path)
+    return path
+
+
+class _CalibrationReader:
+    def __init__(self, names: list[str], calib: list[np.ndarray]):
+        self._it = iter([{n: x[i : i + 1] for n, x in zip(names, calib)} for i in range(len(calib[0]))])
+
+    def get_next(self):
+        return next(self._it, None)
+
+
+def _onnx_outputs(path: Path) -> list[str]:
+    """Salidas del grafo en el orden de ``model.outputs`` (el que conserva tf2onnx)."""
+    import onnx
+
+    return [o.name for o in onnx.load(str(path), load_external_data=False).graph.output]
+
+
+def export_onnx(
+    model,
+    path: str | Path,
+    quantization: str = "none",
+    calibration: Inputs | None = None,
+    n_calibration: int = 256,
+    opset: int = 17,
+    model_version: str = "",
+) -> Path:
+    """Convierte un modelo Keras a ``.onnx`` con tf2onnx; ``dynamic``/``int8`` vía onnxruntime."""
+    import tensorflow as tf
+    import tf2onnx
+
+    if quantization not in ("none", "dynamic", "int8"):
+        raise ValueError("ONNX admite quantization none, dynamic o int8")
+    if quantization == "int8" and calibration is None:
+        raise ValueError("int8 requiere ventanas de calibración")
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    input_names, output_names = _names(model)
+    spec = [tf.TensorSpec((None, *t.shape[1:]), tf.float32, name=n) for t, n in zip(model.inputs, input_names)]
+    float_path = path if quantization == "none" else path.with_suffix(".fp32.onnx")
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=opset, output_path=str(float_path))
+
+    if quantization != "none":
+        from onnxruntime.quantization import QuantType, quantize_dynamic, quantize_static
+
+        if quantization == "dynamic":
+            quantize_dynamic(str(float_path), str(path), weight_type=QuantType.QInt8)
+        else:
+            calib = calibration_windows(calibration, input_names, n_calibration)
+            reader = _CalibrationReader(input_names, calib)
+            quantize_static(str(float_path), str(path), reader, weight_type=QuantType.QInt8, activation_type=QuantType.QInt8)
+        float_path.unlink(missing_ok=True)
+
+    ExportMetadata(
+        format="onnx",
+        quantization=quantization,
+        input_names=input_names,
+        output_names=output_names,
+        model_name=model.name,
+        model_version=model_version,
+        created_at=datetime.now(timezone.utc).isoformat(),
+        extra={"opset": opset},
+        artifact_output_names=resolve_output_names(output_names, _onnx_outputs(path)),
+    ).save(path)
+    return path
+
+
+def export_model(model, path: str | Path, **kwargs) -> Path:
+    """Elige ``export_tflite`` o ``export_onnx`` según la extensión de ``path``."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".tflite":
+        return export_tflite(model, path, **kwargs)
+    if suffix == ".onnx":
+        return export_onnx(model, path, **kwargs)
+    raise ValueError(f"Formato no soportado: {suffix}")
+
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Future, InvalidStateError
+from dataclasses import dataclass
+import queue
+import threading
+import time
+from typing import Any, Callable
+
+import numpy as np
+
+Inputs = np.ndarray | list[np.ndarray] | dict[str, np.ndarray]
+
+
+@dataclass
+class InferenceTiming:
+    queue_wait_ms: float
+    batch_size: int
+    compute_ms: float
+
+
+@dataclass
+class InferenceResult:
+    outputs: Any
+    timing: InferenceTiming
+
+
+@dataclass
+class ServerStats:
+    requests: int = 0
+    batches: int = 0
+    rows: int = 0
+    errors: int = 0
+    cancelled: int = 0  # peticiones canceladas por el llamador antes de ejecutarse
+
+    @property
+    def mean_batch_rows(self) -> float:
+        return self.rows / self.batches if self.batches else 0.0
+
+
+@dataclass
+class _Request:
+    inputs: Inputs
+    rows: int
+    future: Future
+    enqueued: float
+
+
+def _rows(inputs: Inputs) -> int:
+    if isinstance(inputs, dict):
+        return len(next(iter(inputs.values())))
+    if isinstance(inputs, (list, tuple)):
+        return len(inputs[0])
+    return len(inputs)
+
+
+def _resolve(fut: Future, result: Any = None, exc: BaseException | None = None) -> None:
+    """El llamador puede cancelar en cualquier momento (``asyncio.wait_for``): no debe tumbar el hilo."""
+    try:
+        if exc is not None:
+            fut.set_exception(exc)
+        else:
+            fut.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+def _concat(batch: list[Inputs]) -> Inputs:
+    first = batch[0]
+    if isinstance(first, dict):
+        return {k: np.concatenate([b[k] for b in batch]) for k in first}
+    if isinstance(first, (list, tuple)):
+        return [np.concatenate([b[i] for b in batch]) for i in range(len(first))]
+    return np.concatenate(batch)
+
+
+def _split(outputs: Any, bounds: list[tuple[int, int]]) -> list[Any]:
+    if isinstance(outputs, dict):
+        return [{k: np.asarray(v)[a:b] for k, v in outputs.items()} for a, b in bounds]
+    if isinstance(outputs, (list, tuple)):
+        return [[np.asarray(v)[a:b] for v in outputs] for a, b in bounds]
+    arr = np.asarray(outputs)
+    return [arr[a:b] for a, b in bounds]
+
+
+def default_predict_fn(model) -> Callable[[Inputs], Any]:
+    """``predict_on_batch`` para modelos Keras (evita el overhead de ``predict``); si no, el callable."""
+    if hasattr(model, "predict_on_batch"):
+        return model.predict_on_batch
+    return model
+
+
+class MicroBatchInferenceServer:
+    """
+    Servidor de inferencia con micro-batching en un hilo dedicado.
+
+    Agrupa peticiones concurrentes (p.ej. 1H/4H/D1 y varios clientes API) en un batch
+    de hasta ``max_batch_rows`` filas, esperando como mucho ``max_wait_ms`` desde la
+    primera petición. Cada resultado informa espera en cola, tamaño de batch y cómputo.
+    """
+
+    def __init__(
+        self,
+        model=None,
+        max_batch_rows: int = 64,
+        max_wait_ms: float = 2.0,
+        predict_fn: Callable[[Inputs], Any] | None = None,
+        warmup_inputs: Inputs | None = None,
+        max_queue: int = 10_000,
+    ):
+        if predict_fn is None and model is None:
+            raise ValueError("Se requiere model o predict_fn")
+        self.predict_fn = predict_fn or default_predict_fn(model)
+        self.max_batch_rows = max_batch_rows
+        self.max_wait_s = max_wait_ms / 1000.0
+        self.warmup_inputs = warmup_inputs
+        self.stats = ServerStats()
+        self._q: queue.Queue[_Request | None] = queue.Queue(maxsize=max_queue)
+        self._carry: _Request | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._stopped = False
+        self._submit_lock = threading.Lock()
+
+    def start(self) -> bool:
+        if self._thread and self._thread.is_alive():
+            return False
+        if self.warmup_inputs is not None:
+            # Warm-up: primera llamada (trazado/grafo, reservas) fuera del camino de peticiones.
+            self.predict_fn(self.warmup_inputs)
+        self._stop.clear()
+        with self._submit_lock:
+            self._stopped = False
+        self._thread = threading.Thread(target=self._loop, name="inference-server", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: float = 2.0) -> bool:
+        if not self._thread:
+            return False
+        with self._submit_lock:
+            self._stopped = True
+        self._stop.set()
+        try:
+            self._q.put_nowait(None)  # sólo despierta al hilo; con la cola llena no hace falta
+        except queue.Full:
+            pass
+        self._thread.join(timeout=timeout)
+        return True
+
+    def submit(self, inputs: Inputs) -> Future:
+        fut: Future = Future()
+        with self._submit_lock:
+            if self._stopped:
+                raise RuntimeError("Servidor de inferencia detenido")
+            self._q.put(_Request(inputs, _rows(inputs), fut, time.perf_counter()))
+        return fut
+
+    def predict(self, inputs: Inputs, timeout: float | None = None) -> InferenceResult:
+        return self.submit(inputs).result(timeout=timeout)
+
+    async def predict_async(self, inputs: Inputs) -> InferenceResult:
+        """Para endpoints async: espera sin bloquear el event loop."""
+        return await asyncio.wrap_future(self.submit(inputs))
+
+    def _next(self, timeout: float | None) -> _Request | None:
+        if self._carry is not None:
+            req, self._carry = self._carry, None
+            return req
+        try:
+            return self._q.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _collect(self) -> list[_Request]:
+        first = self._next(timeout=0.1)
+        if first is None:
+            return []
+        batch, rows = [first], first.rows
+        deadline = first.enqueued + self.max_wait_s
+        while rows < self.max_batch_rows:
+            remaining = deadline - time.perf_counter()
+            req = self._next(timeout=max(0.0, remaining)) if remaining > 0 else self._next_nowait()
+            if req is None:
+                break
+            if rows + req.rows > self.max_batch_rows:
+                self._carry = req
+                break
+            batch.append(req)
+            rows += req.rows
+        return batch
+
+    def _next_nowait(self) -> _Request | None:
+        try:
+            return self._q.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _run_batch(self, batch: list[_Request]) -> None:
+        start = time.perf_counter()
+        bounds, pos = [], 0
+        for req in batch:
+            bounds.append((pos, pos + req.rows))
+            pos += req.rows
+        try:
+            outputs = self.predict_fn(_concat([r.inputs for r in batch]) if len(batch) > 1 else batch[0].inputs)
+            parts = _split(outputs, bounds)
+        except Exception as e:
+            if len(batch) > 1:
+                # Una petición defectuosa (forma incompatible, error del modelo) no debe
+                # tumbar al resto: se reintenta cada una por separado.
+                for req in batch:
+                    self._run_batch([req])
+                return
+            self.stats.errors += 1
+            _resolve(batch[0].future, exc=e)
+            return
+        compute_ms = (time.perf_counter() - start) * 1000.0
+        self.stats.batches += 1
+        self.stats.requests += len(batch)
+        self.stats.rows += pos
+        for req, out in zip(batch, parts):
+            timing = InferenceTiming(
+                queue_wait_ms=(start - req.enqueued) * 1000.0,
+                batch_size=pos,
+                compute_ms=compute_ms,
+            )
+            _resolve(req.future, InferenceResult(outputs=out, timing=timing))
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            batch = self._collect()
+            # Las canceladas se descartan; el resto pasa a "running" y ya no se puede cancelar.
+            live = [req for req in batch if req.future.set_running_or_notify_cancel()]
+            self.stats.cancelled += len(batch) - len(live)
+            if live:
+                self._run_batch(live)
+        # Peticiones pendientes al parar: se rechazan de forma explícita.
+        while (req := self._next(timeout=0)) is not None or not self._q.empty():
+            if req is not None and not req.future.done():
+                _resolve(req.future, exc=RuntimeError("Servidor de inferencia detenido"))
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+import json
+import os
+from pathlib import Path
+import shutil
+import threading
+from typing import Any, Callable
+
+from xau_system.rl.online_update import OnlineUpdateResult, gating_decision
+
+
+@dataclass
+class ModelVersion:
+    name: str
+    version: str
+    artifact: str
+    created_at: str = ""
+    metrics: dict[str, float] = field(default_factory=dict)
+    feature_config: dict[str, Any] = field(default_factory=dict)
+    training_window: tuple[str, str] | None = None
+    notes: str = ""
+
+
+def default_loader(path: str | Path):
+    """Artefactos portables sin TensorFlow; ``.keras``/``.h5`` con Keras."""
+    suffix = Path(path).suffix.lower()
+    if suffix in {".tflite", ".onnx"}:
+        from xau_system.models.runtime import load_runtime
+
+        return load_runtime(path)
+    if suffix in {".keras", ".h5"}:
+        import tensorflow as tf
+
+        return tf.keras.models.load_model(path, compile=False)
+    raise ValueError(f"Formato no soportado: {suffix}")
+
+
+@dataclass(frozen=True)
+class _Serving:
+    version: ModelVersion
+    model: Any
+
+
+class ServingSlot:
+    """
+    Puntero al modelo en servicio de un nombre. ``current()`` es una lectura de un
+    atributo (atómica en CPython), sin locks: una petición que ya tomó la referencia
+    termina con ese modelo aunque se promueva otro entretanto.
+    """
+
+    def __init__(self, name: str, loader: Callable[[ModelVersion], Any]):
+        self.name = name
+        self._loader = loader
+        self._serving: _Serving | None = None
+        self._pending: ModelVersion | None = None
+        self._load_lock = threading.Lock()
+
+    def set_pending(self, version: ModelVersion) -> None:
+        """Fija la versión a servir sin cargarla (carga diferida al primer uso)."""
+        with self._load_lock:
+            self._pending = version
+
+    def current(self) -> _Serving:
+        serving = self._serving
+        if serving is not None:
+            return serving
+        with self._load_lock:
+            if self._serving is None:
+                if self._pending is None:
+                    raise RuntimeError(f"Sin versión en servicio para '{self.name}'")
+                self._serving = _Serving(self._pending, self._loader(self._pending))
+            return self._serving
+
+    @property
+    def loaded(self) -> bool:
+        return self._serving is not None
+
+    @property
+    def version(self) -> ModelVersion | None:
+        serving = self._serving
+        return serving.version if serving else self._pending
+
+    def swap(self, version: ModelVersion, model: Any) -> None:
+        # Bajo el mismo lock que la carga diferida: una carga en curso de la versión
+        # anterior no puede publicarse después y deshacer la promoción.
+        with self._load_lock:
+            self._pending = version
+            self._serving = _Serving(version, model)
+
+    def predict_on_batch(self, inputs):
+        return self.current().model.predict_on_batch(inputs)
+
+
+class ModelRegistry:
+    """
+    Registro versionado de artefactos: ``root/<nombre>/<versión>/`` con el artefacto y
+    ``metadata.json``; ``root/<nombre>/champion.json`` apunta a la versión en servicio.
+
+    Las promociones cargan el challenger en un único hilo de fondo (como mucho un
+    modelo extra en memoria a la vez) y después cambian el puntero de ``ServingSlot``.
+    """
+
+    def __init__(self, root: str | Path = "models/registry", loader: Callable[[str | Path], Any] | None = None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._load_artifact = loader or default_loader
+        self._slots: dict[str, ServingSlot] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-loader")
+
+    @staticmethod
+    def _write_json(path: Path, payload: dict) -> None:
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _load(self, version: ModelVersion):
+        return self._load_artifact(self.root / version.name / version.version / version.artifact)
+
+    def register(
+        self,
+        name: str,
+        artifact: str | Path,
+        metrics: dict[str, float] | None = None,
+        feature_config: dict[str, Any] | None = None,
+        training_window: tuple[str, str] | None = None,
+        version: str | None = None,
+        notes: str = "",
+    ) -> ModelVersion:
+        """Copia el artefacto (y su sidecar ``.json`` si existe) a una versión nueva."""
+        artifact = Path(artifact)
+        now = datetime.now(timezone.utc)
+        version = version or now.strftime("%Y%m%dT%H%M%S%fZ")
+        folder = self.root / name / version
+        if folder.exists():
+            raise ValueError(f"La versión {name}/{version} ya existe")
+        folder.mkdir(parents=True)
+        copy = shutil.copytree if artifact.is_dir() else shutil.copy2
+        copy(artifact, folder / artifact.name)
+        sidecar = artifact.with_suffix(artifact.suffix + ".json")
+        if sidecar.exists():
+            shutil.copy2(sidecar, folder / sidecar.name)
+
+        mv = ModelVersion(
+            name=name,
+            version=version,
+            artifact=artifact.name,
+            created_at=now.isoformat(),
+            metrics=dict(metrics or {}),
+            feature_config=dict(feature_config or {}),
+            training_window=tuple(training_window) if training_window else None,
+            notes=notes,
+        )
+        self._write_json(folder / "metadata.json", asdict(mv))
+        return mv
+
+    def get(self, name: str, version: str) -> ModelVersion:
+        path = self.root / name / version / "metadata.json"
+        if not path.exists():
+            raise KeyError(f"Versión desconocida: {name}/{version}")
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("training_window"):
+            data["training_window"] = tuple(data["training_window"])
+        return ModelVersion(**data)
+
+    def versions(self, name: str) -> list[ModelVersion]:
+        folder = self.root / name
+        if not folder.exists():
+            return []
+        return sorted(
+            (self.get(name, p.name) for p in folder.iterdir() if (p / "metadata.json").exists()),
+            key=lambda v: v.created_at,
+        )
+
+    def champion(self, name: str) -> ModelVersion | None:
+        path = self.root / name / "champion.json"
+        if not path.exists():
+            return None
+        return self.get(name, json.loads(path.read_text(encoding="utf-8"))["version"])
+
+    def slot(self, name: str) -> ServingSlot:
+        """Slot de servicio del nombre; el campeón se carga de forma diferida al primer uso."""
+        with self._lock:
+            slot = self._slots.get(name)
+            if slot is None:
+                slot = ServingSlot(name, self._load)
+                champion = self.champion(name)
+                if champion is not None:
+                    slot.set_pending(champion)
+                self._slots[name] = slot
+            return slot
+
+    def promote(self, name: str, version: str, warmup: Callable[[Any], None] | None = None) -> Future:
+        """
+        Carga ``version`` en segundo plano, opcionalmente la calienta y cambia el puntero.
+        El modelo anterior se libera cuando terminan las peticiones que lo usan.
+        """
+        mv = self.get(name, version)
+        slot = self.slot(name)
+
+        def _job() -> ModelVersion:
+            model = self._load(mv)
+            if warmup is not None:
+                warmup(model)
+            slot.swap(mv, model)
+            self._write_json(self.root / name / "champion.json", {"version": mv.version})
+            return mv
+
+        return self._executor.submit(_job)
+
+    def evaluate_and_promote(
+        self,
+        name: str,
+        version: str,
+        max_mdd_deterioration: float = 0.02,
+        warmup: Callable[[Any], None] | None = None,
+    ) -> tuple[OnlineUpdateResult, Future | None]:
+        """Aplica ``gating_decision`` con las métricas ``sharpe``/``max_drawdown`` registradas."""
+        challenger = self.get(name, version)
+        champion = self.champion(name)
+        if champion is None:
+            return OnlineUpdateResult(True, "Sin campeón previo"), self.promote(name, version, warmup)
+        decision = gating_decision(
+            sharpe_old=champion.metrics.get("sharpe", 0.0),
+            sharpe_new=challenger.metrics.get("sharpe", 0.0),
+            mdd_old=champion.metrics.get("max_drawdown", 0.0),
+            mdd_new=challenger.metrics.get("max_drawdown", 0.0),
+            max_mdd_deterioration=max_mdd_deterioration,
+        )
+        if not decision.promoted:
+            return decision, None
+        return decision, self.promote(name, version, warmup)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
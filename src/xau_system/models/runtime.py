@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+import json
+from pathlib import Path
+from typing import Any, Protocol
+
+import numpy as np
+
+Inputs = np.ndarray | list[np.ndarray] | dict[str, np.ndarray]
+
+
+@dataclass
+class ExportMetadata:
+    """
+    Sidecar ``<artefacto>.json``: orden de entradas/salidas del modelo Keras original.
+    ``artifact_output_names[i]`` es el nombre en el artefacto de ``output_names[i]``,
+    resuelto al exportar (las firmas suelen llamarlas ``output_0..N``).
+    """
+
+    format: str
+    quantization: str
+    input_names: list[str]
+    output_names: list[str]
+    model_name: str = ""
+    model_version: str = ""
+    created_at: str = ""
+    extra: dict[str, Any] = field(default_factory=dict)
+    artifact_output_names: list[str] = field(default_factory=list)
+
+    def save(self, artifact: str | Path) -> Path:
+        path = metadata_path(artifact)
+        path.write_text(json.dumps(asdict(self), indent=2), encoding="utf-8")
+        return path
+
+    @classmethod
+    def load(cls, artifact: str | Path) -> "ExportMetadata | None":
+        path = metadata_path(artifact)
+        if not path.exists():
+            return None
+        return cls(**json.loads(path.read_text(encoding="utf-8")))
+
+
+def metadata_path(artifact: str | Path) -> Path:
+    artifact = Path(artifact)
+    return artifact.with_suffix(artifact.suffix + ".json")
+
+
+class InferenceRuntime(Protocol):
+    """Interfaz común (la de Keras ``predict_on_batch``) para Keras, TFLite y ONNX."""
+
+    input_names: list[str]
+    output_names: list[str]
+
+    def predict_on_batch(self, inputs: Inputs) -> np.ndarray | list[np.ndarray]: ...
+
+
+def input_list(inputs: Inputs, names: list[str]) -> list[np.ndarray]:
+    """Entradas como lista en el orden de ``names`` (o en el dado si no es un dict)."""
+    if isinstance(inputs, dict):
+        return [np.asarray(inputs[n]) for n in names]
+    if isinstance(inputs, (list, tuple)):
+        return [np.asarray(x) for x in inputs]
+    return [np.asarray(inputs)]
+
+
+def resolve_output_names(names: list[str], candidates: list[str]) -> list[str]:
+    """
+    Asocia por índice cada salida Keras con la del artefacto: nombre exacto, si no
+    ``output_<i>`` (firmas de Keras/TFLite), si no la salida ``i`` del artefacto. No se
+    busca por contención: ``output_1`` también está contenido en ``output_10``.
+    """
+    if len(names) != len(candidates):
+        raise KeyError(f"{len(names)} salidas en el modelo y {len(candidates)} en el artefacto: {candidates}")
+    out = []
+    for i, name in enumerate(names):
+        if name in candidates:
+            out.append(name)
+        elif f"output_{i}" in candidates:
+            out.append(f"output_{i}")
+        else:
+            out.append(candidates[i])
+    return out
+
+
+def _output_names(metadata: ExportMetadata | None, candidates: list[str]) -> list[str]:
+    if metadata is None:
+        return candidates
+    if metadata.artifact_output_names:
+        missing = [n for n in metadata.artifact_output_names if n not in candidates]
+        if missing:
+            raise KeyError(f"Salidas {missing} del sidecar no están en el artefacto: {candidates}")
+        return list(metadata.artifact_output_names)
+    # Sidecars anteriores sin el orden registrado.
+    return resolve_output_names(metadata.output_names, candidates)
+
+
+def _match_name(name: str, candidates: list[str]) -> str:
+    """Los conversores decoran nombres (``serving_default_x:0``): se busca por contención."""
+    if name in candidates:
+        return name
+    hits = [c for c in candidates if name in c]
+    if len(hits) != 1:
+        raise KeyError(f"No se puede asociar '{name}' con {candidates}")
+    return hits[0]
+
+
+def quantize(x: np.ndarray, scale: float, zero_point: int, dtype) -> np.ndarray:
+    info = np.iinfo(dtype)
+    q = np.rint(np.asarray(x, dtype=np.float32) / scale) + zero_point
+    return np.clip(q, info.min, info.max).astype(dtype)
+
+
+def dequantize(q: np.ndarray, scale: float, zero_point: int) -> np.ndarray:
+    return (q.astype(np.float32) - zero_point) * np.float32(scale)
+
+
+def _load_tflite_interpreter(path: str, num_threads: int | None):
+    # Orden: runtimes ligeros primero; TensorFlow completo sólo como último recurso.
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            try:
+                from tensorflow.lite import Interpreter
+            except ImportError as e:
+                raise ImportError("Instala 'ai-edge-litert' o 'tflite-runtime' para ejecutar modelos .tflite") from e
+    return Interpreter(model_path=path, num_threads=num_threads)
+
+
+class TFLiteRuntime:
+    """
+    Ejecuta un modelo ``.tflite`` vía su signature runner (redimensiona el batch solo).
+    Con entradas/salidas int8 cuantiza y descuantiza usando la escala del tensor.
+    """
+
+    def __init__(self, path: str | Path, num_threads: int | None = None, signature: str = "serving_default"):
+        self.path = Path(path)
+        self.metadata = ExportMetadata.load(self.path)
+        self._interpreter = _load_tflite_interpreter(str(self.path), num_threads)
+        self._runner = self._interpreter.get_signature_runner(signature)
+        self._in = self._runner.get_input_details()
+        self._out = self._runner.get_output_details()
+        sig_inputs, sig_outputs = list(self._in), list(self._out)
+        self.input_names = [_match_name(n, sig_inputs) for n in self.metadata.input_names] if self.metadata else sig_inputs
+        self.output_names = _output_names(self.metadata, sig_outputs)
+
+    def predict_on_batch(self, inputs: Inputs) -> np.ndarray | list[np.ndarray]:
+        feed = {}
+        for name, x in zip(self.input_names, input_list(inputs, self.input_names)):
+            det = self._in[name]
+            if np.issubdtype(det["dtype"], np.integer):
+                scale, zp = det["quantization"]
+                x = quantize(x, scale, zp, det["dtype"])
+            feed[name] = x.astype(det["dtype"], copy=False)
+        raw = self._runner(**feed)
+        outs = []
+        for name in self.output_names:
+            y, det = raw[name], self._out[name]
+            if np.issubdtype(det["dtype"], np.integer):
+                y = dequantize(y, *det["quantization"])
+            outs.append(y)
+        return outs[0] if len(outs) == 1 else outs
+
+
+class OnnxRuntime:
+    """Ejecuta un modelo ``.onnx`` con onnxruntime en CPU."""
+
+    def __init__(self, path: str | Path, num_threads: int | None = None):
+        import onnxruntime as ort
+
+        self.path = Path(path)
+        self.metadata = ExportMetadata.load(self.path)
+        opts = ort.SessionOptions()
+        if num_threads:
+            opts.intra_op_num_threads = num_threads
+        self._session = ort.InferenceSession(str(self.path), opts, providers=["CPUExecutionProvider"])
+        sess_inputs = [i.name for i in self._session.get_inputs()]
+        sess_outputs = [o.name for o in self._session.get_outputs()]
+        self.input_names = [_match_name(n, sess_inputs) for n in self.metadata.input_names] if self.metadata else sess_inputs
+        self.output_names = _output_names(self.metadata, sess_outputs)
+        self._dtypes = {
+            i.name: np.float16 if i.type == "tensor(float16)" else np.float32 for i in self._session.get_inputs()
+        }
+
+    def predict_on_batch(self, inputs: Inputs) -> np.ndarray | list[np.ndarray]:
+        xs = input_list(inputs, self.input_names)
+        feed = {n: x.astype(self._dtypes[n], copy=False) for n, x in zip(self.input_names, xs)}
+        outs = self._session.run(self.output_names, feed)
+        return outs[0] if len(outs) == 1 else outs
+
+
+def load_runtime(path: str | Path, num_threads: int | None = None) -> InferenceRuntime:
+    """Carga un artefacto exportado según su extensión, sin importar TensorFlow si no hace falta."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".tflite":
+        return TFLiteRuntime(path, num_threads=num_threads)
+    if suffix == ".onnx":
+        return OnnxRuntime(path, num_threads=num_threads)
+    raise ValueError(f"Formato no soportado: {suffix}")
+
+
+@dataclass
+class DriftReport:
+    """Diferencias por salida entre el modelo de referencia (Keras) y el artefacto."""
+
+    max_abs_error: list[float]
+    mean_abs_error: list[float]
+    argmax_agreement: list[float | None]
+    n_samples: int
+    passed: bool
+
+
+def _as_outputs(y) -> list[np.ndarray]:
+    if isinstance(y, dict):
+        return [np.asarray(v) for v in y.values()]
+    if isinstance(y, (list, tuple)):
+        return [np.asarray(v) for v in y]
+    return [np.asarray(y)]
+
+
+def _slice_inputs(inputs: Inputs, sl: slice) -> Inputs:
+    if isinstance(inputs, dict):
+        return {k: v[sl] for k, v in inputs.items()}
+    if isinstance(inputs, (list, tuple)):
+        return [v[sl] for v in inputs]
+    return inputs[sl]
+
+
+def check_accuracy_drift(
+    reference,
+    candidate,
+    inputs: Inputs,
+    batch_size: int = 256,
+    atol: float = 0.05,
+    min_agreement: float = 0.98,
+) -> DriftReport:
+    """
+    Compara ``predict_on_batch`` de ambos modelos sobre las mismas ventanas. Falla si
+    alguna salida supera ``atol`` de error medio o, en salidas de clase (más de una
+    columna), el acuerdo de argmax queda por debajo de ``min_agreement``.
+    """
+    first = next(iter(inputs.values())) if isinstance(inputs, dict) else input_list(inputs, [])[0]
+    n = len(first)
+    ref_parts: list[list[np.ndarray]] = []
+    cand_parts: list[list[np.ndarray]] = []
+    for s in range(0, n, batch_size):
+        chunk = _slice_inputs(inputs, slice(s, s + batch_size))
+        ref_parts.append(_as_outputs(reference.predict_on_batch(chunk)))
+        cand_parts.append(_as_outputs(candidate.predict_on_batch(chunk)))
+
+    max_err, mean_err, agree = [], [], []
+    for k in range(len(ref_parts[0])):
+        ref = np.concatenate([p[k] for p in ref_parts]).astype(np.float64)
+        cand = np.concatenate([p[k] for p in cand_parts]).astype(np.float64).reshape(ref.shape)
+        diff = np.abs(ref - cand)
+        max_err.append(float(diff.max()))
+        mean_err.append(float(diff.mean()))
+        if ref.ndim == 2 and ref.shape[1] > 1:
+            agree.append(float((ref.argmax(axis=1) == cand.argmax(axis=1)).mean()))
+        else:
+            agree.append(None)
+
+    passed = all(e <= atol for e in mean_err) and all(a is None or a >= min_agreement for a in agree)
+    return DriftReport(max_err, mean_err, agree, n, passed)
@@ -1,26 +1,171 @@
 from __future__ import annotations
 
+from pathlib import Path
+
 import numpy as np
+from scipy.optimize import linear_sum_assignment
 from sklearn.mixture import GaussianMixture
 
+_LOG_2PI = np.log(2.0 * np.pi)
+
+
+def _precision_cholesky(covariances: np.ndarray) -> np.ndarray:
+    """Factor U con U U^T = Σ^-1 (misma convención que ``precisions_cholesky_`` de sklearn)."""
+    d = covariances.shape[-1]
+    eye = np.eye(d)
+    return np.stack([np.linalg.solve(np.linalg.cholesky(c), eye).T for c in covariances])
+
 
 class RegimeDetector:
-    """Detector simple de régimen (trend/range/shock) con GMM."""
+    """
+    Detector simple de régimen (trend/range/shock) con GMM.
+
+    Tras ``fit`` los parámetros se copian a arrays NumPy y ``predict`` evalúa la
+    log-verosimilitud con los factores de Cholesky de la precisión, sin pasar por la
+    validación de sklearn. Las componentes se ordenan para que la etiqueta respete
+    ``map_regime``: en el primer ajuste por varianza creciente (range < trend < shock)
+    y en los siguientes emparejando con las medias anteriores. ``update`` aplica EM
+    por pasos (stepwise EM) con las barras nuevas sin reajustar desde cero.
+    """
 
-    def __init__(self, n_components: int = 3, random_state: int = 42):
-        self.model = GaussianMixture(n_components=n_components, random_state=random_state)
+    def __init__(
+        self,
+        n_components: int = 3,
+        random_state: int = 42,
+        learning_rate: float = 0.01,
+        reg_covar: float = 1e-6,
+    ):
+        self.n_components = n_components
+        self.random_state = random_state
+        self.learning_rate = learning_rate
+        self.reg_covar = reg_covar
+        self.model = GaussianMixture(n_components=n_components, random_state=random_state, reg_covar=reg_covar)
         self._fitted = False
+        self.n_updates = 0
+        self.component_order_: np.ndarray | None = None
+
+    def _set_params(self, weights: np.ndarray, means: np.ndarray, covariances: np.ndarray) -> None:
+        self.weights_ = np.asarray(weights, dtype=np.float64)
+        self.means_ = np.asarray(means, dtype=np.float64)
+        self.covariances_ = np.asarray(covariances, dtype=np.float64)
+        self.precisions_cholesky_ = _precision_cholesky(self.covariances_)
+        self._log_det = np.log(np.diagonal(self.precisions_cholesky_, axis1=1, axis2=2)).sum(axis=1)
+        self._log_weights = np.log(self.weights_)
+
+    def _reset_stats(self) -> None:
+        # Estadísticos suficientes normalizados del EM online.
+        self._s0 = self.weights_.copy()
+        self._s1 = self.weights_[:, None] * self.means_
+        self._s2 = self.weights_[:, None, None] * (self.covariances_ + np.einsum("kd,ke->kde", self.means_, self.means_))
+
+    def _align(self, means: np.ndarray, covariances: np.ndarray) -> np.ndarray:
+        if self.component_order_ is None or not hasattr(self, "means_"):
+            return np.argsort(np.trace(covariances, axis1=1, axis2=2), kind="stable")
+        # Asignación de coste mínimo (Hungarian, O(k^3)): cost[j, i] = ||media anterior j - nueva i||².
+        cost = ((self.means_[:, None, :] - means[None, :, :]) ** 2).sum(axis=2)
+        _, order = linear_sum_assignment(cost)
+        return order
 
     def fit(self, X: np.ndarray) -> None:
+        if self._fitted:
+            # Arranque en caliente desde la solución actual: converge antes y no salta de óptimo.
+            self.model.set_params(
+                weights_init=self.weights_,
+                means_init=self.means_,
+                precisions_init=np.einsum("kij,klj->kil", self.precisions_cholesky_, self.precisions_cholesky_),
+            )
         self.model.fit(X)
+        order = self._align(self.model.means_, self.model.covariances_)
+        self.component_order_ = order
+        self._set_params(self.model.weights_[order], self.model.means_[order], self.model.covariances_[order])
+        self._reset_stats()
         self._fitted = True
 
+    def refit_window(self, X: np.ndarray) -> None:
+        """Reajuste sobre una ventana deslizante reciente manteniendo el significado de las etiquetas."""
+        self.fit(X)
+
+    def _log_prob(self, X: np.ndarray) -> np.ndarray:
+        diff = X[:, None, :] - self.means_[None, :, :]
+        y = np.einsum("nkd,kde->nke", diff, self.precisions_cholesky_)
+        d = X.shape[1]
+        return -0.5 * (d * _LOG_2PI + np.einsum("nke,nke->nk", y, y)) + self._log_det + self._log_weights
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        if not self._fitted:
+            raise RuntimeError("RegimeDetector no entrenado")
+        lp = self._log_prob(np.atleast_2d(np.asarray(X, dtype=np.float64)))
+        lp -= lp.max(axis=1, keepdims=True)
+        p = np.exp(lp)
+        return p / p.sum(axis=1, keepdims=True)
+
     def predict(self, X: np.ndarray) -> np.ndarray:
         if not self._fitted:
             raise RuntimeError("RegimeDetector no entrenado")
-        labels = self.model.predict(X)
+        labels = self._log_prob(np.atleast_2d(np.asarray(X, dtype=np.float64))).argmax(axis=1)
         return labels
 
+    def predict_one(self, x: np.ndarray) -> int:
+        return int(self.predict(np.asarray(x, dtype=np.float64)[None, :])[0])
+
+    def update(self, X: np.ndarray, learning_rate: float | None = None) -> None:
+        """
+        Paso de EM online con una barra (D,) o un mini-batch (N, D): los estadísticos
+        suficientes se mezclan con peso ``learning_rate`` (olvido exponencial).
+        """
+        if not self._fitted:
+            raise RuntimeError("RegimeDetector no entrenado")
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        gamma = self.learning_rate if learning_rate is None else learning_rate
+        resp = self.predict_proba(X)
+        n = len(X)
+        s0 = resp.mean(axis=0)
+        s1 = resp.T @ X / n
+        s2 = np.einsum("nk,nd,ne->kde", resp, X, X) / n
+        self._s0 = (1 - gamma) * self._s0 + gamma * s0
+        self._s1 = (1 - gamma) * self._s1 + gamma * s1
+        self._s2 = (1 - gamma) * self._s2 + gamma * s2
+
+        weights = self._s0 / self._s0.sum()
+        means = self._s1 / self._s0[:, None]
+        cov = self._s2 / self._s0[:, None, None] - np.einsum("kd,ke->kde", means, means)
+        cov += self.reg_covar * np.eye(X.shape[1])
+        self._set_params(weights, means, cov)
+        self.n_updates += 1
+
+    def save(self, path: str | Path) -> Path:
+        if not self._fitted:
+            raise RuntimeError("RegimeDetector no entrenado")
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as f:
+            np.savez(
+                f,
+                weights=self.weights_,
+                means=self.means_,
+                covariances=self.covariances_,
+                s0=self._s0,
+                s1=self._s1,
+                s2=self._s2,
+                component_order=self.component_order_,
+                meta=np.array([self.n_components, self.random_state, self.n_updates], dtype=np.int64),
+                rates=np.array([self.learning_rate, self.reg_covar]),
+            )
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> "RegimeDetector":
+        with np.load(path) as data:
+            n_components, random_state, n_updates = (int(v) for v in data["meta"])
+            learning_rate, reg_covar = (float(v) for v in data["rates"])
+            det = cls(n_components, random_state, learning_rate=learning_rate, reg_covar=reg_covar)
+            det._set_params(data["weights"], data["means"], data["covariances"])
+            det._s0, det._s1, det._s2 = data["s0"], data["s1"], data["s2"]
+            det.component_order_ = data["component_order"]
+            det.n_updates = n_updates
+        det._fitted = True
+        return det
+
     @staticmethod
     def map_regime(label: int) -> str:
         mapping = {0: "range", 1: "trend", 2: "shock"}
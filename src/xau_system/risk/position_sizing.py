@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+import numpy as np
 
-def risk_fraction(confidence: float, regime: str, pattern_quality: float) -> float:
-    """Política solicitada: riesgo fijo del 1% por operación."""
+
+def risk_fraction(
+    confidence: float,
+    regime: str,
+    pattern_quality: float,
+    risk_base: float = 0.01,
+    risk_max: float = 0.03,
+) -> float:
+    """Política solicitada: riesgo fijo por operación, ``risk_base`` (1%) acotado por ``risk_max``."""
     _ = (confidence, regime, pattern_quality)
-    return 0.01
+    return min(risk_base, risk_max)
 
 
 def profit_target_pct(confidence: float) -> float:
@@ -35,3 +43,33 @@ def compute_sl_tp(
         sl = entry
         tp = entry
     return sl, tp
+
+
+def risk_fraction_vectorized(
+    confidence: np.ndarray,
+    regime=None,
+    pattern_quality=None,
+    risk_base: float = 0.01,
+    risk_max: float = 0.03,
+) -> np.ndarray:
+    _ = (regime, pattern_quality)
+    return np.full(np.shape(confidence), min(risk_base, risk_max))
+
+
+def profit_target_pct_vectorized(confidence: np.ndarray) -> np.ndarray:
+    return np.where(np.asarray(confidence) >= 0.80, 0.03, 0.02)
+
+
+def compute_sl_tp_vectorized(
+    entry: np.ndarray,
+    atr: np.ndarray,
+    direction: np.ndarray,
+    tp_pct: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """``compute_sl_tp`` con ``tp_pct`` por fila; ``direction`` en códigos 0 BUY, 1 SELL, 2 NEUTRAL."""
+    entry = np.asarray(entry, dtype=np.float64)
+    atr = np.maximum(np.asarray(atr, dtype=np.float64), 1e-6)
+    buy, sell = direction == 0, direction == 1
+    sl = np.where(buy, entry - 1.2 * atr, np.where(sell, entry + 1.2 * atr, entry))
+    tp = np.where(buy, entry * (1.0 + tp_pct), np.where(sell, entry * (1.0 - tp_pct), entry))
+    return sl, tp
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, asdict
-import json
 from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from xau_system.rl.replay_buffer import PrioritizedReplayBuffer, ReplayBatch
+from xau_system.utils.persistence import RowWriter, open_ndjson_writer
+from xau_system.utils.segmented_log import SegmentConfig
 
 
 @dataclass
@@ -16,10 +22,50 @@ class Experience:
 
 
 class ExperienceBuffer:
-    def __init__(self, path: str = "data/experiences.ndjson"):
+    """
+    Persiste cada experiencia en NDJSON (escritura en segundo plano) y la mantiene en
+    un replay priorizado en memoria para muestrear minibatches sin releer el archivo.
+    """
+
+    def __init__(
+        self,
+        path: str = "data/experiences.ndjson",
+        writer: RowWriter | None = None,
+        replay: PrioritizedReplayBuffer | None = None,
+        capacity: int = 100_000,
+        segments: SegmentConfig | None = None,
+    ):
         self.path = Path(path)
-        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Con ``segments`` ``path`` es el directorio del log segmentado.
+        self.writer = writer or open_ndjson_writer(self.path, segments=segments)
+        self.replay = replay if replay is not None else PrioritizedReplayBuffer(capacity)
 
     def append(self, exp: Experience) -> None:
-        with self.path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(asdict(exp)) + "\n")
+        self.replay.add(exp.state_id, exp.signal, exp.confidence, exp.reward, exp.pnl, exp.regime)
+        self.writer.write(asdict(exp))
+
+    def subscribe(self, fn: Callable[[int], None]) -> bool:
+        """
+        Avisa a ``fn(n_rows)`` cuando nuevas experiencias quedan escritas en disco
+        (p.ej. ``OnlineTrainer.notify``). Devuelve False si el escritor no lo soporta.
+        """
+        add_listener = getattr(self.writer, "add_listener", None)
+        if add_listener is None:
+            return False
+        add_listener(fn)
+        return True
+
+    def sample(self, batch_size: int = 256, beta: float = 0.4) -> ReplayBatch:
+        return self.replay.sample(batch_size, beta)
+
+    def update_priorities(self, indices: np.ndarray, priorities: np.ndarray) -> None:
+        self.replay.update_priorities(indices, priorities)
+
+    def __len__(self) -> int:
+        return len(self.replay)
+
+    def flush(self) -> None:
+        self.writer.flush()
+
+    def close(self) -> None:
+        self.writer.close()
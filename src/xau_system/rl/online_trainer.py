@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+import json
+import os
 import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Callable
+
+from xau_system.utils.segmented_log import SegmentedLogReader
+
+_READ_BYTES = 1 << 22
+_READ_ROWS = 10_000
 
 
 @dataclass
@@ -12,47 +20,189 @@ class TrainerStats:
     steps: int = 0
     last_loss: float = 0.0
     last_update_ts: float = 0.0
+    experiences: int = 0
+    queue_depth: int = 0  # experiencias leídas pendientes de minibatch
+    experiences_per_s: float = 0.0
+    steps_per_s: float = 0.0
+    offset: int = 0  # bytes del NDJSON (o seq del log segmentado) ya entrenados, persistido
 
 
 class OnlineTrainer:
     """
     Entrenamiento online simplificado en caliente.
-    Lee líneas nuevas de un archivo NDJSON de experiencias y simula pasos de update.
+    Sigue el NDJSON de experiencias desde el último offset entrenado: se despierta con
+    ``notify`` (p.ej. ``ExperienceBuffer.subscribe(trainer.notify)``) o, para escritores
+    de otros procesos, cada ``poll_s``. Agrupa en minibatches de ``batch_size`` y lanza
+    un lote incompleto cuando su experiencia más antigua supera ``max_latency_s``. El
+    offset se persiste tras cada paso, así un reinicio no repite ni salta experiencias.
+    Si ``experience_path`` es un log segmentado (directorio, ver
+    ``utils.segmented_log``) la posición es el número de secuencia y sobrevive a la
+    rotación y compresión de segmentos. Con ``segmented=None`` el tipo se detecta
+    cuando la ruta existe; si el entrenador arranca antes que el escritor, espera a
+    que éste la cree en vez de crearla él con el tipo equivocado.
     """
 
-    def __init__(self, experience_path: str = "data/experiences.ndjson", poll_s: float = 1.0):
+    def __init__(
+        self,
+        experience_path: str = "data/experiences.ndjson",
+        poll_s: float = 1.0,
+        batch_size: int = 32,
+        max_latency_s: float = 0.05,
+        offset_path: str | None = None,
+        on_step: Callable[[TrainerStats], None] | None = None,
+        segmented: bool | None = None,
+    ):
         self.experience_path = Path(experience_path)
+        self._segmented_arg = segmented
+        self.segmented = self._detect_segmented()
+        self.offset_path = Path(offset_path) if offset_path else self.experience_path.with_name(
+            self.experience_path.name + ".offset"
+        )
         self.poll_s = poll_s
+        self.batch_size = batch_size
+        self.max_latency_s = max_latency_s
+        self.on_step = on_step
         self.stats = TrainerStats()
         self._stop = threading.Event()
+        self._wake = threading.Event()
         self._thread: threading.Thread | None = None
-        self._offset = 0
+        self._offset = self._load_offset()
+        self.stats.offset = self._offset
+        self._started_at = 0.0
+
+    def _detect_segmented(self) -> bool | None:
+        """None mientras no se sepa: ruta aún inexistente y sin ``segmented`` explícito."""
+        if self._segmented_arg is not None:
+            return self._segmented_arg
+        if not self.experience_path.exists():
+            return None
+        return self.experience_path.is_dir()
+
+    @property
+    def _position_key(self) -> str:
+        return "seq" if self.segmented else "offset"
+
+    def _load_offset(self) -> int:
+        if self.segmented is None:
+            return 0
+        try:
+            return int(json.loads(self.offset_path.read_text(encoding="utf-8"))[self._position_key])
+        except (FileNotFoundError, ValueError, KeyError):
+            return 0
 
-    def _train_step(self, line: str) -> float:
+    def _save_offset(self, offset: int) -> None:
+        tmp = self.offset_path.with_name(self.offset_path.name + ".tmp")
+        tmp.write_text(json.dumps({self._position_key: offset}), encoding="utf-8")
+        os.replace(tmp, self.offset_path)
+
+    def notify(self, n_rows: int = 1) -> None:
+        """Hay experiencias nuevas en el archivo."""
+        self._wake.set()
+
+    def _train_step(self, batch: list[dict[str, Any]]) -> float:
         # Proxy de "loss": decrece suavemente a medida que hay más pasos.
         base = max(0.01, 1.0 / (1.0 + self.stats.steps))
-        penalty = 0.0 if line.strip() else 0.1
+        penalty = 0.1 * sum(1 for row in batch if not row) / len(batch)
         return base + penalty
 
-    def _loop(self) -> None:
-        self.stats.running = True
+    @staticmethod
+    def _parse(chunk: bytes, start: int) -> list[tuple[dict[str, Any], int]]:
+        """Filas completas de ``chunk`` con el offset de fin de cada una."""
+        rows, pos = [], 0
+        while True:
+            end = chunk.find(b"\n", pos)
+            if end < 0:
+                return rows
+            try:
+                row = json.loads(chunk[pos:end])
+            except ValueError:
+                row = {}
+            rows.append((row, start + end + 1))
+            pos = end + 1
+
+    def _run_batch(self, batch: list[tuple[dict[str, Any], int]]) -> None:
+        self.stats.last_loss = self._train_step([row for row, _ in batch])
+        self.stats.steps += 1
+        self.stats.experiences += len(batch)
+        self.stats.last_update_ts = time.time()
+        self._offset = batch[-1][1]
+        self._save_offset(self._offset)
+        self.stats.offset = self._offset
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        self.stats.experiences_per_s = self.stats.experiences / elapsed
+        self.stats.steps_per_s = self.stats.steps / elapsed
+        if self.on_step is not None:
+            self.on_step(self.stats)
+
+    def _open_source(self):
+        """Devuelve (``read(pos) -> [(fila, pos_siguiente)]``, recurso a cerrar)."""
+        if self.segmented:
+            self.experience_path.mkdir(parents=True, exist_ok=True)
+            reader = SegmentedLogReader(self.experience_path)
+
+            def read_log(seq: int) -> list[tuple[dict[str, Any], int]]:
+                return [(row, s + 1) for s, row in reader.read(seq, max_rows=_READ_ROWS)]
+
+            return read_log, reader
+
         self.experience_path.parent.mkdir(parents=True, exist_ok=True)
         self.experience_path.touch(exist_ok=True)
+        f = self.experience_path.open("rb")
+
+        def read_file(pos: int) -> list[tuple[dict[str, Any], int]]:
+            f.seek(pos)
+            # Sólo se consumen líneas completas; el resto se relee en la siguiente vuelta.
+            return self._parse(f.read(_READ_BYTES), pos)
+
+        return read_file, f
+
+    def _loop(self) -> None:
+        self.stats.running = True
+        self._started_at = time.monotonic()
 
-        while not self._stop.is_set():
-            with self.experience_path.open("r", encoding="utf-8") as f:
-                f.seek(self._offset)
-                new_lines = f.readlines()
-                self._offset = f.tell()
+        pending: list[tuple[dict[str, Any], int]] = []
+        read_pos = 0
+        oldest = 0.0
+        read, resource = None, None
+        try:
+            while not self._stop.is_set():
+                if read is None:
+                    self.segmented = self._detect_segmented()
+                    if self.segmented is None:
+                        self._wake.wait(self.poll_s)
+                        self._wake.clear()
+                        continue
+                    # Otro entrenador (p.ej. el proceso de ``TrainingWorker``) pudo avanzar
+                    # el offset persistido desde que se creó esta instancia.
+                    self._offset = read_pos = self._load_offset()
+                    self.stats.offset = self._offset
+                    read, resource = self._open_source()
 
-            for line in new_lines:
-                self.stats.steps += 1
-                self.stats.last_loss = self._train_step(line)
-                self.stats.last_update_ts = time.time()
+                new = read(read_pos)
+                if new:
+                    read_pos = new[-1][1]
+                    if not pending:
+                        oldest = time.monotonic()
+                    pending.extend(new)
 
-            time.sleep(self.poll_s)
+                while len(pending) >= self.batch_size:
+                    self._run_batch(pending[: self.batch_size])
+                    del pending[: self.batch_size]
+                    oldest = time.monotonic()
+                if pending and time.monotonic() - oldest >= self.max_latency_s:
+                    self._run_batch(pending)
+                    pending = []
+                self.stats.queue_depth = len(pending)
+                if new:
+                    continue  # puede quedar más por leer (lectura acotada o siguiente segmento)
 
-        self.stats.running = False
+                timeout = self.poll_s if not pending else max(0.0, oldest + self.max_latency_s - time.monotonic())
+                self._wake.wait(timeout)
+                self._wake.clear()  # se limpia antes de releer: un aviso posterior no se pierde
+        finally:
+            if resource is not None:
+                resource.close()
+            self.stats.running = False
 
     def start(self) -> bool:
         if self._thread and self._thread.is_alive():
@@ -66,6 +216,7 @@ class OnlineTrainer:
         if not self._thread:
             return False
         self._stop.set()
+        self._wake.set()
         self._thread.join(timeout=2.0)
         return True
 
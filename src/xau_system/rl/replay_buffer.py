@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import threading
+
+import numpy as np
+
+from xau_system.utils.types import SIGNAL_LABELS
+
+_SIGNAL_CODES = {s: i for i, s in enumerate(SIGNAL_LABELS)}
+
+
+class SumTree:
+    """
+    Árbol de sumas sobre ``capacity`` hojas (rellenado a potencia de dos) en un único
+    array: el nodo ``i`` tiene hijos ``2i`` y ``2i + 1`` y la raíz es ``tree[1]``.
+    Actualización y muestreo en O(log n), ambos vectorizados por lote.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = int(capacity)
+        self.depth = max(1, (self.capacity - 1).bit_length())
+        self.n_leaves = 1 << self.depth
+        self.tree = np.zeros(2 * self.n_leaves, dtype=np.float64)
+
+    @property
+    def total(self) -> float:
+        return float(self.tree[1])
+
+    def get(self, idx: np.ndarray) -> np.ndarray:
+        return self.tree[np.asarray(idx, dtype=np.int64) + self.n_leaves]
+
+    def update(self, idx: np.ndarray, values: np.ndarray) -> None:
+        """Fija varias hojas y recalcula sólo los ancestros afectados, nivel a nivel."""
+        tree = self.tree
+        node = np.asarray(idx, dtype=np.int64) + self.n_leaves
+        tree[node] = values  # con índices repetidos gana el último
+        for _ in range(self.depth):
+            # Padres repetidos reciben la misma suma: no hace falta deduplicar.
+            node >>= 1
+            left = node << 1
+            tree[node] = tree.take(left) + tree.take(left + 1)
+
+    def find(self, mass: np.ndarray) -> np.ndarray:
+        """Hoja cuya suma acumulada contiene cada valor de ``mass`` (en ``[0, total)``)."""
+        tree = self.tree
+        mass = np.array(mass, dtype=np.float64)
+        node = np.ones(len(mass), dtype=np.int64)
+        for _ in range(self.depth):
+            node <<= 1
+            left = tree.take(node)
+            right = mass >= left
+            mass -= left * right
+            node += right
+        return node - self.n_leaves
+
+
+@dataclass
+class ReplayBatch:
+    indices: np.ndarray  # slots del buffer, para update_priorities
+    weights: np.ndarray  # importance sampling, normalizados a máximo 1
+    state_id: np.ndarray
+    signal: np.ndarray  # int8, índice en SIGNAL_LABELS
+    confidence: np.ndarray
+    reward: np.ndarray
+    pnl: np.ndarray
+    regime: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+
+class PrioritizedReplayBuffer:
+    """
+    Replay acotado en memoria con columnas NumPy (anillo de ``capacity`` filas) y
+    muestreo priorizado: ``P(i) ∝ p_i^alpha`` y pesos ``(N · P(i))^-beta``. Las
+    experiencias nuevas entran con la prioridad máxima vista para muestrearse al
+    menos una vez. El coste de ``sample`` depende del lote y de log(capacity), no
+    del histórico en disco.
+    """
+
+    def __init__(self, capacity: int = 100_000, alpha: float = 0.6, eps: float = 1e-6, seed: int | None = None):
+        self.capacity = int(capacity)
+        self.alpha = alpha
+        self.eps = eps
+        self.tree = SumTree(self.capacity)
+        self.state_id = np.empty(self.capacity, dtype=object)
+        self.signal = np.zeros(self.capacity, dtype=np.int8)
+        self.confidence = np.zeros(self.capacity, dtype=np.float64)
+        self.reward = np.zeros(self.capacity, dtype=np.float64)
+        self.pnl = np.zeros(self.capacity, dtype=np.float64)
+        self.regime = np.empty(self.capacity, dtype=object)
+        self._pos = 0
+        self._size = 0
+        self._max_priority = 1.0
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, state_id: str, signal: str, confidence: float, reward: float, pnl: float, regime: str) -> int:
+        with self._lock:
+            i = self._pos
+            self.state_id[i] = state_id
+            self.signal[i] = _SIGNAL_CODES.get(signal, _SIGNAL_CODES["NEUTRAL"])
+            self.confidence[i] = confidence
+            self.reward[i] = reward
+            self.pnl[i] = pnl
+            self.regime[i] = regime
+            self.tree.update(np.array([i]), np.array([self._max_priority**self.alpha]))
+            self._pos = (i + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+            return i
+
+    def sample(self, batch_size: int = 256, beta: float = 0.4) -> ReplayBatch:
+        """Muestreo estratificado: un valor uniforme por cada tramo de la masa total."""
+        with self._lock:
+            if self._size == 0:
+                raise ValueError("El buffer de replay está vacío")
+            total = self.tree.total
+            edges = np.arange(batch_size, dtype=np.float64) * (total / batch_size)
+            mass = edges + self._rng.random(batch_size) * (total / batch_size)
+            idx = np.minimum(self.tree.find(np.minimum(mass, np.nextafter(total, 0))), self._size - 1)
+            prob = self.tree.get(idx) / total
+            weights = (self._size * prob) ** -beta
+            weights /= weights.max()
+            return ReplayBatch(
+                idx,
+                weights,
+                self.state_id[idx],
+                self.signal[idx],
+                self.confidence[idx],
+                self.reward[idx],
+                self.pnl[idx],
+                self.regime[idx],
+            )
+
+    def update_priorities(self, indices: np.ndarray, priorities: np.ndarray) -> None:
+        """Nuevas prioridades (p.ej. |TD error|) para un lote muestreado."""
+        p = np.abs(np.asarray(priorities, dtype=np.float64)) + self.eps
+        with self._lock:
+            self._max_priority = max(self._max_priority, float(p.max()))
+            self.tree.update(indices, p**self.alpha)
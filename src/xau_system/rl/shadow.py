@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+import math
+import threading
+from typing import Callable
+
+from xau_system.rl.online_update import OnlineUpdateResult, gating_decision
+from xau_system.rl.reward import trade_reward
+
+_POSITION = {"BUY": 1.0, "SELL": -1.0, "NEUTRAL": 0.0}
+
+
+@dataclass
+class StreamingPerformance:
+    """
+    Estimadores O(1) por observación: media/varianza de Welford (Sharpe), equity
+    compuesta con pico y drawdown máximo, y agregados de ``trade_reward``.
+    """
+
+    periods_per_year: int = 252
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    equity: float = 1.0
+    peak: float = 1.0
+    drawdown: float = 0.0  # actual, >= 0
+    max_drawdown: float = 0.0
+    reward_sum: float = 0.0
+
+    def update(self, ret: float, turnover_cost: float = 0.0, regime_mismatch: float = 0.0) -> float:
+        """Añade un rendimiento neto por periodo y devuelve su ``trade_reward``."""
+        self.n += 1
+        delta = ret - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (ret - self.mean)
+
+        self.equity *= 1.0 + ret
+        self.peak = max(self.peak, self.equity)
+        dd = 1.0 - self.equity / self.peak
+        dd_increment = max(0.0, dd - self.drawdown)
+        self.drawdown = dd
+        self.max_drawdown = max(self.max_drawdown, dd)
+
+        reward = trade_reward(ret, dd_increment, turnover_cost, regime_mismatch)
+        self.reward_sum += reward
+        return reward
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    @property
+    def sharpe(self) -> float:
+        std = self.std
+        return self.mean / std * math.sqrt(self.periods_per_year) if std > 0 else 0.0
+
+    @property
+    def reward_mean(self) -> float:
+        return self.reward_sum / self.n if self.n else 0.0
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            "n": self.n,
+            "mean": self.mean,
+            "std": self.std,
+            "sharpe": self.sharpe,
+            "equity": self.equity,
+            "max_drawdown": self.max_drawdown,
+            "reward_sum": self.reward_sum,
+            "reward_mean": self.reward_mean,
+        }
+
+
+@dataclass
+class ShadowDecision:
+    checkpoint: int  # observaciones totales
+    window: int  # ventana de evaluación (se abre una nueva tras cada promoción)
+    result: OnlineUpdateResult
+    champion: dict[str, float]
+    challenger: dict[str, float]
+
+
+@dataclass
+class _Leg:
+    perf: StreamingPerformance
+    position: float = 0.0
+
+
+@dataclass
+class ShadowEvaluator:
+    """
+    Evalúa en sombra un challenger frente al modelo en vivo sobre las mismas barras.
+    Cada ``checkpoint_every`` observaciones de la ventana (y a partir de
+    ``min_observations``) llama a ``gating_decision`` con el Sharpe y el drawdown
+    máximo acumulados y, si se configura, a ``on_decision`` (p.ej. para
+    ``ModelRegistry.promote``). Tras una promoción el challenger pasa a ser el modelo
+    en vivo, así que ambas patas empiezan una ventana nueva: las métricas del par
+    anterior ya no describen la comparación siguiente. Sólo se guardan las últimas
+    ``max_decisions`` decisiones. En el camino caliente sólo hay actualizaciones escalares.
+    """
+
+    checkpoint_every: int = 1_000
+    min_observations: int = 1_000
+    max_mdd_deterioration: float = 0.02
+    periods_per_year: int = 252
+    cost_per_turnover: float = 0.0  # coste por unidad de cambio de posición, en rendimiento
+    on_decision: Callable[[ShadowDecision], None] | None = None
+    max_decisions: int = 100
+    decisions: deque[ShadowDecision] = field(default_factory=deque)
+
+    def __post_init__(self) -> None:
+        if self.max_decisions < 1:
+            raise ValueError("max_decisions debe ser >= 1")
+        self.decisions = deque(self.decisions, maxlen=self.max_decisions)
+        self.champion = _Leg(StreamingPerformance(self.periods_per_year))
+        self.challenger = _Leg(StreamingPerformance(self.periods_per_year))
+        self.observations = 0
+        self.window = 0
+        self._last_close: float | None = None
+        self._lock = threading.RLock()
+
+    def _new_window(self) -> None:
+        """El challenger promovido es el nuevo modelo en vivo; se mantiene su posición."""
+        self.champion = _Leg(StreamingPerformance(self.periods_per_year), self.challenger.position)
+        self.challenger = _Leg(StreamingPerformance(self.periods_per_year), self.challenger.position)
+        self.window += 1
+
+    @property
+    def last_decision(self) -> ShadowDecision | None:
+        return self.decisions[-1] if self.decisions else None
+
+    def observe(
+        self,
+        champion_return: float,
+        challenger_return: float,
+        champion_turnover: float = 0.0,
+        challenger_turnover: float = 0.0,
+        champion_mismatch: float = 0.0,
+        challenger_mismatch: float = 0.0,
+    ) -> ShadowDecision | None:
+        """Rendimientos netos del periodo para ambos modelos; devuelve la decisión si toca checkpoint."""
+        with self._lock:
+            self.champion.perf.update(champion_return, champion_turnover, champion_mismatch)
+            self.challenger.perf.update(challenger_return, challenger_turnover, challenger_mismatch)
+            self.observations += 1
+            n = self.champion.perf.n
+            if n < self.min_observations or n % self.checkpoint_every:
+                return None
+            decision = ShadowDecision(
+                checkpoint=self.observations,
+                window=self.window,
+                result=gating_decision(
+                    sharpe_old=self.champion.perf.sharpe,
+                    sharpe_new=self.challenger.perf.sharpe,
+                    mdd_old=self.champion.perf.max_drawdown,
+                    mdd_new=self.challenger.perf.max_drawdown,
+                    max_mdd_deterioration=self.max_mdd_deterioration,
+                ),
+                champion=self.champion.perf.snapshot(),
+                challenger=self.challenger.perf.snapshot(),
+            )
+            self.decisions.append(decision)
+            if decision.result.promoted:
+                self._new_window()
+        if self.on_decision is not None:
+            self.on_decision(decision)
+        return decision
+
+    def observe_bar(
+        self,
+        close: float,
+        champion_signal: str,
+        challenger_signal: str,
+        champion_mismatch: float = 0.0,
+        challenger_mismatch: float = 0.0,
+    ) -> ShadowDecision | None:
+        """
+        Cierre de barra y señal de cada modelo. Cada uno mantiene la posición de su
+        señal anterior durante la barra (+1 BUY, -1 SELL, 0 NEUTRAL) y paga
+        ``cost_per_turnover`` por cada cambio.
+        """
+        with self._lock:
+            prev, self._last_close = self._last_close, close
+            if prev is None:
+                self.champion.position = _POSITION[champion_signal]
+                self.challenger.position = _POSITION[challenger_signal]
+                return None
+            move = close / prev - 1.0
+            legs = []
+            for leg, signal in ((self.champion, champion_signal), (self.challenger, challenger_signal)):
+                new_pos = _POSITION[signal]
+                turnover = abs(new_pos - leg.position) * self.cost_per_turnover
+                legs.append((leg.position * move - turnover, turnover))
+                leg.position = new_pos
+            (r_old, t_old), (r_new, t_new) = legs
+            return self.observe(r_old, r_new, t_old, t_new, champion_mismatch, challenger_mismatch)
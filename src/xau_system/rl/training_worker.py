@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, fields
+import multiprocessing as mp
+import os
+import threading
+
+from xau_system.rl.online_trainer import OnlineTrainer, TrainerStats
+
+_STAT_TYPES = {f.name: type(f.default) for f in fields(TrainerStats)}
+
+
+@dataclass
+class WorkerConfig:
+    experience_path: str = "data/experiences.ndjson"
+    segmented: bool | None = None  # None = detectar (archivo o directorio de segmentos)
+    batch_size: int = 32
+    max_latency_s: float = 0.05
+    poll_s: float = 1.0
+    cpu_affinity: tuple[int, ...] | None = None  # None = sin fijar
+    niceness: int = 10  # incremento de nice del proceso de entrenamiento
+    publish_interval_s: float = 0.25
+
+
+def _apply_scheduling(config: WorkerConfig) -> None:
+    if config.cpu_affinity and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, set(config.cpu_affinity))
+    if config.niceness and hasattr(os, "nice"):
+        os.nice(config.niceness)
+
+
+def _publish(shared, stats: TrainerStats) -> None:
+    with shared.get_lock():
+        shared[:] = [float(v) for v in asdict(stats).values()]
+
+
+def _worker_main(config: WorkerConfig, conn, shared) -> None:
+    """Proceso hijo: ``OnlineTrainer`` en su propio intérprete, controlado por ``conn``."""
+    _apply_scheduling(config)
+    trainer = OnlineTrainer(
+        experience_path=config.experience_path,
+        segmented=config.segmented,
+        poll_s=config.poll_s,
+        batch_size=config.batch_size,
+        max_latency_s=config.max_latency_s,
+        on_step=lambda stats: _publish(shared, stats),
+    )
+    trainer.start()
+    try:
+        while True:
+            try:
+                msg = conn.recv() if conn.poll(config.publish_interval_s) else None
+            except EOFError:  # el proceso padre ha desaparecido
+                break
+            if msg == "stop":
+                break
+            if msg == "notify":
+                trainer.notify()
+            _publish(shared, trainer.status())
+    finally:
+        trainer.stop()
+        _publish(shared, trainer.status())
+
+
+class TrainingWorker:
+    """
+    Misma interfaz que ``OnlineTrainer`` (``start``/``stop``/``status``/``notify``) pero
+    entrenando en un proceso aparte, con afinidad de CPU y nice configurables, para no
+    competir por el GIL con la API. Los avisos de experiencias nuevas viajan por un
+    ``Pipe`` local y las estadísticas vuelven por memoria compartida, sin ida y vuelta
+    en ``status``. ``OnlineTrainer`` aún no produce pesos, así que no hay intercambio
+    de pesos entre procesos.
+    """
+
+    def __init__(self, config: WorkerConfig | None = None):
+        self.config = config or WorkerConfig()
+        self._ctx = mp.get_context("spawn")
+        self._shared = self._ctx.Array("d", len(_STAT_TYPES))
+        self._proc = None
+        self._conn = None
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()  # un solo emisor a la vez en el Pipe
+
+    @property
+    def pid(self) -> int | None:
+        return self._proc.pid if self._proc is not None else None
+
+    def start(self) -> bool:
+        with self._lock:
+            if self._proc is not None and self._proc.is_alive():
+                return False
+            parent, child = self._ctx.Pipe()
+            self._proc = self._ctx.Process(
+                target=_worker_main,
+                args=(self.config, child, self._shared),
+                name="xau-training-worker",
+                daemon=True,
+            )
+            self._proc.start()
+            child.close()
+            self._conn = parent
+            return True
+
+    def notify(self, n_rows: int = 1) -> None:
+        """
+        No bloquea: se llama desde el hilo escritor de experiencias. Si ya hay un envío
+        en curso (otro aviso o ``stop``) el hijo se despertará igualmente.
+        """
+        conn = self._conn
+        if conn is None or not self._send_lock.acquire(blocking=False):
+            return
+        try:
+            conn.send("notify")
+        except (BrokenPipeError, OSError):
+            pass
+        finally:
+            self._send_lock.release()
+
+    def stop(self, timeout: float = 5.0) -> bool:
+        with self._lock:
+            if self._proc is None or self._conn is None:
+                return False
+            try:
+                with self._send_lock:
+                    self._conn.send("stop")
+            except (BrokenPipeError, OSError):
+                pass
+            self._proc.join(timeout)
+            if self._proc.is_alive():
+                self._proc.terminate()
+                self._proc.join()
+            conn, self._conn = self._conn, None
+            with self._send_lock:
+                conn.close()
+            return True
+
+    def status(self) -> TrainerStats:
+        with self._shared.get_lock():
+            values = list(self._shared[:])
+        stats = TrainerStats(**{name: cast(v) for (name, cast), v in zip(_STAT_TYPES.items(), values)})
+        stats.running = self._proc is not None and self._proc.is_alive()
+        return stats
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import atexit
+from dataclasses import dataclass
+import json
+import logging
+import os
+from pathlib import Path
+import queue
+import threading
+import time
+from typing import Any, Callable, Protocol
+import weakref
+
+from xau_system.utils.segmented_log import SegmentConfig, SegmentedNDJSONSink
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WriterConfig:
+    """Política de group-commit del escritor en segundo plano."""
+
+    max_batch_rows: int = 512
+    flush_interval_s: float = 0.05
+    fsync: str = "none"  # none | batch | interval
+    fsync_interval_s: float = 1.0
+    max_queue_rows: int = 100_000
+    put_timeout_s: float | None = None  # None = bloquear (backpressure) hasta que haya hueco
+
+
+class LineSink(Protocol):
+    def write_lines(self, lines: list[str]) -> None:
+        ...
+
+    def flush(self, fsync: bool = False) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class RowWriter(Protocol):
+    def write(self, row: dict[str, Any]) -> None:
+        ...
+
+    def flush(self) -> None:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class NDJSONFileSink:
+    """Archivo NDJSON en modo append con el handle abierto entre lotes."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = self.path.open("a", encoding="utf-8")
+
+    def write_lines(self, lines: list[str]) -> None:
+        self._f.write("".join(lines))
+
+    def flush(self, fsync: bool = False) -> None:
+        self._f.flush()
+        if fsync:
+            os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self._f.flush()
+            self._f.close()
+
+
+def _encode(row: dict[str, Any]) -> str:
+    return json.dumps(row) + "\n"
+
+
+def _notify_listeners(listeners: list[Callable[[int], None]], n_rows: int) -> None:
+    """
+    Las filas ya están escritas: un oyente que falla no debe hacer creer al llamador
+    que la escritura falló ni, en el escritor de fondo, matar el hilo con filas en cola.
+    """
+    for fn in listeners:
+        try:
+            fn(n_rows)
+        except Exception:
+            logger.exception("Oyente de persistencia %r falló", fn)
+
+
+class SyncRowWriter:
+    """Escritura síncrona fila a fila (comportamiento original, útil en tests/depuración)."""
+
+    def __init__(self, sink: LineSink, fsync: bool = False):
+        self.sink = sink
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._listeners: list[Callable[[int], None]] = []
+
+    def add_listener(self, fn: Callable[[int], None]) -> None:
+        """``fn(n_rows)`` tras cada escritura ya visible en el archivo."""
+        self._listeners.append(fn)
+
+    def write(self, row: dict[str, Any]) -> None:
+        with self._lock:
+            self.sink.write_lines([_encode(row)])
+            self.sink.flush(self.fsync)
+        _notify_listeners(self._listeners, 1)
+
+    def flush(self) -> None:
+        with self._lock:
+            self.sink.flush(self.fsync)
+
+    def close(self) -> None:
+        with self._lock:
+            self.sink.close()
+
+
+_live_writers: weakref.WeakSet = weakref.WeakSet()
+
+
+class BackgroundRowWriter:
+    """
+    Group-commit en un hilo dedicado: acumula filas hasta ``max_batch_rows`` o
+    ``flush_interval_s`` y las escribe en un único write. La cola está acotada:
+    si se llena, ``write`` bloquea (o lanza RuntimeError tras ``put_timeout_s``).
+    Las filas se serializan en ``write`` (los errores de JSON llegan al llamador); si
+    el sink falla, el hilo se detiene y el error se relanza en el siguiente
+    ``write``/``flush``/``close``.
+    """
+
+    _FLUSH = object()
+    _STOP = object()
+
+    def __init__(self, sink: LineSink, config: WriterConfig | None = None):
+        self.sink = sink
+        self.config = config or WriterConfig()
+        if self.config.fsync not in {"none", "batch", "interval"}:
+            raise ValueError(f"Política fsync desconocida: {self.config.fsync}")
+        self._q: queue.Queue = queue.Queue(maxsize=self.config.max_queue_rows)
+        self._closed = False
+        self._last_fsync = time.monotonic()
+        self.rows_written = 0
+        self.batches_written = 0
+        self._listeners: list[Callable[[int], None]] = []
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, name="ndjson-writer", daemon=True)
+        self._thread.start()
+        _live_writers.add(self)
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("El escritor de persistencia se detuvo por un error") from self._error
+        if not self._thread.is_alive() and not self._closed:
+            raise RuntimeError("El hilo del escritor de persistencia no está vivo")
+
+    def _put(self, item: Any, timeout: float | None) -> None:
+        """``put`` que no queda bloqueado para siempre si el hilo escritor muere."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self._raise_if_failed()
+            wait = 0.1 if deadline is None else min(0.1, max(0.0, deadline - time.monotonic()))
+            try:
+                self._q.put(item, block=True, timeout=wait)
+                return
+            except queue.Full:
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise RuntimeError("Cola de persistencia llena (backpressure)") from None
+
+    def write(self, row: dict[str, Any]) -> None:
+        if self._closed:
+            raise RuntimeError("Escritor cerrado")
+        self._put(_encode(row), self.config.put_timeout_s)
+
+    def flush(self) -> None:
+        """Bloquea hasta que todo lo encolado antes de la llamada esté escrito."""
+        if self._closed:
+            self._raise_if_failed()
+            return
+        done = threading.Event()
+        self._put((self._FLUSH, done), None)
+        while not done.wait(0.1):
+            self._raise_if_failed()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread.is_alive():
+            self._q.put((self._STOP, None))
+            self._thread.join()
+        self.sink.close()
+        self._raise_if_failed()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._q.qsize()
+
+    def add_listener(self, fn: Callable[[int], None]) -> None:
+        """``fn(n_rows)`` tras cada lote ya visible en el archivo (desde el hilo escritor)."""
+        self._listeners.append(fn)
+
+    def _commit(self, lines: list[str], force_fsync: bool = False) -> None:
+        if lines:
+            self.sink.write_lines(lines)
+            self.rows_written += len(lines)
+            self.batches_written += 1
+        now = time.monotonic()
+        fsync = force_fsync or self.config.fsync == "batch" or (
+            self.config.fsync == "interval" and now - self._last_fsync >= self.config.fsync_interval_s
+        )
+        self.sink.flush(fsync=fsync and self.config.fsync != "none")
+        if fsync:
+            self._last_fsync = now
+        if lines:
+            _notify_listeners(self._listeners, len(lines))
+
+    def _run(self) -> None:
+        try:
+            self._loop()
+        except BaseException as exc:  # se relanza en el hilo del llamador
+            self._error = exc
+
+    def _loop(self) -> None:
+        cfg = self.config
+        pending: list[str] = []
+        deadline: float | None = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._q.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, tuple) and item and item[0] is self._FLUSH:
+                self._commit(pending, force_fsync=True)
+                pending, deadline = [], None
+                item[1].set()
+                continue
+            if isinstance(item, tuple) and item and item[0] is self._STOP:
+                self._commit(pending, force_fsync=True)
+                return
+
+            if item is not None:
+                pending.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + cfg.flush_interval_s
+            if pending and (len(pending) >= cfg.max_batch_rows or time.monotonic() >= deadline):
+                self._commit(pending)
+                pending, deadline = [], None
+
+
+def open_ndjson_writer(
+    path: str | Path,
+    config: WriterConfig | None = None,
+    background: bool = True,
+    segments: SegmentConfig | None = None,
+) -> RowWriter:
+    """Con ``segments``, ``path`` es el directorio de un log segmentado con rotación y manifiesto."""
+    sink: LineSink = SegmentedNDJSONSink(path, segments) if segments is not None else NDJSONFileSink(path)
+    if not background:
+        return SyncRowWriter(sink, fsync=(config or WriterConfig()).fsync != "none")
+    return BackgroundRowWriter(sink, config)
+
+
+def close_all_writers() -> None:
+    """Vacía y cierra todos los escritores en segundo plano vivos (shutdown limpio)."""
+    for w in list(_live_writers):
+        try:
+            w.close()
+        except RuntimeError:
+            pass  # el error ya se notificó (o se notificará) a quien escribía
+
+
+atexit.register(close_all_writers)
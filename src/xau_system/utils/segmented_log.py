@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import asdict, dataclass
+import gzip
+import json
+import os
+from pathlib import Path
+import shutil
+import threading
+import time
+from typing import Any
+
+MANIFEST = "manifest.json"
+
+
+@dataclass
+class SegmentConfig:
+    """Rotación y retención del log segmentado."""
+
+    max_segment_bytes: int = 64 * 1024 * 1024
+    max_segment_age_s: float | None = 86_400.0  # None = sólo por tamaño
+    compress: bool = True  # segmentos sellados en gzip
+    compress_level: int = 6
+    retain_segments: int | None = None  # segmentos sellados a conservar (None = todos)
+    ts_field: str | None = None  # campo de cada fila para los rangos temporales; None = hora de escritura
+
+
+@dataclass
+class SegmentInfo:
+    file: str
+    first_seq: int
+    count: int = 0
+    first_ts: Any = None
+    last_ts: Any = None
+    bytes: int = 0
+    created_at: float = 0.0
+    sealed: bool = False
+
+    @property
+    def end_seq(self) -> int:
+        return self.first_seq + self.count
+
+
+def _segment_name(first_seq: int) -> str:
+    return f"{first_seq:020d}.ndjson"
+
+
+def _read_manifest(root: Path) -> list[SegmentInfo]:
+    try:
+        payload = json.loads((root / MANIFEST).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return []
+    return [SegmentInfo(**seg) for seg in payload["segments"]]
+
+
+def _open_segment(root: Path, seg: SegmentInfo):
+    path = root / seg.file
+    return gzip.open(path, "rb") if seg.file.endswith(".gz") else path.open("rb")
+
+
+def _count_complete_lines(path: Path) -> tuple[int, int]:
+    """(líneas completas, bytes hasta la última línea completa)."""
+    count = size = 0
+    with path.open("rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            count += 1
+            size += len(line)
+    return count, size
+
+
+class SegmentedNDJSONSink:
+    """
+    ``LineSink`` sobre un directorio de segmentos NDJSON con números de secuencia
+    lógicos: la fila ``seq`` vive en el segmento cuyo ``first_seq`` es el mayor
+    ``<= seq``. Al superar ``max_segment_bytes`` o ``max_segment_age_s`` el segmento
+    activo se sella (gzip) y se registra en ``manifest.json`` con su número de filas
+    y rango temporal; la retención borra los sellados más antiguos. Al abrir sólo se
+    recorre el segmento activo, así el arranque no depende de la antigüedad del log.
+    """
+
+    def __init__(self, root: str | Path, config: SegmentConfig | None = None):
+        self.root = Path(root)
+        self.config = config or SegmentConfig()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.segments = _read_manifest(self.root)
+        self._recover()
+        self._f = (self.root / self.active.file).open("ab")
+
+    @property
+    def active(self) -> SegmentInfo:
+        return self.segments[-1]
+
+    @property
+    def next_seq(self) -> int:
+        return self.active.end_seq
+
+    def _recover(self) -> None:
+        if not self.segments or self.active.sealed:
+            first = self.segments[-1].end_seq if self.segments else 0
+            self.segments.append(SegmentInfo(_segment_name(first), first, created_at=time.time()))
+            self._write_manifest()
+            return
+        seg = self.active
+        path = self.root / seg.file
+        if not path.exists() and (self.root / (seg.file + ".gz")).exists():
+            # Caída entre comprimir y actualizar el manifiesto: el sellado ya estaba hecho.
+            seg.file += ".gz"
+            seg.sealed = True
+            self._recover()
+            return
+        path.touch(exist_ok=True)
+        # Descarta una última línea incompleta (escritura interrumpida).
+        seg.count, seg.bytes = _count_complete_lines(path)
+        if path.stat().st_size != seg.bytes:
+            os.truncate(path, seg.bytes)
+
+    def _write_manifest(self) -> None:
+        tmp = self.root / (MANIFEST + ".tmp")
+        tmp.write_text(json.dumps({"segments": [asdict(s) for s in self.segments]}), encoding="utf-8")
+        os.replace(tmp, self.root / MANIFEST)
+
+    def _timestamp(self, line: str) -> Any:
+        if self.config.ts_field is None:
+            return time.time()
+        try:
+            return json.loads(line).get(self.config.ts_field)
+        except (ValueError, AttributeError):
+            return None
+
+    def _should_rotate(self) -> bool:
+        seg, cfg = self.active, self.config
+        if seg.count == 0:
+            return False
+        if seg.bytes >= cfg.max_segment_bytes:
+            return True
+        return cfg.max_segment_age_s is not None and time.time() - seg.created_at >= cfg.max_segment_age_s
+
+    def _seal(self) -> None:
+        seg, cfg = self.active, self.config
+        self._f.close()
+        path = self.root / seg.file
+        if cfg.compress:
+            tmp = self.root / (seg.file + ".gz.tmp")
+            with path.open("rb") as src, gzip.open(tmp, "wb", compresslevel=cfg.compress_level) as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp, self.root / (seg.file + ".gz"))
+            seg.file += ".gz"
+        seg.sealed = True
+        self.segments.append(SegmentInfo(_segment_name(seg.end_seq), seg.end_seq, created_at=time.time()))
+        self._apply_retention()
+        self._write_manifest()
+        if cfg.compress:
+            path.unlink()
+        self._f = (self.root / self.active.file).open("ab")
+
+    def _apply_retention(self) -> None:
+        keep = self.config.retain_segments
+        sealed = [s for s in self.segments if s.sealed]
+        if keep is None or len(sealed) <= keep:
+            return
+        for seg in sealed[: len(sealed) - keep]:
+            (self.root / seg.file).unlink(missing_ok=True)
+            self.segments.remove(seg)
+
+    def write_lines(self, lines: list[str]) -> None:
+        if not lines:
+            return
+        with self._lock:
+            if self._should_rotate():
+                self._seal()
+            data = "".join(lines).encode("utf-8")
+            self._f.write(data)
+            seg = self.active
+            if seg.count == 0:
+                seg.first_ts = self._timestamp(lines[0])
+            seg.last_ts = self._timestamp(lines[-1])
+            seg.count += len(lines)
+            seg.bytes += len(data)
+
+    def flush(self, fsync: bool = False) -> None:
+        with self._lock:
+            self._f.flush()
+            if fsync:
+                os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            if self._f.closed:
+                return
+            self._f.close()
+            # Deja constancia de las filas del segmento activo para lectores en frío.
+            self._write_manifest()
+
+
+class SegmentedLogReader:
+    """
+    Lectura por número de secuencia. Los segmentos sellados se localizan con el
+    manifiesto; en el activo sólo se devuelven líneas completas y se recuerda la
+    posición en bytes para seguir leyendo sin releer desde el principio.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.segments: list[SegmentInfo] = []
+        self._manifest_mtime: int | None = None
+        self._cursor: tuple[str, int, int] | None = None  # (archivo activo, seq, byte)
+        self._sealed: tuple[str, int, Any] | None = None  # (segmento sellado, seq, handle abierto)
+        self.refresh()
+
+    def refresh(self) -> None:
+        try:
+            mtime = (self.root / MANIFEST).stat().st_mtime_ns
+        except FileNotFoundError:
+            self.segments = []
+            return
+        if mtime != self._manifest_mtime:
+            self.segments = _read_manifest(self.root)
+            self._manifest_mtime = mtime
+
+    @property
+    def first_seq(self) -> int:
+        return self.segments[0].first_seq if self.segments else 0
+
+    def close(self) -> None:
+        if self._sealed is not None:
+            self._sealed[2].close()
+            self._sealed = None
+
+    def _segment_for(self, seq: int) -> SegmentInfo | None:
+        i = bisect_right([s.first_seq for s in self.segments], seq) - 1
+        return self.segments[max(i, 0)] if self.segments else None
+
+    def read(self, seq: int, max_rows: int | None = None) -> list[tuple[int, dict[str, Any]]]:
+        """
+        Filas ``(seq, fila)`` desde ``seq`` hasta el final de su segmento (o
+        ``max_rows``). Si ``seq`` ya se borró por retención se empieza en el primer
+        segmento conservado.
+        """
+        self.refresh()
+        seq = max(seq, self.first_seq)
+        seg = self._segment_for(seq)
+        if seg is None:
+            return []
+        if seg.sealed and seq >= seg.end_seq:
+            i = self.segments.index(seg)
+            if i + 1 >= len(self.segments):
+                return []
+            seg = self.segments[i + 1]
+            seq = max(seq, seg.first_seq)
+        if seg.sealed:
+            return self._read_sealed(seg, seq, max_rows)
+        return self._read_active(seg, seq, max_rows)
+
+    def _read_sealed(self, seg: SegmentInfo, seq: int, max_rows: int | None) -> list[tuple[int, dict[str, Any]]]:
+        # Lectura secuencial por lotes: se reutiliza el handle gzip abierto en vez de
+        # descomprimir de nuevo desde el inicio del segmento.
+        if self._sealed is not None and self._sealed[0] == seg.file and self._sealed[1] <= seq:
+            _, cur, f = self._sealed
+        else:
+            self.close()
+            f, cur = _open_segment(self.root, seg), seg.first_seq
+        out = []
+        line = b""
+        while max_rows is None or len(out) < max_rows:
+            line = f.readline()
+            if not line:
+                break
+            if cur >= seq:
+                out.append((cur, _decode(line)))
+            cur += 1
+        if line:
+            self._sealed = (seg.file, cur, f)
+        else:
+            f.close()
+            self._sealed = None
+        return out
+
+    def _read_active(self, seg: SegmentInfo, seq: int, max_rows: int | None) -> list[tuple[int, dict[str, Any]]]:
+        path = self.root / seg.file
+        if not path.exists():
+            return []
+        out = []
+        with path.open("rb") as f:
+            cur = seg.first_seq
+            if self._cursor is not None and self._cursor[0] == seg.file and self._cursor[1] <= seq:
+                _, cur, pos = self._cursor
+                f.seek(pos)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # línea aún en escritura
+                if cur >= seq:
+                    if max_rows is not None and len(out) >= max_rows:
+                        break
+                    out.append((cur, _decode(line)))
+                cur += 1
+                self._cursor = (seg.file, cur, f.tell())
+        return out
+
+    def tail(self, n: int) -> list[dict[str, Any]]:
+        """Últimas ``n`` filas, recorriendo sólo los segmentos necesarios desde el final."""
+        self.refresh()
+        out: list[dict[str, Any]] = []
+        for seg in reversed(self.segments):
+            if len(out) >= n:
+                break
+            rows = self._read_sealed(seg, seg.first_seq, None) if seg.sealed else self._read_active(seg, seg.first_seq, None)
+            out = [row for _, row in rows] + out
+        return out[-n:] if n > 0 else []
+
+
+def _decode(line: bytes) -> dict[str, Any]:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return {}
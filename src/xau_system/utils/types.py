@@ -1,8 +1,11 @@
 from dataclasses import dataclass
 from typing import Literal
 
+import numpy as np
+
 
 SignalType = Literal["BUY", "SELL", "NEUTRAL"]
+SIGNAL_LABELS: tuple[SignalType, ...] = ("BUY", "SELL", "NEUTRAL")  # mismo orden que probs
 
 
 @dataclass
@@ -14,3 +17,49 @@ class SignalOutput:
     stop_zone: tuple[float, float]
     targets: tuple[float, float]
     risk_fraction: float
+
+
+@dataclass
+class SignalBatch:
+    """Salida columnar de ``SignalEngine.infer_batch``: una fila por señal."""
+
+    instrument: str
+    signal: np.ndarray  # int8, índice en SIGNAL_LABELS
+    confidence: np.ndarray
+    entry_low: np.ndarray
+    entry_high: np.ndarray
+    stop_low: np.ndarray
+    stop_high: np.ndarray
+    target: np.ndarray
+    risk_fraction: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.signal)
+
+    def labels(self) -> np.ndarray:
+        return np.asarray(SIGNAL_LABELS)[self.signal]
+
+    def to_columns(self) -> dict[str, list]:
+        return {
+            "signal": self.labels().tolist(),
+            "confidence": self.confidence.tolist(),
+            "entry_zone": np.stack([self.entry_low, self.entry_high], axis=1).tolist(),
+            "stop_zone": np.stack([self.stop_low, self.stop_high], axis=1).tolist(),
+            "targets": np.stack([self.target, self.target], axis=1).tolist(),
+            "risk_fraction": self.risk_fraction.tolist(),
+        }
+
+    def to_outputs(self) -> list[SignalOutput]:
+        labels = self.labels()
+        return [
+            SignalOutput(
+                instrument=self.instrument,
+                signal=str(labels[i]),
+                confidence=float(self.confidence[i]),
+                entry_zone=(float(self.entry_low[i]), float(self.entry_high[i])),
+                stop_zone=(float(self.stop_low[i]), float(self.stop_high[i])),
+                targets=(float(self.target[i]), float(self.target[i])),
+                risk_fraction=float(self.risk_fraction[i]),
+            )
+            for i in range(len(self))
+        ]
@@ -0,0 +1,69 @@
+import asyncio
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from xau_system.data.aggregator import TIMEFRAME_ALIASES, MultiTimeframeAggregator
+from xau_system.data.loader import MarketFrame, resample_frame
+from xau_system.data.realtime import MarketBar, RealTimeBuffer, RealTimeCollector
+
+
+def _minute_frame(n=5000, seed=7):
+    rng = np.random.default_rng(seed)
+    ts = pd.date_range("2024-03-01 13:17", periods=n, freq="1min", tz="UTC")
+    keep = rng.random(n) > 0.2  # huecos, incluidas horas enteras sin datos
+    keep[1500:1800] = False
+    close = 2300 + np.cumsum(rng.normal(0, 0.5, n))
+    df = pd.DataFrame(
+        {
+            "timestamp": ts,
+            "open": close + rng.normal(0, 0.2, n),
+            "high": close + rng.random(n),
+            "low": close - rng.random(n),
+            "close": close,
+            "volume": rng.random(n) * 1e3 + 0.1,
+        }
+    )[keep]
+    return MarketFrame("M1", df.reset_index(drop=True))
+
+
+def _bars(frame):
+    for r in frame.data.itertuples(index=False):
+        yield MarketBar(r.timestamp.to_pydatetime(), r.open, r.high, r.low, r.close, r.volume)
+
+
+def test_aggregator_matches_resample_frame_bit_for_bit():
+    frame = _minute_frame()
+    agg = MultiTimeframeAggregator(["1H", "4H", "D1", "M15"])
+    closed = []
+    agg.register_close_callback(lambda tf, bar: closed.append(tf))
+    for bar in _bars(frame):
+        agg.on_bar(bar)
+
+    for tf in agg.timeframes:
+        expected = resample_frame(frame, TIMEFRAME_ALIASES[tf]).data
+        got = agg.to_frame(tf).data
+        assert len(got) == len(expected)
+        assert (got["timestamp"].to_numpy() == expected["timestamp"].to_numpy()).all()
+        for c in ["open", "high", "low", "close", "volume"]:
+            assert np.array_equal(got[c].to_numpy(), expected[c].to_numpy()), (tf, c)
+        assert closed.count(tf) == len(expected) - 1
+
+
+def test_aggregator_attaches_to_collector_and_skips_late_bars():
+    frame = _minute_frame(300)
+    bars = list(_bars(frame))
+    late = MarketBar(bars[0].timestamp - timedelta(hours=2), 1, 1, 1, 1, 1)
+
+    async def stream():
+        for b in bars + [late]:
+            yield b
+
+    collector = RealTimeCollector(RealTimeBuffer(maxlen=10, persist_path=None))
+    agg = MultiTimeframeAggregator(["1H"])
+    agg.attach(collector)
+    asyncio.run(collector.run(stream()))
+    assert agg.late_bars == 1
+    assert len(agg.closed("1H")) + 1 == len(resample_frame(frame, "1h").data)
+    assert agg.current("1H").close == bars[-1].close
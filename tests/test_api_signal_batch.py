@@ -0,0 +1,44 @@
+import importlib
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    # El módulo abre escritores NDJSON relativos a ``data/`` al importarse.
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module("xau_system.api.app_fastapi")
+
+
+def _item(votes, price=2300.0):
+    return {
+        "price": price,
+        "atr": 4.0,
+        "pattern_quality": 0.7,
+        "regime": "trend",
+        "d1_probs": [0.5, 0.3, 0.2],
+        "votes": votes,
+    }
+
+
+_VOTE_1H = {"timeframe": "1H", "probs": [0.8, 0.1, 0.1], "confidence": 0.9, "weight": 0.5}
+_VOTE_4H = {"timeframe": "4H", "probs": [0.7, 0.2, 0.1], "confidence": 0.8, "weight": 0.3}
+
+
+@pytest.mark.parametrize(
+    "votes_per_item",
+    [
+        [[], []],  # ningún item con votos: eje de votos de anchura 0
+        [[_VOTE_1H, _VOTE_4H], [], [_VOTE_4H]],  # votos irregulares
+    ],
+)
+def test_signal_batch_endpoint_matches_scalar_endpoint(api, votes_per_item):
+    items = [_item(v, price=2300.0 + i) for i, v in enumerate(votes_per_item)]
+    out = api.get_signal_batch(api.SignalBatchRequest(items=items))
+    assert out["n"] == len(items)
+    for i, item in enumerate(items):
+        scalar = api.get_signal(api.SignalRequest(**item))
+        assert out["signal"][i] == scalar["signal"]
+        assert np.isclose(out["confidence"][i], scalar["confidence"])
+        assert np.isclose(out["risk_fraction"][i], scalar["risk_fraction"])
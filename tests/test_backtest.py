@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from xau_system.backtest.engine import BacktestConfig, TradeSignals, run_backtest
+from xau_system.data.loader import MarketFrame
+
+
+def _frame(n: int, seed: int = 0) -> MarketFrame:
+    rng = np.random.default_rng(seed)
+    close = 2000 + np.cumsum(rng.normal(0, 1.0, n))
+    open_ = np.r_[close[0], close[:-1]] + rng.normal(0, 0.3, n)
+    high = np.maximum(open_, close) + rng.random(n)
+    low = np.minimum(open_, close) - rng.random(n)
+    ts = pd.date_range("2024-01-01", periods=n, freq="1h", tz="UTC")
+    return MarketFrame("1H", pd.DataFrame({"timestamp": ts, "open": open_, "high": high, "low": low, "close": close, "volume": 1.0}))
+
+
+def _signals(frame: MarketFrame, density: float, seed: int = 1) -> TradeSignals:
+    rng = np.random.default_rng(seed)
+    close = frame.data["close"].to_numpy()
+    n = len(close)
+    side = np.where(rng.random(n) < density, rng.integers(0, 2, n), 2).astype(np.int8)
+    atr = 3.0
+    pad = 0.15 * atr
+    stop = np.where(side == 0, close - 1.2 * atr, close + 1.2 * atr)
+    target = np.where(side == 0, close * 1.002, close * 0.998)
+    return TradeSignals(side, close - pad, close + pad, stop, target, np.full(n, 0.01))
+
+
+def test_vectorized_matches_reference_mode():
+    frame = _frame(5000)
+    cfg = BacktestConfig(entry_window=3, max_holding=6, spread=0.2, slippage=0.05, stop_slippage=0.1)
+    for density in (0.02, 0.3):
+        sig = _signals(frame, density)
+        fast = run_backtest(frame, sig, cfg)
+        ref = run_backtest(frame, sig, cfg, mode="reference")
+        assert len(fast.trades) > 20
+        pd.testing.assert_frame_equal(fast.trades, ref.trades)
+        assert np.array_equal(fast.equity, ref.equity)
+        assert fast.metrics == ref.metrics
+        assert set(fast.trades["reason"]) == {"target", "stop", "timeout"}
+        # Nunca dos posiciones abiertas a la vez.
+        assert (fast.trades["entry_row"].to_numpy()[1:] > fast.trades["exit_row"].to_numpy()[:-1]).all()
+
+
+def test_intrabar_fills_gap_and_metrics():
+    ts = pd.date_range("2024-01-01", periods=6, freq="1D", tz="UTC")
+    data = pd.DataFrame(
+        {
+            "timestamp": ts,
+            "open": [100.0, 100.0, 101.0, 100.0, 95.0, 95.0],
+            "high": [100.5, 100.6, 104.5, 100.5, 96.0, 96.0],
+            "low": [99.5, 99.8, 100.5, 99.5, 94.0, 94.0],
+            "close": [100.0, 101.0, 104.0, 100.0, 95.0, 95.0],
+            "volume": 1.0,
+        }
+    )
+    frame = MarketFrame("1D", data)
+    nan = np.nan
+    sig = TradeSignals(
+        side=np.array([0, 2, 0, 2, 2, 2], dtype=np.int8),
+        entry_low=np.array([99.9, nan, 99.9, nan, nan, nan]),
+        entry_high=np.array([100.1, nan, 100.1, nan, nan, nan]),
+        stop=np.array([98.0, nan, 98.0, nan, nan, nan]),
+        target=np.array([104.0, nan, 104.0, nan, nan, nan]),
+        risk_fraction=np.full(6, 0.01),
+    )
+    res = run_backtest(frame, sig, BacktestConfig(initial_equity=1000.0, max_holding=10))
+    first, second = res.trades.iloc[0], res.trades.iloc[1]
+    assert (first["entry_row"], first["exit_row"], first["reason"]) == (1, 2, "target")
+    assert np.isclose(first["return"], 0.01 * 4.0 / 2.0)
+    # Segunda operación: el stop se salta con gap y se ejecuta a la apertura (95).
+    assert (second["entry_row"], second["exit_row"], second["reason"]) == (3, 4, "stop")
+    assert np.isclose(second["exit_price"], 95.0)
+    m = res.metrics
+    assert m.n_trades == 2 and m.win_rate == 0.5
+    assert np.isclose(m.net_return, (1.02 * (1 - 0.025)) - 1.0)
+    assert np.isclose(m.profit_factor, 0.02 / 0.025)
+    assert m.max_drawdown > 0
@@ -0,0 +1,55 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from xau_system.data.bar_store import BAR_DTYPE, BinaryBarStore, convert_ndjson_to_store, records_to_window
+from xau_system.data.realtime import MarketBar, datetime_to_ns
+
+
+def _records(n, start_ns=0, step=60_000_000_000):
+    rec = np.zeros(n, dtype=BAR_DTYPE)
+    rec["timestamp"] = start_ns + np.arange(n) * step
+    rec["close"] = np.arange(n, dtype=float)
+    return rec
+
+
+def test_bar_store_range_and_tail_across_segments(tmp_path):
+    store = BinaryBarStore(tmp_path / "bars", segment_rows=1000, index_every=64)
+    recs = _records(2500)
+    store.append_records(recs[:1700])
+    store.append_records(recs[1700:])
+    assert len(store) == 2500
+
+    step = 60_000_000_000
+    out = store.range(500 * step, 1500 * step)
+    assert out["close"].tolist() == list(range(500, 1500))
+    assert store.tail(3)["close"].tolist() == [2497, 2498, 2499]
+    assert len(store.range(5000 * step, 6000 * step)) == 0
+
+    reopened = BinaryBarStore(tmp_path / "bars", segment_rows=1000, index_every=64)
+    assert reopened.last_timestamp == int(recs["timestamp"][-1])
+    np.testing.assert_array_equal(reopened.tail(1200), recs[-1200:])
+    assert records_to_window(reopened.tail(2)).close.tolist() == [2498, 2499]
+
+    with pytest.raises(ValueError):
+        reopened.append_records(recs[:1])
+
+
+def test_convert_ndjson_to_store(tmp_path):
+    src = tmp_path / "rt.ndjson"
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    lines = []
+    for i in [0, 1, 1, 2]:
+        lines.append(json.dumps({"timestamp": (t0 + timedelta(minutes=i)).isoformat(), "open": 1, "high": 2,
+                                 "low": 0.5, "close": float(i), "volume": 10, "source": "x"}))
+    lines.insert(2, "{corrupt")
+    src.write_text("\n".join(lines) + "\n")
+
+    store = BinaryBarStore(tmp_path / "bars")
+    assert convert_ndjson_to_store(src, store) == 3
+    store.append(MarketBar(t0 + timedelta(minutes=3), 1, 2, 0.5, 3.0, 10))
+    out = store.range(t0, t0 + timedelta(minutes=10))
+    assert out["close"].tolist() == [0.0, 1.0, 2.0, 3.0]
+    assert out["timestamp"][0] == datetime_to_ns(t0)
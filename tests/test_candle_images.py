@@ -0,0 +1,62 @@
+import numpy as np
+
+from xau_system.features.candle_images import CandleImageConfig, CandleRasterizer, render_candles
+
+
+def _ohlcv(n=300, seed=5):
+    rng = np.random.default_rng(seed)
+    close = 2300 + np.cumsum(rng.normal(0, 1.0, n))
+    open_ = close + rng.normal(0, 0.5, n)
+    return {
+        "open": open_,
+        "high": np.maximum(open_, close) + rng.random(n),
+        "low": np.minimum(open_, close) - rng.random(n),
+        "close": close,
+        "volume": rng.random(n) * 100,
+    }
+
+
+def test_render_candles_draws_bodies_wicks_and_volume():
+    cfg = CandleImageConfig(height=40, width=20, volume_fraction=0.25)
+    o = np.array([[10.0, 12.0]])
+    c = np.array([[12.0, 10.0]])
+    img = render_candles(o, np.array([[13.0, 13.0]]), np.array([[9.0, 9.0]]), c, np.array([[1.0, 2.0]]), config=cfg)
+    assert img.shape == (1, 40, 20, 3) and img.dtype == np.uint8
+    colors = {tuple(px) for px in img.reshape(-1, 3)}
+    assert {cfg.up_color, cfg.down_color, cfg.wick_color, cfg.volume_color, cfg.background} <= colors
+    # Vela alcista a la izquierda, bajista a la derecha; volumen máximo llena la franja.
+    assert tuple(img[0, 15, 2]) == cfg.up_color
+    assert tuple(img[0, 15, 17]) == cfg.down_color
+    assert tuple(img[0, 30, 17]) == cfg.volume_color
+
+
+def test_all_nan_overlay_row_does_not_blank_its_window():
+    d = _ohlcv(64)
+    o, h, lo, c = (np.stack([d[k][:32], d[k][32:]]) for k in ("open", "high", "low", "close"))
+    ema = c.copy()
+    ema[0] = np.nan
+    with np.errstate(all="raise"):
+        img = render_candles(o, h, lo, c, overlays=[ema])
+    np.testing.assert_array_equal(img[0], render_candles(o[:1], h[:1], lo[:1], c[:1])[0])
+    np.testing.assert_array_equal(img[1], render_candles(o[1:], h[1:], lo[1:], c[1:], overlays=[ema[1:]])[0])
+
+
+def test_rasterizer_pool_and_cache_match_direct_render(tmp_path):
+    data = _ohlcv()
+    end_rows = np.arange(63, 300, 3)
+    ts = 1_700_000_000 + end_rows * 60
+    direct = CandleRasterizer().render_windows(data, end_rows, window=64, overlays=[data["close"]])
+
+    pooled = CandleRasterizer(n_workers=2, chunk_size=20)
+    np.testing.assert_array_equal(pooled.render_windows(data, end_rows, window=64, overlays=[data["close"]]), direct)
+    pooled.close()
+
+    cached = CandleRasterizer(cache_dir=tmp_path / "img")
+    first = cached.render_cached("1H", ts, data, end_rows, window=64, overlays=[data["close"]], tag="ema")
+    assert len(list((tmp_path / "img").glob("1H_*.npy"))) == len(end_rows)
+    again = cached.render_cached("1H", ts, data, end_rows, window=64, overlays=[data["close"]], tag="ema")
+    np.testing.assert_array_equal(first, direct)
+    np.testing.assert_array_equal(again, direct)
+    # Otra longitud de ventana para las mismas barras no reutiliza la imagen de 64.
+    short = cached.render_cached("1H", ts, data, end_rows, window=32, overlays=[data["close"]], tag="ema")
+    np.testing.assert_array_equal(short, CandleRasterizer().render_windows(data, end_rows, window=32, overlays=[data["close"]]))
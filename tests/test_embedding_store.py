@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from xau_system.features.candle_images import CandleImageConfig, CandleRasterizer
+from xau_system.models.embedding_store import EmbeddingStore, embed_windows
+
+
+def test_memory_bound_lru_and_mmap_persistence(tmp_path):
+    store = EmbeddingStore(dim=4, max_entries=3, root=tmp_path)
+    ts = np.arange(5, dtype=np.int64) * 60_000_000_000
+    emb = np.arange(20, dtype=np.float32).reshape(5, 4)
+    store.put_many("1H", ts, "cnn-v1", emb)
+    assert len(store) == 3
+    assert store.stats().evictions == 2
+    assert store.nbytes == 3 * 4 * 4
+
+    # Desalojada de memoria pero recuperada del fichero mapeado.
+    assert np.array_equal(store.get("1H", ts[0], "cnn-v1"), emb[0])
+    assert store.stats().disk_hits == 1
+    assert store.get("1H", ts[0], "cnn-v2") is None
+
+    reopened = EmbeddingStore(dim=4, max_entries=2, root=tmp_path)
+    got, missing = reopened.get_many("1H", ts, "cnn-v1")
+    assert not missing.any()
+    assert np.array_equal(got, emb)
+
+
+def test_embed_windows_only_encodes_missing_windows():
+    rng = np.random.default_rng(1)
+    n = 120
+    close = 2000 + np.cumsum(rng.normal(0, 1, n))
+    ohlcv = {"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": rng.random(n)}
+    rasterizer = CandleRasterizer(CandleImageConfig(height=32, width=32))
+    calls = []
+
+    def embed(images):
+        calls.append(len(images))
+        return images.reshape(len(images), -1)[:, :8].astype(np.float32)
+
+    store = EmbeddingStore(dim=8, max_entries=100)
+    end_rows = np.arange(63, 100)
+    end_ts = end_rows * 3_600_000_000_000
+    first = embed_windows(store, rasterizer, embed, "1H", "v1", ohlcv, end_rows, end_ts)
+    again = embed_windows(store, rasterizer, embed, "1H", "v1", ohlcv, np.arange(63, 110), np.arange(63, 110) * 3_600_000_000_000)
+    assert calls == [len(end_rows), 10]
+    assert np.array_equal(again[: len(end_rows)], first)
+    assert store.stats().computed == len(end_rows) + 10
+
+
+def test_duplicates_out_of_order_appends_and_validation(tmp_path):
+    with pytest.raises(ValueError):
+        EmbeddingStore(dim=4, max_entries=0)
+
+    store = EmbeddingStore(dim=2, max_entries=8, root=tmp_path)
+    store.put_many("1H", [10, 20, 10], "v1", np.array([[1, 1], [2, 2], [3, 3]], dtype=np.float32))
+    assert len(store) == 2
+    assert np.array_equal(store.get("1H", 10, "v1"), [3, 3])  # gana el último del lote
+    # El .ts queda desordenado (20, 10, 5, 15): se indexa igual.
+    store.put_many("1H", [5, 20, 15], "v1", np.array([[5, 5], [9, 9], [7, 7]], dtype=np.float32))
+    seg = store._disk[("1H", "v1")]
+    assert len(seg) == 4 and (tmp_path / "1H" / "v1.ts").stat().st_size == 4 * 8
+    assert seg.rows(np.array([5, 10, 15, 20, 99])).tolist() == [2, 1, 3, 0, -1]
+    # ts=20 se volvió a guardar: memoria y disco coinciden con el último valor.
+    assert np.array_equal(store.get("1H", 20, "v1"), [9, 9])
+    assert np.array_equal(seg.get(20), [9, 9])
+
+    reopened = EmbeddingStore(dim=2, max_entries=2, root=tmp_path)
+    got, missing = reopened.get_many("1H", [15, 10, 5, 20, 30], "v1")
+    assert missing.tolist() == [False, False, False, False, True]
+    assert got[:4].tolist() == [[7, 7], [3, 3], [5, 5], [9, 9]]
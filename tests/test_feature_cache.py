@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from xau_system.data.realtime import MarketBar, RealTimeBuffer
+from xau_system.features.cache import FeatureCache, make_feature_key
+from xau_system.features.pipeline import FeatureConfig
+
+
+def test_feature_cache_lru_spill_and_stats(tmp_path):
+    cfg = FeatureConfig()
+    cache = FeatureCache(max_entries=2, spill_dir=tmp_path / "spill")
+    keys = [make_feature_key("XAUUSD", "1H", i, cfg) for i in range(3)]
+    calls = []
+
+    def compute(i):
+        calls.append(i)
+        return np.full(10, float(i))
+
+    for i, k in enumerate(keys):
+        cache.get_or_compute(k, lambda i=i: compute(i))
+    assert cache.get_or_compute(keys[2], lambda: compute(99))[0] == 2.0
+    assert calls == [0, 1, 2]
+
+    # keys[0] fue expulsada a disco y se recupera sin recomputar.
+    assert cache.get(keys[0])[0] == 0.0
+    st = cache.stats()
+    assert (st.hits, st.misses, st.disk_hits) == (2, 3, 1)
+    assert st.evictions >= 2 and st.spills >= 2
+    assert st.entries == 2
+
+
+def test_feature_cache_memory_bound_and_new_bar_invalidation():
+    bounded = FeatureCache(max_entries=100, max_bytes=1000)
+    for i in range(4):
+        bounded.put(make_feature_key("XAUUSD", "M1", i, "h"), np.zeros(40))
+    assert make_feature_key("XAUUSD", "M1", 0, "h") not in bounded
+    assert bounded.stats().bytes == 960
+
+    cache = FeatureCache()
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    k_old = make_feature_key("XAUUSD", "M1", t0, "h")
+    k_other = make_feature_key("XAUUSD", "4H", t0, "h")
+    cache.put(k_old, np.zeros(50))
+    cache.put(k_other, np.zeros(50))
+
+    buf = RealTimeBuffer(maxlen=5, persist_path=None)
+    cache.attach(buf, timeframe="M1")
+    buf.append(MarketBar(t0 + timedelta(minutes=1), 1, 1, 1, 1, 1))
+    assert k_old not in cache
+    assert k_other in cache
+    assert cache.stats().invalidations == 1
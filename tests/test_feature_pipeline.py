@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from xau_system.features.indicators import add_technical_indicators
+from xau_system.features.pipeline import ALL_FEATURES, FeatureConfig, FeaturePipeline
+from xau_system.features.preprocessing import add_returns_and_atr, normalize_ohlc_by_atr
+
+
+def _ohlcv(n=600, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 2300 + np.cumsum(rng.normal(0, 1.0, n))
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2024-01-01", periods=n, freq="1min", tz="UTC"),
+            "open": close + rng.normal(0, 0.3, n),
+            "high": close + rng.random(n) + 0.1,
+            "low": close - rng.random(n) - 0.1,
+            "close": close,
+            "volume": rng.integers(100, 1000, n).astype(float),
+        }
+    )
+
+
+def test_pipeline_matches_each_batch_function_on_full_history():
+    df = _ohlcv()
+    fm = FeaturePipeline().compute(df)
+    got = fm.to_frame()
+    assert tuple(got.columns[6:]) == ALL_FEATURES
+    assert np.isfinite(fm.values).all()
+
+    expected = add_technical_indicators(df).merge(add_returns_and_atr(df), on=list(df.columns))
+    expected = expected.merge(normalize_ohlc_by_atr(add_returns_and_atr(df)).drop(columns=["log_return", "close_z", "volume_rel"]),
+                              on=list(df.columns) + ["atr"])
+    merged = expected.merge(got, on="timestamp", suffixes=("", "_p"))
+    # La cadena pierde una fila extra en normalize_ohlc_by_atr (shift tras el dropna previo).
+    assert len(merged) == len(got) - 1
+    for c in ALL_FEATURES:
+        np.testing.assert_allclose(merged[f"{c}_p"], merged[c].astype(float), rtol=1e-9, atol=1e-9, err_msg=c)
+
+
+def test_pipeline_float32_matrix_and_config_hash():
+    cfg = FeatureConfig(features=("rsi", "atr", "close_norm"))
+    fm = FeaturePipeline(cfg).compute(_ohlcv(300))
+    mat = fm.as_float32()
+    assert mat.dtype == np.float32 and mat.shape == (len(fm), 3) and mat.flags.c_contiguous
+    assert cfg.config_hash() != FeatureConfig().config_hash()
+    assert cfg.config_hash() == FeatureConfig(features=("rsi", "atr", "close_norm")).config_hash()
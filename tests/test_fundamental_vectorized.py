@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from xau_system.features.fundamental import (
+    FundamentalSnapshot,
+    asof_join_fundamentals,
+    compute_fundamental_bias,
+    compute_fundamental_bias_vectorized,
+    fundamental_bias_for_bars,
+)
+
+
+def test_vectorized_bias_equals_scalar_including_missing_fields():
+    rng = np.random.default_rng(1)
+    n = 2000
+    cols = {
+        "usd_index": rng.normal(100, 8, n),
+        "real_yield_10y": rng.normal(1, 1.5, n),
+        "fed_rate": rng.uniform(0, 6, n),
+        "risk_aversion_score": rng.uniform(-1, 1, n),
+    }
+    for c in cols.values():
+        c[rng.random(n) < 0.3] = np.nan
+    got = compute_fundamental_bias_vectorized(**cols)
+
+    for i in range(n):
+        snap = FundamentalSnapshot(**{k: (None if np.isnan(v[i]) else float(v[i])) for k, v in cols.items()})
+        assert got[i] == compute_fundamental_bias(snap)
+    assert compute_fundamental_bias_vectorized(fed_rate=np.array([np.nan]))[0] == 0.0
+
+
+def test_asof_join_uses_last_release_per_field():
+    releases = pd.DataFrame(
+        {
+            "timestamp": pd.to_datetime(["2024-01-02", "2024-01-01", "2024-01-03"], utc=True),
+            "usd_index": [101.0, 99.0, np.nan],
+            "fed_rate": [np.nan, 5.0, 4.75],
+        }
+    )
+    bars = pd.date_range("2023-12-31", periods=5, freq="1D", tz="UTC")
+    out = asof_join_fundamentals(bars, releases)
+    assert np.isnan(out["usd_index"][0])
+    assert out["usd_index"].tolist()[1:] == [99.0, 101.0, 101.0, 101.0]
+    assert out["fed_rate"].tolist()[1:] == [5.0, 5.0, 4.75, 4.75]
+    assert out["real_yield_10y"].isna().all()
+
+    bias = fundamental_bias_for_bars(bars, releases)
+    assert bias[0] == 0.0
+    assert bias[3] == compute_fundamental_bias(FundamentalSnapshot(usd_index=101.0, fed_rate=4.75))
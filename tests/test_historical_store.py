@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+
+from xau_system.data.historical_store import ParquetHistoricalStore
+from xau_system.data.loader import load_ohlcv_csv
+
+pytest.importorskip("pyarrow")
+
+
+def _csv(path, start, periods):
+    ts = pd.date_range(start, periods=periods, freq="6h", tz="UTC")
+    df = pd.DataFrame({"timestamp": ts, "open": 1.0, "high": 2.0, "low": 0.5, "close": range(periods), "volume": 10.0})
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_parquet_store_incremental_ingest_and_read(tmp_path):
+    store = ParquetHistoricalStore(tmp_path / "hist")
+    _csv(tmp_path / "a.csv", "2024-01-01", 8)
+    assert store.ingest_csv(tmp_path / "a.csv", "M1", chunksize=3) == 8
+    assert [d.isoformat() for d in store.partitions("M1")] == ["2024-01-01", "2024-01-02"]
+
+    day1 = store._part_path("M1", store.partitions("M1")[0])
+    mtime = day1.stat().st_mtime_ns
+    _csv(tmp_path / "b.csv", "2024-01-03", 4)
+    store.ingest_csv(tmp_path / "b.csv", "M1")
+    assert day1.stat().st_mtime_ns == mtime
+
+    full = store.read("M1")
+    assert len(full.data) == 12
+    pd.testing.assert_frame_equal(
+        full.data.iloc[:8].reset_index(drop=True),
+        load_ohlcv_csv(str(tmp_path / "a.csv"), "M1").data,
+        check_dtype=False,
+    )
+
+    part = store.read("M1", start="2024-01-01T12:00", end="2024-01-03T06:00", columns=["close"])
+    assert list(part.data.columns) == ["timestamp", "close"]
+    assert part.data["close"].tolist() == [2, 3, 4, 5, 6, 7, 0]
+
+    chunks = list(store.iter_chunks("M1", start="2024-01-01T12:00", batch_rows=2))
+    assert sum(len(c.data) for c in chunks) == 10
+    assert max(len(c.data) for c in chunks) <= 2
+
+
+def test_reingested_bars_replace_stored_ones(tmp_path):
+    store = ParquetHistoricalStore(tmp_path / "hist")
+    df = _csv(tmp_path / "a.csv", "2024-01-01", 4)
+    store.ingest_frame(df, "H1")
+    store.ingest_frame(df.iloc[1:3].assign(close=[100.0, 200.0]), "H1")
+    out = store.read("H1").data
+    assert out["close"].tolist() == [0, 100.0, 200.0, 3]
@@ -0,0 +1,129 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from xau_system.models.inference_server import MicroBatchInferenceServer
+
+
+class _CountingModel:
+    """Modelo multi-entrada/multi-salida tipo híbrido: [seq, emb] -> [signal, confidence]."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict_on_batch(self, inputs):
+        seq, emb = inputs
+        self.calls.append(len(seq))
+        score = seq.sum(axis=(1, 2)) + emb.sum(axis=1)
+        return [np.stack([score, -score], axis=1), score[:, None]]
+
+
+def _request(i: int, rows: int = 1):
+    seq = np.full((rows, 4, 3), float(i))
+    emb = np.full((rows, 2), float(i))
+    return [seq, emb], 12.0 * i + 2.0 * i
+
+
+def test_micro_batching_groups_concurrent_requests_and_splits_outputs():
+    model = _CountingModel()
+    server = MicroBatchInferenceServer(model, max_batch_rows=16, max_wait_ms=50.0, warmup_inputs=_request(0)[0])
+    server.start()
+    assert model.calls == [1]  # warm-up
+    try:
+        futures = [server.submit(_request(i)[0]) for i in range(1, 9)]
+        results = [f.result(timeout=5) for f in futures]
+    finally:
+        server.stop()
+
+    for i, res in enumerate(results, start=1):
+        signal, confidence = res.outputs
+        assert signal.shape == (1, 2)
+        assert confidence[0, 0] == _request(i)[1]
+        assert res.timing.batch_size >= 1
+        assert res.timing.queue_wait_ms >= 0.0
+        assert res.timing.compute_ms >= 0.0
+    assert sum(model.calls[1:]) == 8
+    assert len(model.calls) - 1 < 8
+    assert server.stats.requests == 8
+    assert server.stats.mean_batch_rows > 1.0
+
+
+def test_batch_rows_limit_and_async_and_errors():
+    calls = []
+
+    def fn(x):
+        calls.append(len(x))
+        if np.isnan(x).any():
+            raise ValueError("nan")
+        return x * 2.0
+
+    server = MicroBatchInferenceServer(predict_fn=fn, max_batch_rows=4, max_wait_ms=30.0)
+    server.start()
+    try:
+        futures = [server.submit(np.ones((3, 2)) * k) for k in range(3)]
+        outs = [f.result(timeout=5) for f in futures]
+        assert all(c <= 4 for c in calls)
+        assert np.array_equal(outs[2].outputs, np.full((3, 2), 4.0))
+
+        res = asyncio.run(server.predict_async(np.ones((1, 2))))
+        assert np.array_equal(res.outputs, np.full((1, 2), 2.0))
+
+        bad = server.submit(np.full((1, 2), np.nan))
+        with pytest.raises(ValueError, match="nan"):
+            bad.result(timeout=5)
+        assert server.stats.errors == 1
+    finally:
+        server.stop()
+
+
+def test_failing_request_does_not_fail_its_batch_and_submit_after_stop_is_rejected():
+    def fn(x):
+        if np.isnan(x).any():
+            raise ValueError("nan")
+        return x * 2.0
+
+    server = MicroBatchInferenceServer(predict_fn=fn, max_batch_rows=64, max_wait_ms=100.0)
+    server.start()
+    try:
+        good = [server.submit(np.ones((2, 2)) * k) for k in range(3)]
+        bad = server.submit(np.full((1, 2), np.nan))
+        more = server.submit(np.ones((1, 2)))
+        for k, fut in enumerate(good):
+            assert np.array_equal(fut.result(timeout=5).outputs, np.full((2, 2), 2.0 * k))
+        assert np.array_equal(more.result(timeout=5).outputs, np.full((1, 2), 2.0))
+        with pytest.raises(ValueError, match="nan"):
+            bad.result(timeout=5)
+        assert server.stats.errors == 1
+    finally:
+        server.stop()
+
+    with pytest.raises(RuntimeError):
+        server.submit(np.ones((1, 2)))
+
+
+def test_timed_out_async_request_does_not_kill_batching_thread():
+    def slow(x):
+        time.sleep(0.2)
+        return x * 2.0
+
+    server = MicroBatchInferenceServer(predict_fn=slow, max_batch_rows=4, max_wait_ms=1.0)
+    server.start()
+    try:
+
+        async def scenario():
+            # La primera ocupa el modelo; la segunda se cancela aún en cola.
+            first = asyncio.ensure_future(server.predict_async(np.ones((1, 2))))
+            await asyncio.sleep(0.02)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(server.predict_async(np.ones((1, 2))), 0.05)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(first, 0.05)
+            return await asyncio.wait_for(server.predict_async(np.full((1, 2), 3.0)), 5.0)
+
+        res = asyncio.run(scenario())
+        assert np.array_equal(res.outputs, np.full((1, 2), 6.0))
+        assert server.stats.cancelled >= 1
+    finally:
+        server.stop()
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from xau_system.data.loader import MarketFrame, resample_frame
+from xau_system.features.labels import first_touch, label_timeframes, triple_barrier_labels, true_range_atr
+
+
+def _ohlc(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.4, n))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) + rng.random(n) * 0.3
+    low = np.minimum(open_, close) - rng.random(n) * 0.3
+    return high, low, close
+
+
+def _reference(high, low, close, atr, horizon, conf):
+    n = len(close)
+    rows = []
+    for i in range(n):
+        tp_pct = 0.03 if conf[i] >= 0.80 else 0.02
+        sides = []
+        for long in (True, False):
+            sl = close[i] - 1.2 * atr[i] if long else close[i] + 1.2 * atr[i]
+            tp = close[i] * (1 + tp_pct) if long else close[i] * (1 - tp_pct)
+            outcome, bars = 0, min(horizon, n - 1 - i)
+            for k in range(1, bars + 1 if np.isfinite(atr[i]) else 1):
+                hit_sl = low[i + k] <= sl if long else high[i + k] >= sl
+                hit_tp = high[i + k] >= tp if long else low[i + k] <= tp
+                if hit_sl or hit_tp:
+                    outcome, bars = (-1 if hit_sl else 1), k
+                    break
+            if outcome == 1:
+                ret = tp_pct
+            elif outcome == -1:
+                ret = (sl - close[i]) / close[i] if long else (close[i] - sl) / close[i]
+            else:
+                move = (close[i + bars] - close[i]) / close[i]
+                ret = move if long else -move
+            sides.append((outcome, bars, ret))
+        (lo, lb, _), (so, sb, _) = sides
+        if lo == 1 and (so != 1 or lb < sb):
+            label = 0
+        elif so == 1 and (lo != 1 or sb < lb):
+            label = 1
+        else:
+            label = 2
+        rows.append((label, *sides[0], *sides[1]))
+    return rows
+
+
+def test_labels_match_per_bar_reference():
+    high, low, close = _ohlc(1500)
+    atr = true_range_atr(high, low, close, 14)
+    conf = np.random.default_rng(3).random(len(close))
+    labels = triple_barrier_labels(high, low, close, atr, horizon=30, confidence=conf)
+    ref = _reference(high, low, close, atr, 30, conf)
+
+    got = list(
+        zip(
+            labels.label, labels.long_outcome, labels.long_bars, labels.long_return,
+            labels.short_outcome, labels.short_bars, labels.short_return,
+        )
+    )
+    for g, r in zip(got, ref):
+        assert g[:3] == r[:3] and g[4:6] == r[4:6]
+        assert np.isclose(g[3], r[3], equal_nan=True) and np.isclose(g[6], r[6], equal_nan=True)
+    assert {0, 1, 2} <= set(labels.label.tolist())
+    assert {-1, 0, 1} <= set(labels.long_outcome.tolist())
+    assert not labels.valid[:13].any() and not labels.valid[-30:].any() and labels.valid[13:-30].all()
+
+
+def test_label_timeframes_uses_per_timeframe_horizons():
+    high, low, close = _ohlc(24 * 60)
+    ts = pd.date_range("2024-01-01", periods=len(close), freq="1min", tz="UTC")
+    m1 = MarketFrame("1min", pd.DataFrame({"timestamp": ts, "open": close, "high": high, "low": low, "close": close, "volume": 1.0}))
+    frames = {"M1": m1, "1H": resample_frame(m1, "1h")}
+    out = label_timeframes(frames, {"M1": 120, "1H": 4})
+    assert len(out["M1"]) == len(close) and len(out["1H"]) == 24
+    assert out["1H"]["long_bars"].max() <= 4
+    assert (out["M1"]["timestamp"] == ts).all()
+
+
+@pytest.mark.parametrize("n, chunk_rows", [(100, 1 << 16), (2, 1 << 16), (1, 1 << 16), (203, 100), (301, 100)])
+def test_first_touch_handles_short_series_and_short_last_chunk(n, chunk_rows):
+    high, low, _ = _ohlc(n, seed=5)
+    rng = np.random.default_rng(6)
+    upper = high + rng.uniform(0.0, 3.0, n)
+    lower = low - rng.uniform(0.0, 3.0, n)
+    horizon = 240
+    (got,) = first_touch(high, low, [(upper, lower)], horizon, chunk_rows=chunk_rows)
+    expected = np.full(n, -1)
+    for i in range(n):
+        for k in range(1, min(horizon, n - 1 - i) + 1):
+            if high[i + k] >= upper[i] or low[i + k] <= lower[i]:
+                expected[i] = k - 1
+                break
+    np.testing.assert_array_equal(got, expected)
+
+
+def test_triple_barrier_labels_on_frame_shorter_than_horizon():
+    high, low, close = _ohlc(100)
+    atr = true_range_atr(high, low, close, 14)
+    labels = triple_barrier_labels(high, low, close, atr)  # horizon=240 > n
+    assert len(labels.label) == 100 and not labels.valid.any()
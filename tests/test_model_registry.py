@@ -0,0 +1,89 @@
+import threading
+import time
+
+from xau_system.models.registry import ModelRegistry
+
+
+class _Model:
+    def __init__(self, tag: str):
+        self.tag = tag
+
+    def predict_on_batch(self, x):
+        return f"{self.tag}:{x}"
+
+
+def _loader(loads):
+    def load(path):
+        time.sleep(0.05)
+        loads.append(path.read_text())
+        return _Model(path.read_text())
+
+    return load
+
+
+def _artifact(tmp_path, name, tag):
+    p = tmp_path / name
+    p.write_text(tag)
+    return p
+
+
+def test_lazy_load_and_background_hot_swap(tmp_path):
+    loads = []
+    reg = ModelRegistry(tmp_path / "registry", loader=_loader(loads))
+    v1 = reg.register("hybrid", _artifact(tmp_path, "a.bin", "v1"), metrics={"sharpe": 1.0, "max_drawdown": 0.10}, version="v1")
+    reg.promote("hybrid", v1.version).result(timeout=5)
+
+    # Registro nuevo: el campeón persiste pero no se carga hasta el primer uso.
+    reg2 = ModelRegistry(tmp_path / "registry", loader=_loader(loads))
+    slot = reg2.slot("hybrid")
+    assert not slot.loaded and slot.version.version == "v1"
+    assert slot.predict_on_batch(1) == "v1:1"
+    assert slot.loaded
+
+    in_flight = slot.current()
+    reg2.register("hybrid", _artifact(tmp_path, "b.bin", "v2"), metrics={"sharpe": 1.2, "max_drawdown": 0.11}, version="v2")
+    decision, fut = reg2.evaluate_and_promote("hybrid", "v2")
+    assert decision.promoted
+    # Mientras carga, el slot sigue sirviendo v1 sin bloquear.
+    assert slot.predict_on_batch(2) == "v1:2"
+    fut.result(timeout=5)
+    assert slot.predict_on_batch(3) == "v2:3"
+    assert in_flight.model.predict_on_batch(4) == "v1:4"
+    assert reg2.champion("hybrid").version == "v2"
+    assert [v.version for v in reg2.versions("hybrid")] == ["v1", "v2"]
+    reg.close()
+    reg2.close()
+
+
+def test_gating_rejects_worse_challenger(tmp_path):
+    reg = ModelRegistry(tmp_path / "registry", loader=_loader([]))
+    reg.register("cnn", _artifact(tmp_path, "a.bin", "v1"), metrics={"sharpe": 1.5, "max_drawdown": 0.05}, version="v1")
+    reg.promote("cnn", "v1").result(timeout=5)
+    reg.register("cnn", _artifact(tmp_path, "b.bin", "v2"), metrics={"sharpe": 1.1, "max_drawdown": 0.05}, version="v2")
+    decision, fut = reg.evaluate_and_promote("cnn", "v2")
+    assert not decision.promoted and fut is None
+    assert reg.champion("cnn").version == "v1"
+    reg.close()
+
+
+def test_lazy_load_in_flight_does_not_undo_promotion(tmp_path):
+    reg = ModelRegistry(tmp_path / "registry", loader=_loader([]))
+    reg.register("hybrid", _artifact(tmp_path, "a.bin", "v1"), version="v1")
+    reg.promote("hybrid", "v1").result(timeout=5)
+    reg.register("hybrid", _artifact(tmp_path, "b.bin", "v2"), version="v2")
+
+    def slow_v1(path):
+        time.sleep(0.3 if path.read_text() == "v1" else 0.01)
+        return _Model(path.read_text())
+
+    reg2 = ModelRegistry(tmp_path / "registry", loader=slow_v1)
+    slot = reg2.slot("hybrid")
+    lazy = threading.Thread(target=slot.current)
+    lazy.start()  # carga diferida lenta de v1 mientras se promueve v2
+    time.sleep(0.05)
+    reg2.promote("hybrid", "v2").result(timeout=5)
+    lazy.join()
+    assert slot.version.version == "v2"
+    assert slot.predict_on_batch(1) == "v2:1"
+    reg.close()
+    reg2.close()
@@ -0,0 +1,97 @@
+import importlib
+import sys
+
+import numpy as np
+import pytest
+
+from xau_system.models.export import _CalibrationReader, calibration_windows
+from xau_system.models.runtime import (
+    ExportMetadata,
+    _output_names,
+    check_accuracy_drift,
+    dequantize,
+    load_runtime,
+    quantize,
+    resolve_output_names,
+)
+
+
+class _Linear:
+    def __init__(self, w: np.ndarray, noise: float = 0.0):
+        self.w = w
+        self.noise = noise
+
+    def predict_on_batch(self, x):
+        logits = x.reshape(len(x), -1) @ self.w + self.noise
+        e = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return [e / e.sum(axis=1, keepdims=True), logits[:, :1]]
+
+
+def test_accuracy_drift_detects_large_deviation():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(300, 8, 4)).astype(np.float32)
+    w = rng.normal(size=(32, 3))
+    ref = _Linear(w)
+    close = _Linear(w.astype(np.float16).astype(np.float64))
+    far = _Linear(w, noise=np.array([3.0, 0.0, -3.0]))
+
+    ok = check_accuracy_drift(ref, close, x, batch_size=64)
+    assert ok.passed and ok.n_samples == 300
+    assert ok.argmax_agreement[1] is None
+    assert ok.argmax_agreement[0] > 0.98
+
+    bad = check_accuracy_drift(ref, far, x, batch_size=64)
+    assert not bad.passed
+
+
+def test_quantize_roundtrip_and_metadata(tmp_path):
+    x = np.linspace(-1, 1, 101, dtype=np.float32)
+    q = quantize(x, scale=1 / 127, zero_point=0, dtype=np.int8)
+    assert q.dtype == np.int8
+    assert np.abs(dequantize(q, 1 / 127, 0) - x).max() <= 0.5 / 127 + 1e-6
+
+    artifact = tmp_path / "hybrid.tflite"
+    ExportMetadata("tflite", "int8", ["seq_features", "visual_embedding"], ["signal", "confidence", "zones"]).save(artifact)
+    meta = ExportMetadata.load(artifact)
+    assert meta.input_names == ["seq_features", "visual_embedding"]
+    assert ExportMetadata.load(tmp_path / "missing.onnx") is None
+
+
+def test_runtime_module_does_not_import_tensorflow(monkeypatch):
+    # Con ``None`` en sys.modules cualquier ``import tensorflow`` falla, aunque otro
+    # test lo haya importado antes; el módulo se reimporta desde cero.
+    monkeypatch.setitem(sys.modules, "tensorflow", None)
+    monkeypatch.delitem(sys.modules, "xau_system.models.runtime")
+    monkeypatch.delattr(sys.modules["xau_system.models"], "runtime")
+    runtime = importlib.import_module("xau_system.models.runtime")
+    with pytest.raises(ValueError):
+        runtime.load_runtime("model.bin")
+
+
+def test_output_names_map_by_index_not_substring():
+    names = [f"head_{i}" for i in range(12)]
+    candidates = sorted(f"output_{i}" for i in range(12))  # orden alfabético: output_10 antes que output_2
+    assert resolve_output_names(names, candidates) == [f"output_{i}" for i in range(12)]
+    assert resolve_output_names(["signal", "confidence"], ["confidence", "signal"]) == ["signal", "confidence"]
+    with pytest.raises(KeyError):
+        resolve_output_names(["signal"], ["output_0", "output_1"])
+
+    meta = ExportMetadata("onnx", "none", ["x"], ["signal", "confidence"], artifact_output_names=["out_b", "out_a"])
+    assert _output_names(meta, ["out_a", "out_b"]) == ["out_b", "out_a"]
+    with pytest.raises(KeyError):
+        _output_names(meta, ["out_a", "out_c"])
+    assert _output_names(None, ["out_a"]) == ["out_a"]
+
+
+def test_calibration_windows_follow_model_input_order():
+    seq = np.arange(10 * 4 * 3, dtype=np.float64).reshape(10, 4, 3)
+    emb = -np.arange(10 * 2, dtype=np.float64).reshape(10, 2)
+    names = ["seq_features", "visual_embedding"]
+    calib = calibration_windows({"visual_embedding": emb, "seq_features": seq}, names, n=4)
+    assert [c.shape for c in calib] == [(4, 4, 3), (4, 2)]
+    np.testing.assert_array_equal(calib[0], seq[-4:])
+    np.testing.assert_array_equal(calib[1], emb[-4:])
+
+    first = _CalibrationReader(names, calib).get_next()
+    np.testing.assert_array_equal(first["seq_features"], seq[6:7])
+    np.testing.assert_array_equal(first["visual_embedding"], emb[6:7])
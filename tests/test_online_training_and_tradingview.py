@@ -29,6 +29,7 @@ def test_online_trainer_processes_new_experiences(tmp_path):
     exp_path = tmp_path / "experiences.ndjson"
     exp_buf = ExperienceBuffer(str(exp_path))
     trainer = OnlineTrainer(experience_path=str(exp_path), poll_s=0.05)
+    assert exp_buf.subscribe(trainer.notify) is True
 
     started = trainer.start()
     assert started is True
@@ -39,7 +40,54 @@ def test_online_trainer_processes_new_experiences(tmp_path):
     time.sleep(0.2)
     st = trainer.status()
     assert st.running is True
-    assert st.steps >= 2
+    assert st.experiences >= 2
+    assert st.steps >= 1
+    assert st.experiences_per_s > 0
 
     stopped = trainer.stop()
     assert stopped is True
+
+
+def test_online_trainer_minibatches_and_resumes_from_offset(tmp_path):
+    exp_path = tmp_path / "experiences.ndjson"
+    rows = [json.dumps({"state_id": f"s{i}", "reward": 0.0}) + "\n" for i in range(10)]
+    exp_path.write_text("".join(rows[:7]) + rows[7][:5], encoding="utf-8")
+
+    trainer = OnlineTrainer(experience_path=str(exp_path), poll_s=0.02, batch_size=4, max_latency_s=10.0)
+    trainer.start()
+    time.sleep(0.15)
+    st = trainer.status()
+    assert (st.steps, st.experiences, st.queue_depth) == (1, 4, 3)
+    trainer.stop()
+
+    # Se completa la línea truncada; al reiniciar se retoma tras las 4 ya entrenadas.
+    with exp_path.open("a", encoding="utf-8") as f:
+        f.write(rows[7][5:] + "".join(rows[8:]))
+    resumed = OnlineTrainer(experience_path=str(exp_path), poll_s=0.02, batch_size=4, max_latency_s=0.05)
+    assert resumed.status().offset == len("".join(rows[:4]).encode())
+    resumed.start()
+    time.sleep(0.2)
+    resumed.stop()
+    st = resumed.status()
+    assert st.experiences == 6 and st.steps == 2
+    assert st.offset == exp_path.stat().st_size
+
+
+def test_online_trainer_reloads_persisted_offset_on_start(tmp_path):
+    exp_path = tmp_path / "experiences.ndjson"
+    exp_path.write_text("".join(json.dumps({"i": i}) + "\n" for i in range(4)), encoding="utf-8")
+    trainer = OnlineTrainer(experience_path=str(exp_path), poll_s=0.02, batch_size=2, max_latency_s=0.02)
+
+    # Otro entrenador (p.ej. el proceso de TrainingWorker) entrena las 4 filas después.
+    other = OnlineTrainer(experience_path=str(exp_path), poll_s=0.02, batch_size=2, max_latency_s=0.02)
+    other.start()
+    deadline = time.time() + 5.0
+    while other.status().experiences < 4 and time.time() < deadline:
+        time.sleep(0.02)
+    other.stop()
+
+    trainer.start()
+    time.sleep(0.2)
+    trainer.stop()
+    assert trainer.status().experiences == 0
+    assert trainer.status().offset == exp_path.stat().st_size
@@ -0,0 +1,101 @@
+import json
+import threading
+
+import pytest
+
+from xau_system.utils.persistence import BackgroundRowWriter, NDJSONFileSink, WriterConfig, open_ndjson_writer
+
+
+class _SlowSink:
+    def __init__(self):
+        self.lines = []
+        self.release = threading.Event()
+
+    def write_lines(self, lines):
+        self.release.wait()
+        self.lines.extend(lines)
+
+    def flush(self, fsync=False):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_background_writer_batches_and_flushes(tmp_path):
+    path = tmp_path / "rows.ndjson"
+    w = BackgroundRowWriter(NDJSONFileSink(path), WriterConfig(max_batch_rows=100, flush_interval_s=10.0))
+    for i in range(250):
+        w.write({"i": i})
+    w.flush()
+    rows = [json.loads(x) for x in path.read_text().splitlines()]
+    assert [r["i"] for r in rows] == list(range(250))
+    assert w.batches_written <= 4
+    w.close()
+
+
+def test_background_writer_backpressure_and_close():
+    sink = _SlowSink()
+    w = BackgroundRowWriter(sink, WriterConfig(max_batch_rows=1, max_queue_rows=2, put_timeout_s=0.05))
+    with pytest.raises(RuntimeError):
+        for i in range(10):
+            w.write({"i": i})
+    sink.release.set()
+    w.close()
+    assert len(sink.lines) >= 2
+    with pytest.raises(RuntimeError):
+        w.write({"i": 99})
+
+
+def test_sync_writer_writes_immediately(tmp_path):
+    path = tmp_path / "sync.ndjson"
+    w = open_ndjson_writer(path, background=False)
+    w.write({"a": 1})
+    assert json.loads(path.read_text()) == {"a": 1}
+    w.close()
+
+
+class _FailingSink:
+    def write_lines(self, lines):
+        raise OSError("disco lleno")
+
+    def flush(self, fsync=False):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_background_writer_surfaces_sink_and_encoding_errors():
+    w = BackgroundRowWriter(_FailingSink(), WriterConfig(max_batch_rows=1, max_queue_rows=2))
+    with pytest.raises(TypeError):
+        w.write({"bad": object()})
+    w.write({"i": 0})
+    with pytest.raises(RuntimeError) as err:
+        w.flush()
+    assert isinstance(err.value.__cause__, OSError)
+    # Con el hilo muerto, write falla de inmediato en lugar de bloquear con la cola llena.
+    with pytest.raises(RuntimeError):
+        for i in range(10):
+            w.write({"i": i})
+    with pytest.raises(RuntimeError):
+        w.close()
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_failing_listener_does_not_break_writes(tmp_path, background):
+    path = tmp_path / "rows.ndjson"
+    w = open_ndjson_writer(path, background=background)
+    seen = []
+
+    def broken(n_rows):
+        raise ValueError("oyente roto")
+
+    w.add_listener(broken)
+    w.add_listener(seen.append)
+    for i in range(3):
+        w.write({"i": i})
+        w.flush()
+    w.close()
+    assert [json.loads(x)["i"] for x in path.read_text().splitlines()] == [0, 1, 2]
+    assert sum(seen) == 3
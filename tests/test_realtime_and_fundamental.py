@@ -1,7 +1,9 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
+import pandas as pd
+import pytest
 
-from xau_system.data.realtime import MarketBar, RealTimeBuffer
+from xau_system.data.realtime import OVERFLOW_SOURCE, MarketBar, RealTimeBuffer
 from xau_system.features.fundamental import FundamentalSnapshot, compute_fundamental_bias
 from xau_system.api.service import SignalEngine
 from xau_system.ensemble.consensus import TimeframeVote
@@ -53,3 +55,47 @@ def test_signal_engine_uses_bias_and_confirmation():
     assert out.signal in {"BUY", "SELL", "NEUTRAL"}
     assert 0.0 <= out.confidence <= 1.0
     assert out.risk_fraction == 0.01
+
+
+def test_realtime_buffer_window_is_columnar_readonly_view():
+    buf = RealTimeBuffer(maxlen=4, persist_path=None)
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for i in range(6):
+        buf.append(MarketBar(t0 + timedelta(minutes=i), 1 + i, 2 + i, 0.5 + i, 1.5 + i, 100 + i, source=f"s{i % 2}"))
+
+    w = buf.window(3)
+    assert w.close.tolist() == [4.5, 5.5, 6.5]
+    assert w.close.flags.c_contiguous and not w.close.flags.writeable
+    assert w.to_frame()["timestamp"].iloc[-1] == pd.Timestamp(t0 + timedelta(minutes=5))
+
+    bars = buf.latest(10)
+    assert len(bars) == 4
+    assert bars[-1].timestamp == t0 + timedelta(minutes=5)
+    assert bars[-1].source == "s1"
+    assert buf.last() == bars[-1]
+
+
+def test_realtime_buffer_caps_source_table():
+    buf = RealTimeBuffer(maxlen=8, persist_path=None, max_sources=3)
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for i, src in enumerate(["a", "b", "c", "d", "a"]):
+        buf.append(MarketBar(t0 + timedelta(minutes=i), 1, 2, 0.5, 1.5, 100, source=src))
+    assert [b.source for b in buf.latest(5)] == ["a", "b", OVERFLOW_SOURCE, OVERFLOW_SOURCE, "a"]
+    assert len(buf._sources) == 3
+
+    with pytest.raises(ValueError):
+        RealTimeBuffer(persist_path=None, max_sources=40_000)
+
+
+def test_failing_bar_listener_does_not_break_ingest():
+    buf = RealTimeBuffer(maxlen=4, persist_path=None)
+    seen = []
+
+    def broken(bar):
+        raise ValueError("oyente roto")
+
+    buf.add_listener(broken)
+    buf.add_listener(seen.append)
+    bar = MarketBar(datetime(2024, 1, 1, tzinfo=timezone.utc), 1, 2, 0.5, 1.5, 100)
+    buf.append(bar)
+    assert len(buf) == 1 and seen == [bar]
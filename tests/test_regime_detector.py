@@ -0,0 +1,63 @@
+from itertools import permutations
+
+import numpy as np
+
+from xau_system.regime.detector import RegimeDetector
+
+
+def _regimes(rng, n=600, shift=0.0):
+    # range: baja volatilidad; trend: retorno medio positivo; shock: alta volatilidad.
+    a = rng.normal([0.0 + shift, 0.2], [0.05, 0.02], size=(n, 2))
+    b = rng.normal([1.0 + shift, 0.5], [0.10, 0.05], size=(n, 2))
+    c = rng.normal([0.0 + shift, 3.0], [1.00, 0.50], size=(n, 2))
+    return np.vstack([a, b, c])
+
+
+def test_fast_predict_matches_sklearn_and_labels_are_ordered():
+    X = _regimes(np.random.default_rng(0))
+    det = RegimeDetector()
+    det.fit(X)
+    expected = np.argsort(det.component_order_)[det.model.predict(X)]
+    assert np.array_equal(det.predict(X), expected)
+    assert np.allclose(det.predict_proba(X), det.model.predict_proba(X)[:, det.component_order_])
+    assert det.map_regime(det.predict_one(np.array([0.0, 3.0]))) == "shock"
+    assert det.map_regime(det.predict_one(np.array([0.0, 0.2]))) == "range"
+    assert det.map_regime(det.predict_one(np.array([1.0, 0.5]))) == "trend"
+
+
+def test_labels_stable_across_refits_and_online_updates(tmp_path):
+    rng = np.random.default_rng(1)
+    det = RegimeDetector()
+    det.fit(_regimes(rng))
+    probes = np.array([[0.0, 0.2], [1.0, 0.5], [0.0, 3.0]])
+    assert det.predict(probes).tolist() == [0, 1, 2]
+
+    det.refit_window(_regimes(rng, n=300))
+    assert det.predict(probes).tolist() == [0, 1, 2]
+
+    # Deriva lenta de los regímenes: el EM online sigue las medias.
+    for batch in np.array_split(rng.permutation(_regimes(rng, shift=0.3)), 60):
+        det.update(batch, learning_rate=0.05)
+    assert det.n_updates == 60
+    assert abs(det.means_[1, 0] - 1.3) < 0.1
+    assert det.predict(probes + [0.3, 0.0]).tolist() == [0, 1, 2]
+
+    path = det.save(tmp_path / "regime.npz")
+    loaded = RegimeDetector.load(path)
+    X = _regimes(rng, n=50)
+    assert np.array_equal(loaded.predict(X), det.predict(X))
+    loaded.update(X[0])
+    assert loaded.n_updates == 61
+
+
+def test_align_matches_exhaustive_permutation_search():
+    rng = np.random.default_rng(3)
+    k = 6
+    det = RegimeDetector(n_components=k)
+    det.means_ = rng.normal(size=(k, 4))
+    det.component_order_ = np.arange(k)
+    shuffled = rng.permutation(k)
+    new_means = det.means_[shuffled] + rng.normal(scale=0.3, size=(k, 4))
+    order = det._align(new_means, np.stack([np.eye(4)] * k))
+    costs = {perm: ((new_means[list(perm)] - det.means_) ** 2).sum() for perm in permutations(range(k))}
+    assert tuple(order) == min(costs, key=costs.get)
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from xau_system.rl.experience_buffer import Experience, ExperienceBuffer
+from xau_system.rl.replay_buffer import PrioritizedReplayBuffer, SumTree
+
+
+def test_sum_tree_batched_update_and_find():
+    tree = SumTree(5)
+    tree.update(np.arange(5), np.array([1.0, 0.0, 2.0, 3.0, 4.0]))
+    assert tree.total == 10.0
+    assert tree.find(np.array([0.0, 0.99, 1.0, 2.99, 3.0, 9.99])).tolist() == [0, 0, 2, 2, 3, 4]
+    tree.update(np.array([0, 4]), np.array([5.0, 0.0]))
+    assert tree.total == 10.0
+    assert tree.find(np.array([4.99, 9.99])).tolist() == [0, 3]
+
+
+def test_prioritized_sampling_follows_priorities_and_wraps():
+    buf = PrioritizedReplayBuffer(capacity=8, alpha=1.0, seed=0)
+    with pytest.raises(ValueError):
+        buf.sample(4)
+    for i in range(10):
+        buf.add(f"s{i}", "BUY", 0.7, 0.0, 0.0, "trend")
+    assert len(buf) == 8
+    assert set(buf.state_id.tolist()) == {f"s{i}" for i in range(2, 10)}
+
+    buf.update_priorities(np.arange(8), np.r_[np.full(7, 0.1), 10.0])
+    batch = buf.sample(256, beta=1.0)
+    share = np.mean(batch.indices == 7)
+    assert share > 0.85
+    # El slot más frecuente tiene el menor peso de importancia.
+    assert batch.weights.max() == 1.0
+    assert batch.weights[batch.indices == 7].max() < batch.weights[batch.indices != 7].min()
+
+
+def test_experience_buffer_samples_without_reading_disk(tmp_path):
+    exp_buf = ExperienceBuffer(str(tmp_path / "experiences.ndjson"), capacity=16)
+    exp_buf.append(Experience("s1", "BUY", 0.8, 0.01, 12.3, "trend"))
+    exp_buf.append(Experience("s2", "SELL", 0.6, -0.005, -3.2, "range"))
+    batch = exp_buf.sample(4)
+    assert len(batch) == 4
+    assert set(batch.state_id.tolist()) <= {"s1", "s2"}
+    assert set(batch.signal.tolist()) <= {0, 1}
+    exp_buf.update_priorities(batch.indices, np.ones(4))
+    exp_buf.close()
+    assert len((tmp_path / "experiences.ndjson").read_text().splitlines()) == 2
@@ -0,0 +1,127 @@
+import gzip
+import json
+import time
+
+from xau_system.config import Settings
+from xau_system.integrations.tradingview_feed import TradingViewFeed, build_analysis_from_payload
+from xau_system.rl.experience_buffer import Experience, ExperienceBuffer
+from xau_system.rl.online_trainer import OnlineTrainer
+from xau_system.utils.persistence import open_ndjson_writer
+from xau_system.utils.segmented_log import SegmentConfig, SegmentedLogReader, SegmentedNDJSONSink
+
+
+def _line(i: int) -> str:
+    return json.dumps({"i": i, "timestamp": f"2024-01-01T00:{i:02d}:00Z"}) + "\n"
+
+
+def test_rotation_compression_and_manifest(tmp_path):
+    root = tmp_path / "bars"
+    sink = SegmentedNDJSONSink(root, SegmentConfig(max_segment_bytes=200, ts_field="timestamp"))
+    for i in range(20):
+        sink.write_lines([_line(i)])
+    sink.close()
+
+    manifest = json.loads((root / "manifest.json").read_text())["segments"]
+    sealed = [s for s in manifest if s["sealed"]]
+    assert len(sealed) >= 2 and all(s["file"].endswith(".gz") for s in sealed)
+    assert sum(s["count"] for s in manifest) == 20
+    assert [s["first_seq"] for s in manifest] == sorted(s["first_seq"] for s in manifest)
+    assert manifest[0]["first_ts"] == "2024-01-01T00:00:00Z"
+    first = json.loads(gzip.open(root / sealed[0]["file"]).readline())
+    assert first["i"] == 0
+    assert not list(root.glob("*.tmp"))
+
+    reader = SegmentedLogReader(root)
+    rows = []
+    seq = 0
+    while chunk := reader.read(seq, max_rows=3):
+        rows.extend(chunk)
+        seq = chunk[-1][0] + 1
+    assert [s for s, _ in rows] == list(range(20))
+    assert [r["i"] for _, r in rows] == list(range(20))
+    assert [r["i"] for r in reader.tail(4)] == [16, 17, 18, 19]
+
+
+def test_retention_and_recovery_of_truncated_tail(tmp_path):
+    root = tmp_path / "exp"
+    sink = SegmentedNDJSONSink(root, SegmentConfig(max_segment_bytes=100, retain_segments=2))
+    for i in range(40):
+        sink.write_lines([_line(i)])
+    sink.close()
+    assert len([p for p in root.iterdir() if p.name.endswith(".gz")]) == 2
+
+    active = SegmentedLogReader(root).segments[-1]
+    with (root / active.file).open("a") as f:
+        f.write('{"i": 99')  # escritura interrumpida
+    reopened = SegmentedNDJSONSink(root, SegmentConfig(max_segment_bytes=100, retain_segments=2))
+    assert reopened.next_seq == 40
+    reopened.write_lines([_line(40)])
+    reopened.close()
+
+    reader = SegmentedLogReader(root)
+    assert reader.first_seq > 0
+    # Un seq ya borrado por retención se reanuda en el primer segmento conservado.
+    assert reader.read(0)[0][0] == reader.first_seq
+    assert [r["i"] for r in reader.tail(2)] == [39, 40]
+
+
+def test_trainer_resumes_by_sequence_across_rotation(tmp_path):
+    root = tmp_path / "experiences"
+    writer = open_ndjson_writer(root, segments=SegmentConfig(max_segment_bytes=150))
+    for i in range(10):
+        writer.write({"state_id": f"s{i}"})
+    writer.flush()
+
+    trainer = OnlineTrainer(experience_path=str(root), poll_s=0.02, batch_size=4, max_latency_s=10.0)
+    assert trainer.segmented
+    trainer.start()
+    time.sleep(0.2)
+    trainer.stop()
+    assert trainer.status().offset == 8
+
+    for i in range(10, 30):
+        writer.write({"state_id": f"s{i}"})
+    writer.close()
+    assert SegmentedLogReader(root).segments[0].sealed
+
+    resumed = OnlineTrainer(experience_path=str(root), poll_s=0.02, batch_size=4, max_latency_s=0.05)
+    assert resumed.status().offset == 8
+    resumed.start()
+    time.sleep(0.3)
+    resumed.stop()
+    assert resumed.status().experiences == 22
+    assert resumed.status().offset == 30
+
+
+def test_trainer_started_before_writer_waits_for_segmented_log(tmp_path):
+    settings = Settings(experience_path=str(tmp_path / "experiences"), experience_segmented=True, experience_retain_segments=2)
+    assert settings.experience_segments().retain_segments == 2
+    assert Settings().experience_segments() is None
+
+    trainer = OnlineTrainer(experience_path=settings.experience_path, poll_s=0.02, batch_size=2, max_latency_s=0.02)
+    assert trainer.segmented is None
+    trainer.start()
+    time.sleep(0.1)
+    assert not (tmp_path / "experiences").exists()  # el entrenador no crea la ruta
+
+    buf = ExperienceBuffer(settings.experience_path, segments=settings.experience_segments())
+    buf.subscribe(trainer.notify)
+    for i in range(4):
+        buf.append(Experience(f"s{i}", "BUY", 0.8, 0.01, 1.0, "trend"))
+    buf.flush()
+    deadline = time.time() + 5.0
+    while trainer.status().experiences < 4 and time.time() < deadline:
+        time.sleep(0.02)
+    trainer.stop()
+    buf.close()
+    assert trainer.segmented is True
+    assert trainer.status().experiences == 4 and trainer.status().offset == 4
+
+
+def test_tradingview_feed_latest_on_segmented_log(tmp_path):
+    root = tmp_path / "tv"
+    feed = TradingViewFeed(str(root), writer=open_ndjson_writer(root, segments=SegmentConfig(max_segment_bytes=300)))
+    for i in range(6):
+        feed.append(build_analysis_from_payload({"pattern": f"p{i}"}))
+    assert [a["pattern"] for a in feed.latest(3)] == ["p3", "p4", "p5"]
+    feed.close()
@@ -0,0 +1,72 @@
+import numpy as np
+
+from xau_system.backtest.metrics import drawdown_curve
+from xau_system.rl.reward import trade_reward
+from xau_system.rl.shadow import ShadowEvaluator, StreamingPerformance
+
+
+def test_streaming_performance_matches_batch_estimates():
+    r = np.random.default_rng(0).normal(0.0005, 0.01, 5000)
+    perf = StreamingPerformance(periods_per_year=252)
+    for x in r:
+        perf.update(float(x))
+    equity = np.r_[1.0, np.cumprod(1.0 + r)]
+    assert perf.n == len(r)
+    assert np.isclose(perf.mean, r.mean()) and np.isclose(perf.std, r.std(ddof=1))
+    assert np.isclose(perf.sharpe, r.mean() / r.std(ddof=1) * np.sqrt(252))
+    assert np.isclose(perf.max_drawdown, -drawdown_curve(equity).min())
+    assert np.isclose(perf.equity, equity[-1])
+
+
+def test_reward_aggregates_use_drawdown_increment():
+    perf = StreamingPerformance()
+    rewards = [perf.update(x) for x in (0.02, -0.01, -0.01, 0.03)]
+    dd1 = 1 - 1.02 * 0.99 / 1.02
+    dd2 = 1 - 1.02 * 0.99 * 0.99 / 1.02
+    assert np.isclose(rewards[1], trade_reward(-0.01, dd1, 0.0, 0.0))
+    assert np.isclose(rewards[2], trade_reward(-0.01, dd2 - dd1, 0.0, 0.0))
+    assert np.isclose(rewards[3], trade_reward(0.03, 0.0, 0.0, 0.0))
+    assert np.isclose(perf.reward_sum, sum(rewards))
+
+
+def test_shadow_evaluator_gates_at_checkpoints():
+    seen = []
+    ev = ShadowEvaluator(checkpoint_every=100, min_observations=200, on_decision=seen.append)
+    rng = np.random.default_rng(1)
+    decisions = []
+    for _ in range(500):
+        noise = rng.normal(0, 0.01)
+        d = ev.observe(noise, noise + 0.002)
+        if d is not None:
+            decisions.append(d)
+    # Cada promoción abre una ventana nueva que vuelve a exigir min_observations.
+    assert [d.checkpoint for d in decisions] == [200, 400]
+    assert [d.window for d in decisions] == [0, 1]
+    assert all(d.challenger["n"] == 200 for d in decisions)
+    assert seen == decisions and ev.last_decision is decisions[-1]
+    assert all(d.result.promoted for d in decisions)
+    assert decisions[-1].challenger["sharpe"] > decisions[-1].champion["sharpe"]
+    assert ev.champion.perf.n == ev.challenger.perf.n == 100
+
+
+def test_shadow_evaluator_keeps_window_without_promotion_and_bounds_history():
+    ev = ShadowEvaluator(checkpoint_every=10, min_observations=10, max_decisions=3)
+    rng = np.random.default_rng(2)
+    for _ in range(100):
+        noise = rng.normal(0, 0.01)
+        ev.observe(noise, noise - 0.002)  # el challenger es peor: nunca se promueve
+    assert len(ev.decisions) == 3
+    assert [d.checkpoint for d in ev.decisions] == [80, 90, 100]
+    assert not any(d.result.promoted for d in ev.decisions)
+    assert ev.window == 0 and ev.champion.perf.n == 100
+
+
+def test_observe_bar_tracks_positions_on_same_bars():
+    ev = ShadowEvaluator(checkpoint_every=2, min_observations=2, cost_per_turnover=0.001)
+    assert ev.observe_bar(100.0, "BUY", "SELL") is None
+    assert ev.observe_bar(101.0, "BUY", "NEUTRAL") is None
+    d = ev.observe_bar(99.99, "NEUTRAL", "NEUTRAL")
+    # Largo +1% y -1%, frente a corto -1% (+0.1% de coste al cerrar) y plano.
+    assert np.isclose(ev.champion.perf.equity, 1.01 * (0.99 - 0.001))
+    assert np.isclose(ev.challenger.perf.equity, (1 - 0.01 - 0.001) * 1.0)
+    assert d is not None and d.checkpoint == 2
@@ -0,0 +1,90 @@
+import numpy as np
+
+from xau_system.api.service import SignalEngine
+from xau_system.config import Settings
+from xau_system.ensemble.consensus import TimeframeVote
+from xau_system.features.fundamental import FUNDAMENTAL_FIELDS, FundamentalSnapshot
+
+
+def _random_inputs(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    # Probabilidades sesgadas para cubrir BUY, SELL y NEUTRAL.
+    probs = rng.dirichlet([0.3, 0.3, 0.3], size=(n, 3))
+    probs[rng.random(n) < 0.05, 0] = 0.0
+    return {
+        "price": rng.uniform(1800, 2500, n),
+        "atr": rng.uniform(0.5, 20, n),
+        "vote_probs": probs,
+        "vote_confidence": rng.uniform(0, 1, (n, 3)),
+        "vote_weight": np.array([0.5, 0.3, 0.2]),
+        "timeframes": ["1H", "4H", "D1"],
+        "d1_probs": rng.dirichlet([0.5, 0.5, 0.5], size=n),
+        "chaikin_ok": rng.random(n) < 0.7,
+        "fundamentals": {
+            f: np.where(rng.random(n) < 0.3, np.nan, rng.normal(scale, 1.0, n))
+            for f, scale in zip(FUNDAMENTAL_FIELDS, (100.0, 1.5, 4.0, 0.0))
+        },
+    }
+
+
+def test_infer_batch_matches_scalar_path():
+    n = 400
+    x = _random_inputs(n)
+    engine = SignalEngine()
+    batch = engine.infer_batch(**x)
+    assert len(batch) == n
+    assert set(batch.labels()) == {"BUY", "SELL", "NEUTRAL"}
+
+    for i, got in enumerate(batch.to_outputs()):
+        votes = [
+            TimeframeVote(tf, list(x["vote_probs"][i, j]), float(x["vote_confidence"][i, j]), float(x["vote_weight"][j]))
+            for j, tf in enumerate(x["timeframes"])
+        ]
+        snap = FundamentalSnapshot(
+            **{f: (None if np.isnan(v[i]) else float(v[i])) for f, v in x["fundamentals"].items()}
+        )
+        expected = engine.infer_from_probabilities(
+            price=float(x["price"][i]),
+            atr=float(x["atr"][i]),
+            votes=votes,
+            d1_probs=list(x["d1_probs"][i]),
+            pattern_quality=0.5,
+            regime="range",
+            fundamentals=snap,
+            chaikin_ok=bool(x["chaikin_ok"][i]),
+        )
+        assert got == expected
+
+
+def test_per_row_timeframes_with_padding():
+    engine = SignalEngine()
+    probs = np.array([[[0.9, 0.05, 0.05], [0.8, 0.1, 0.1]], [[0.1, 0.1, 0.8], [0.0, 0.0, 0.0]]])
+    batch = engine.infer_batch(
+        price=[2000.0, 2000.0],
+        atr=[5.0, 5.0],
+        vote_probs=probs,
+        vote_confidence=[[0.9, 0.8], [0.7, 0.0]],
+        vote_weight=[[1.0, 1.0], [1.0, 0.0]],
+        timeframes=np.array([["1H", "4H"], ["4H", ""]], dtype=object),
+        d1_probs=[[0.5, 0.2, 0.3], [0.3, 0.3, 0.4]],
+    )
+    assert batch.labels().tolist() == ["BUY", "NEUTRAL"]
+    single = engine.infer_from_probabilities(2000.0, 5.0, [TimeframeVote("4H", [0.1, 0.1, 0.8], 0.7, 1.0)], [0.3, 0.3, 0.4], 0.5, "range")
+    assert batch.to_outputs()[1] == single
+
+
+def test_risk_settings_drive_live_scalar_and_batch_paths():
+    x = _random_inputs(5)
+    cases = ((Settings(), 0.01), (Settings(risk_base=0.02), 0.02), (Settings(risk_base=0.05, risk_max=0.03), 0.03))
+    for settings, expected in cases:
+        engine = SignalEngine(settings)
+        assert np.all(engine.infer_batch(**x).risk_fraction == expected)
+        out = engine.infer_from_probabilities(
+            price=2300.0,
+            atr=4.0,
+            votes=[TimeframeVote("1H", [0.8, 0.1, 0.1], 0.9, 1.0)],
+            d1_probs=[0.4, 0.3, 0.3],
+            pattern_quality=0.5,
+            regime="range",
+        )
+        assert out.risk_fraction == expected
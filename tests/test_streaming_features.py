@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from xau_system.features.indicators import add_technical_indicators
+from xau_system.features.pipeline import FeatureConfig, FeaturePipeline
+from xau_system.features.preprocessing import add_returns_and_atr
+from xau_system.features.streaming import StreamingFeatureEngine
+
+
+def _ohlcv(n=400, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 2300 + np.cumsum(rng.normal(0, 1.0, n))
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2024-01-01", periods=n, freq="1min", tz="UTC"),
+            "open": close + rng.normal(0, 0.3, n),
+            "high": close + rng.random(n) + 0.1,
+            "low": close - rng.random(n) - 0.1,
+            "close": close,
+            "volume": rng.integers(100, 1000, n).astype(float),
+        }
+    )
+
+
+def _stream(engine, df):
+    rows = [engine.update(r.high, r.low, r.close, r.volume) for r in df.itertuples(index=False)]
+    return pd.DataFrame(rows).assign(timestamp=df["timestamp"].to_numpy())
+
+
+def test_streaming_engine_matches_batch_features():
+    df = _ohlcv()
+    got = _stream(StreamingFeatureEngine(), df)
+    batch = add_technical_indicators(df).merge(add_returns_and_atr(df), on=list(df.columns))
+    merged = batch.merge(got, on="timestamp", suffixes=("", "_stream"))
+    assert len(merged) == len(batch) > 200
+    for c in StreamingFeatureEngine.COLUMNS:
+        np.testing.assert_allclose(merged[f"{c}_stream"], merged[c].astype(float), rtol=1e-7, atol=1e-7, err_msg=c)
+
+
+def test_volume_rel_with_zero_median_is_nan_in_streaming_and_pipeline():
+    df = _ohlcv(120)
+    # Tramo sin volumen: la mediana móvil llega a 0 y hay barras con volumen > 0 encima.
+    df.loc[20:80, "volume"] = 0.0
+    df.loc[60:80:5, "volume"] = 50.0
+    got = _stream(StreamingFeatureEngine(), df)["volume_rel"].to_numpy()
+
+    pipe = FeaturePipeline(FeatureConfig(features=("volume_rel",)))
+    cols = [df[c].to_numpy(dtype=float) for c in ("open", "high", "low", "close", "volume")]
+    raw = pipe._kernels(*cols)["volume_rel"]()
+    assert not np.isinf(raw).any() and np.isnan(raw[60:81]).all()
+    np.testing.assert_allclose(raw, got, rtol=1e-9, equal_nan=True)
+
+    fm = pipe.compute(df)
+    finite = np.isfinite(got)
+    np.testing.assert_allclose(fm.values[:, 0], got[finite], rtol=1e-9)
+
+
+def test_streaming_engine_snapshot_restore():
+    df = _ohlcv(250)
+    engine = StreamingFeatureEngine()
+    _stream(engine, df.iloc[:150])
+    restored = StreamingFeatureEngine()
+    restored.load_state_dict(json.loads(json.dumps(engine.state_dict())))
+
+    a = _stream(engine, df.iloc[150:])
+    b = _stream(restored, df.iloc[150:])
+    pd.testing.assert_frame_equal(a, b, rtol=1e-9)
@@ -0,0 +1,74 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from xau_system.backtest.engine import BacktestConfig
+from xau_system.backtest.sweep import SweepData, SweepRunner, param_grid, walk_forward_folds, walk_forward_summary
+
+
+def _data(n: int = 3000, seed: int = 0) -> SweepData:
+    rng = np.random.default_rng(seed)
+    close = 2000 + np.cumsum(rng.normal(0, 1.0, n))
+    open_ = np.r_[close[0], close[:-1]]
+    return SweepData(
+        timestamp=pd.date_range("2024-01-01", periods=n, freq="1h", tz="UTC").as_unit("ns").asi8,
+        open=open_,
+        high=np.maximum(open_, close) + rng.random(n),
+        low=np.minimum(open_, close) - rng.random(n),
+        close=close,
+        atr=np.full(n, 3.0),
+        vote_probs=rng.dirichlet([0.4, 0.4, 0.4], size=(n, 3)),
+        vote_confidence=rng.uniform(0.5, 1.0, (n, 3)),
+        vote_weight=np.array([0.5, 0.3, 0.2]),
+        d1_probs=rng.dirichlet([1.0, 1.0, 1.0], size=n),
+        fundamental_bias=np.zeros(n),
+        chaikin_ok=np.ones(n, dtype=bool),
+    )
+
+
+def test_parallel_sweep_matches_serial_and_resumes(tmp_path):
+    data = _data()
+    grid = param_grid(buy_threshold=[0.55, 0.62], confirm_threshold=[0.5, 0.6], d1_veto_threshold=[0.5])
+    folds = walk_forward_folds(len(data), n_folds=2)
+    cfg = BacktestConfig(max_holding=24)
+
+    serial = SweepRunner(data, cfg).run(grid, folds)
+    assert len(serial) == len(grid) * 2 * 2
+    assert serial["n_trades"].gt(0).all()
+
+    ckpt = tmp_path / "sweep.ndjson"
+    SweepRunner(data, cfg, n_workers=2, checkpoint_path=ckpt).run(grid[:2], folds)
+    assert len(ckpt.read_text().splitlines()) == 2 * 4
+    parallel = SweepRunner(data, cfg, n_workers=2, checkpoint_path=ckpt).run(grid, folds)
+    lines = [json.loads(x) for x in ckpt.read_text().splitlines()]
+    assert len(lines) == len({r["task_id"] for r in lines}) == len(grid) * 4
+
+    cols = ["net_return", "sharpe", "max_drawdown", "n_trades"]
+    a = serial.sort_values("task_id").reset_index(drop=True)
+    b = parallel.sort_values("task_id").reset_index(drop=True)
+    pd.testing.assert_frame_equal(a[cols], b[cols])
+
+    summary = walk_forward_summary(parallel)
+    assert list(summary["fold"]) == [0, 1]
+    assert {"params", "train_sharpe", "test_sharpe", "test_max_drawdown"} <= set(summary.columns)
+
+
+@pytest.mark.parametrize("bad", [{"not_a_setting": [1]}, {"risk_high": [0.02, 0.04]}, {"neutral_threshold": [0.5]}])
+def test_param_grid_rejects_unknown_and_ineffective_fields(bad):
+    with pytest.raises(ValueError):
+        param_grid(**bad)
+
+
+def test_param_grid_accepts_risk_settings():
+    assert param_grid(risk_max=[0.005, 0.03]) == [{"risk_max": 0.005}, {"risk_max": 0.03}]
+
+
+def test_task_ids_depend_on_data_and_backtest_config():
+    grid = param_grid(buy_threshold=[0.6])
+    data = _data(500)
+    base = {t["task_id"] for t in SweepRunner(data, BacktestConfig()).tasks(grid)}
+    assert base == {t["task_id"] for t in SweepRunner(_data(500), BacktestConfig()).tasks(grid)}
+    assert base != {t["task_id"] for t in SweepRunner(_data(500, seed=1), BacktestConfig()).tasks(grid)}
+    assert base != {t["task_id"] for t in SweepRunner(data, BacktestConfig(spread=0.5)).tasks(grid)}
@@ -0,0 +1,33 @@
+import os
+import time
+
+from xau_system.rl.experience_buffer import Experience, ExperienceBuffer
+from xau_system.rl.training_worker import TrainingWorker, WorkerConfig
+
+
+def test_training_worker_trains_in_separate_process(tmp_path):
+    exp_path = tmp_path / "experiences.ndjson"
+    exp_buf = ExperienceBuffer(str(exp_path))
+    worker = TrainingWorker(
+        WorkerConfig(experience_path=str(exp_path), batch_size=2, poll_s=0.05, cpu_affinity=(0,), niceness=5)
+    )
+    exp_buf.subscribe(worker.notify)
+    assert worker.status().running is False
+
+    assert worker.start() is True
+    assert worker.start() is False
+    assert worker.pid != os.getpid()
+    for i in range(4):
+        exp_buf.append(Experience(f"s{i}", "BUY", 0.8, 0.01, 1.0, "trend"))
+
+    deadline = time.monotonic() + 20.0
+    while worker.status().experiences < 4 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    st = worker.status()
+    assert st.running is True
+    assert st.experiences == 4 and st.steps == 2
+
+    assert worker.stop() is True
+    assert worker.status().running is False
+    exp_buf.close()
+    assert (tmp_path / "experiences.ndjson.offset").exists()
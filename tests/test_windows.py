@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from xau_system.features.windows import SlidingWindowDataset, save_feature_matrix
+
+
+def test_sliding_windows_are_views_and_batches_align_targets():
+    feats = np.arange(200 * 3, dtype=np.float32).reshape(200, 3)
+    targets = np.arange(200)
+    ds = SlidingWindowDataset(feats, seq_len=16, targets=targets)
+    assert len(ds) == 185
+    assert np.shares_memory(ds[0], feats)
+    np.testing.assert_array_equal(ds[5], feats[5:21])
+
+    x, y = ds.batch(np.array([0, 10, 184]))
+    assert x.shape == (3, 16, 3)
+    assert y.tolist() == [15, 25, 199]
+    np.testing.assert_array_equal(x[1], feats[10:26])
+
+
+def test_time_split_purges_overlap_and_iter_batches_prefetch(tmp_path):
+    feats = np.random.default_rng(0).normal(size=(500, 4)).astype(np.float32)
+    path = save_feature_matrix(tmp_path / "feats.npy", feats)
+    ds = SlidingWindowDataset.from_memmap(path, seq_len=32, targets=np.arange(500))
+    assert isinstance(ds.features, np.memmap)
+
+    train, valid = ds.time_split(valid_fraction=0.2)
+    assert train.end_rows().max() < valid.indices.min()
+    assert len(valid) == round(len(ds) * 0.2)
+
+    seen = []
+    for x, y in train.iter_batches(batch_size=64, shuffle=True, seed=1, prefetch=2):
+        assert x.shape[1:] == (32, 4)
+        seen.extend(y.tolist())
+    assert sorted(seen) == sorted(train.end_rows().tolist())
+
+    gen = train.iter_batches(batch_size=8, prefetch=1)
+    next(gen)
+    gen.close()
+
+
+def test_iter_batches_reraises_producer_errors():
+    ds = SlidingWindowDataset(np.zeros((100, 2), dtype=np.float32), seq_len=8)
+    calls = []
+    real_batch = ds.batch
+
+    def flaky(positions):
+        calls.append(len(positions))
+        if len(calls) == 3:
+            raise MemoryError("gather")
+        return real_batch(positions)
+
+    ds.batch = flaky
+    got = []
+    with pytest.raises(MemoryError, match="gather"):
+        for x, _ in ds.iter_batches(batch_size=10, shuffle=False, prefetch=2):
+            got.append(len(x))
+    assert got == [10, 10]